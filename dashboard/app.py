@@ -11,15 +11,61 @@ if __package__ in (None, ""):
 
 from dashboard.callbacks import register_all
 from dashboard.layout import build_layout
+from dashboard import data, metrics, profiling, static_figures
 
 pio.templates.default = "plotly_white"
 
-app = Dash(__name__, title="Notion Engagement Dashboard")
-server = app.server
 
-app.layout = build_layout()
-register_all(app)
+def create_app(preload: bool = True) -> Dash:
+    """Build the dashboard.
+
+    With ``preload`` every dataset is loaded before the app is returned. Under
+    a pre-forking server that loads the app in the master (see
+    ``dashboard/gunicorn.conf.py``), the workers then share the frames
+    copy-on-write instead of each building its own copy.
+    """
+    # Tab contents are rendered on demand, so callbacks reference ids that are
+    # not in the initial layout.
+    app = Dash(__name__, title="Notion Engagement Dashboard", suppress_callback_exceptions=True)
+    if preload:
+        data.preload(data.serving_datasets())
+        static_figures.build_all()
+    app.layout = build_layout()
+    register_all(app)
+    metrics.instrument(app)
+    profiling.instrument(app)
+    _add_health_routes(app)
+    return app
+
+
+def create_server(preload: bool = True):
+    """WSGI application factory, e.g. ``gunicorn 'dashboard.app:create_server()'``."""
+    return create_app(preload).server
+
+
+def _add_health_routes(app: Dash) -> None:
+    @app.server.route("/healthz")
+    def healthz():
+        return "ok\n", 200, {"Content-Type": "text/plain"}
+
+    @app.server.route("/readyz")
+    def readyz():
+        missing = [name for name in data.serving_datasets() if not data.is_loaded(name)]
+        if missing:
+            return f"loading: {', '.join(missing)}\n", 503, {"Content-Type": "text/plain"}
+        return "ready\n", 200, {"Content-Type": "text/plain"}
+
+
+def __getattr__(name: str):
+    # ``dashboard.app:app`` / ``dashboard.app:server`` are built on first access,
+    # so importing the module for ``create_server`` does not build a second app.
+    if name in ("app", "server"):
+        global app, server
+        app = create_app()
+        server = app.server
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 if __name__ == "__main__":
-    app.run(debug=False)
+    create_app().run(debug=False)
@@ -0,0 +1,307 @@
+from __future__ import annotations
+
+import argparse
+import inspect
+import json
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+import plotly.io as pio
+
+from dashboard import data
+from dashboard.layout import TABS
+
+BASELINE_PATH = data.BASE_DIR / "benchmarks" / "callbacks.json"
+# Result sets the callbacks read; everything else in ``data`` is derived from them.
+BASE_RESULTS = ("kaq1", "kaq2", "kaq3", "kaq4", "kaq5", "aq1", "aq2", "retention")
+
+
+def scale_frame(df: pd.DataFrame, factor: int) -> pd.DataFrame:
+    """``factor`` copies of a result set, as if the warehouse covered ``factor`` times the history.
+
+    Copies of dated rows are shifted back by whole multiples of the covered
+    years (so month and seasonality groupings stay valid); undated rows such as
+    totals are kept once. Result sets without dates get relabelled copies of
+    their categories instead.
+    """
+    if factor == 1:
+        return df
+    dates = [col for col in df.columns if pd.api.types.is_datetime64_any_dtype(df[col])]
+    if not dates:
+        labels = [col for col in df.columns if isinstance(df[col].dtype, pd.CategoricalDtype)]
+        copies = [df]
+        for i in range(1, factor):
+            copy = df.copy()
+            for col in labels:
+                copy[col] = copy[col].astype(str) + f" #{i + 1}"
+            copies.append(copy)
+        scaled = pd.concat(copies, ignore_index=True)
+        for col in labels:
+            scaled[col] = scaled[col].astype("category")
+        return scaled
+
+    dated = df[dates].notna().any(axis=1)
+    if "year" in df.columns:
+        dated |= df["year"].notna()
+    years = df.loc[dated, "year"].dropna() if "year" in df.columns else pd.Series(dtype=float)
+    first = min([df[col].min().year for col in dates if df[col].notna().any()] + list(years.astype(int)))
+    last = max([df[col].max().year for col in dates if df[col].notna().any()] + list(years.astype(int)))
+    span = last - first + 1
+
+    copies = [df]
+    for i in range(1, factor):
+        copy = df[dated].copy()
+        for col in dates:
+            copy[col] = copy[col] - pd.DateOffset(years=i * span)
+        if "year" in copy.columns:
+            copy["year"] = (copy["year"] - i * span).astype(df["year"].dtype)
+        copies.append(copy)
+    return pd.concat(copies, ignore_index=True)
+
+
+def load_scale(factor: int) -> dict[str, int]:
+    """Reset ``data`` to the result sets scaled by ``factor``; returns their row counts."""
+    data.clear()
+    base = {name: data.get(name) for name in BASE_RESULTS}
+    data.clear()
+    rows = {}
+    for name, frame in base.items():
+        scaled = scale_frame(frame, factor)
+        data.install(name, scaled)
+        rows[name] = len(scaled)
+    return rows
+
+
+def figure_callbacks(app) -> dict[str, tuple[Callable, list[dict]]]:
+    """Undecorated callback functions with figure outputs, by name, with their inputs.
+
+    Unwrapping skips Dash's serialization layer, the metrics wrappers and the
+    figure cache, so every call does the full filter and figure work. It also
+    skips ``data.scoped``, so the segment input is dropped and the figures are
+    drawn for all users.
+    """
+    callbacks = {}
+    for output, entry in app.callback_map.items():
+        if not output.endswith(".figure") and ".figure.." not in output:
+            continue
+        func = inspect.unwrap(entry["callback"])
+        inputs = [spec for spec in entry["inputs"] if spec["id"] != "segment"]
+        callbacks[func.__name__] = (func, inputs)
+    return dict(sorted(callbacks.items()))
+
+
+def _components(layout) -> dict[str, Any]:
+    found = {}
+    stack = [layout]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, (list, tuple)):
+            stack.extend(node)
+            continue
+        if getattr(node, "id", None) is not None:
+            found[node.id] = node
+        children = getattr(node, "children", None)
+        if children is not None and not isinstance(children, str):
+            stack.append(children)
+    return found
+
+
+def _random_date(rng: random.Random, component_id: str) -> str | None:
+    prefix = component_id.split("-")[0].upper()
+    lo, hi = data.get(f"{prefix}_DATE_MIN"), data.get(f"{prefix}_DATE_MAX")
+    if rng.random() < 0.2:
+        return None
+    return (lo + (hi - lo) * rng.random()).normalize().strftime("%Y-%m-%d")
+
+
+def input_sampler(inputs: list[dict], components: dict[str, Any]) -> Callable[[random.Random], tuple]:
+    """Random valid argument tuples for a callback, drawn from its controls in the layout.
+
+    Dropdowns and checklists pick from their options, date pickers draw a
+    range inside the (scaled) data, anything else passes the current value.
+    """
+
+    def sample(rng: random.Random) -> tuple:
+        args = []
+        dates = {}
+        for spec in inputs:
+            component = components.get(spec["id"])
+            prop = spec["property"]
+            if prop in ("start_date", "end_date"):
+                if spec["id"] not in dates:
+                    pair = sorted((_random_date(rng, spec["id"]), _random_date(rng, spec["id"])), key=lambda d: d or "")
+                    dates[spec["id"]] = {"start_date": pair[0], "end_date": pair[1]}
+                args.append(dates[spec["id"]][prop])
+                continue
+            options = getattr(component, "options", None)
+            if prop == "value" and options:
+                values = [opt["value"] if isinstance(opt, dict) else opt for opt in options]
+                if getattr(component, "multi", False) or type(component).__name__ == "Checklist":
+                    args.append(rng.sample(values, rng.randint(0, len(values))))
+                else:
+                    args.append(rng.choice(values))
+                continue
+            args.append(getattr(component, prop, None))
+        return tuple(args)
+
+    return sample
+
+
+def _figure_bytes(result: Any) -> int:
+    figures = result if isinstance(result, (tuple, list)) else (result,)
+    return sum(len(pio.to_json(fig, validate=False)) for fig in figures)
+
+
+def bench_callback(func: Callable, sample: Callable, runs: int, seed: int, alloc_runs: int = 5) -> dict:
+    """Latency percentiles (ms), peak allocations (KiB) and figure JSON size over ``runs`` random inputs."""
+    rng = random.Random(seed)
+    cases = [sample(rng) for _ in range(runs)]
+    for args in cases[:3]:
+        func(*args)
+
+    latencies, sizes = [], []
+    for args in cases:
+        start = time.perf_counter()
+        result = func(*args)
+        latencies.append((time.perf_counter() - start) * 1000)
+        sizes.append(_figure_bytes(result))
+
+    peaks = []
+    tracemalloc.start()
+    try:
+        for args in cases[:alloc_runs]:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            func(*args)
+            peaks.append((tracemalloc.get_traced_memory()[1] - base) / 1024)
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "runs": runs,
+        "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+        "p95_ms": round(float(np.percentile(latencies, 95)), 3),
+        "p99_ms": round(float(np.percentile(latencies, 99)), 3),
+        "peak_alloc_kib": round(float(np.median(peaks)), 1),
+        "figure_bytes": int(np.median(sizes)),
+        "figure_bytes_max": int(max(sizes)),
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float, min_ms: float) -> list[str]:
+    """Regressions of ``current`` against ``baseline``: slower p50/p95, more memory, bigger figures."""
+    problems = []
+    for scale, results in current["scales"].items():
+        for name, stats in results["callbacks"].items():
+            before = baseline.get("scales", {}).get(scale, {}).get("callbacks", {}).get(name)
+            if before is None:
+                continue
+            for key in ("p50_ms", "p95_ms"):
+                if stats[key] - before[key] > min_ms and stats[key] > before[key] * (1 + threshold):
+                    problems.append(f"SF{scale} {name}: {key} {before[key]:.1f} -> {stats[key]:.1f}")
+            for key in ("peak_alloc_kib", "figure_bytes"):
+                if stats[key] > before[key] * (1 + threshold):
+                    problems.append(f"SF{scale} {name}: {key} {before[key]:,.0f} -> {stats[key]:,.0f}")
+    return problems
+
+
+def git_revision() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=data.BASE_DIR, capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def run(app, scales: list[int], runs: int, seed: int, names: tuple[str, ...] = (), log=print) -> dict:
+    callbacks = figure_callbacks(app)
+    unknown = set(names) - set(callbacks)
+    if unknown:
+        raise ValueError(f"unknown callbacks: {', '.join(sorted(unknown))}")
+    # Tab contents are rendered on demand, so collect the controls from every tab.
+    components = _components([app.layout, *(module.build_content() for module in TABS.values())])
+    report = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "runs": runs,
+        "seed": seed,
+        "scales": {},
+    }
+    try:
+        for scale in scales:
+            rows = load_scale(scale)
+            log(f"SF{scale} ({sum(rows.values()):,} result rows)")
+            results = {}
+            for name, (func, inputs) in callbacks.items():
+                if names and name not in names:
+                    continue
+                results[name] = stats = bench_callback(func, input_sampler(inputs, components), runs, seed)
+                log(
+                    f"  {name:24} p50 {stats['p50_ms']:8.1f} ms  p95 {stats['p95_ms']:8.1f}  p99 {stats['p99_ms']:8.1f}"
+                    f"  peak {stats['peak_alloc_kib']:9,.0f} KiB  json {stats['figure_bytes']:>10,} B"
+                )
+            report["scales"][str(scale)] = {"rows": rows, "callbacks": results}
+    finally:
+        data.clear()
+    return report
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Micro-benchmark the dashboard figure callbacks.")
+    parser.add_argument("--scales", default="1,10,100", help="comma separated result scale factors")
+    parser.add_argument("--runs", type=int, default=30, help="random inputs per callback and scale")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--save", action="store_true", help="write this run as the new baseline")
+    parser.add_argument("--compare", action="store_true", help="report regressions against the baseline")
+    parser.add_argument("--threshold", type=float, default=0.2, help="relative change flagged as a regression")
+    parser.add_argument("--min-ms", type=float, default=1.0, help="ignore slowdowns smaller than this")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("names", nargs="*", metavar="CALLBACK", help="callbacks to run (default: all)")
+    args = parser.parse_args(argv)
+
+    from dashboard.app import app
+
+    scales = [int(s) for s in args.scales.split(",")]
+    try:
+        report = run(app, scales, args.runs, args.seed, tuple(args.names))
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    problems = []
+    if args.compare:
+        try:
+            baseline = json.loads(args.baseline.read_text())
+        except (OSError, ValueError):
+            parser.error(f"no baseline at {args.baseline}; run with --save first")
+        if (baseline.get("runs"), baseline.get("seed")) != (args.runs, args.seed):
+            print(f"note: baseline used --runs {baseline.get('runs')} --seed {baseline.get('seed')}")
+        problems = compare(report, baseline, args.threshold, args.min_ms)
+        print(f"compared with baseline {baseline.get('revision') or '?'} ({baseline.get('timestamp')})")
+        for problem in problems:
+            print(f"REGRESSION {problem}")
+        if not problems:
+            print("no regressions")
+
+    if args.save:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        tmp = args.baseline.with_name(f".{args.baseline.name}.tmp")
+        tmp.write_text(json.dumps(report, indent=2))
+        tmp.replace(args.baseline)
+        print(f"baseline written to {args.baseline}")
+    if problems and args.fail_on_regression:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Callable, Iterable
+
+import pandas as pd
+
+CACHE_DIR = Path(
+    os.environ.get("DASHBOARD_CACHE_DIR", Path(__file__).resolve().parent.parent / ".cache")
+) / "results"
+CACHE_ENABLED = os.environ.get("DASHBOARD_RESULT_CACHE", "1") != "0"
+
+# Bump whenever the preparation applied on top of the raw CSVs changes, so
+# stale Parquet files written by an older build are not picked up.
+CACHE_VERSION = 2
+
+
+def file_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _read_manifest(path: Path) -> dict:
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def _atomic_write(path: Path, write: Callable[[Path], None]) -> None:
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def content_digest(source: Path, manifest: dict | None = None) -> str:
+    """Hash of the source file, skipping the read when mtime and size are unchanged."""
+    if manifest is None:
+        manifest = _read_manifest(CACHE_DIR / f"{source.stem}.json")
+    stat = source.stat()
+    if (
+        manifest.get("mtime_ns") == stat.st_mtime_ns
+        and manifest.get("size") == stat.st_size
+        and manifest.get("sha256")
+    ):
+        return manifest["sha256"]
+    return file_digest(source)
+
+
+def tracked_digest(source: Path) -> str:
+    """``content_digest`` of a file without a Parquet copy (the star export), recorded in its own manifest.
+
+    The manifest is keyed on the file's path, so a large export is read once and
+    later starts only ``stat`` it.
+    """
+    key = hashlib.sha256(str(source.resolve()).encode()).hexdigest()[:16]
+    manifest_path = CACHE_DIR / "sources" / f"{key}.json"
+    manifest = _read_manifest(manifest_path)
+    sha256 = content_digest(source, manifest)
+    if CACHE_ENABLED:
+        _record(manifest_path, source, sha256, manifest)
+    return sha256
+
+
+def data_version(source: str, paths: Iterable[Path]) -> str:
+    """Combined content hash of a source's files, used to key derived caches."""
+    digest = hashlib.sha256(source.encode())
+    for path in paths:
+        digest.update(tracked_digest(path).encode())
+    return digest.hexdigest()[:16]
+
+
+def _record(manifest_path: Path, source: Path, sha256: str, manifest: dict) -> None:
+    """Remember ``sha256`` for the current mtime and size of ``source``."""
+    stat = source.stat()
+    if manifest.get("sha256") == sha256 and manifest.get("mtime_ns") == stat.st_mtime_ns:
+        return
+    entry = {"sha256": sha256, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+    try:
+        manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        _atomic_write(manifest_path, lambda tmp: tmp.write_text(json.dumps(entry)))
+    except OSError:
+        pass
+
+
+def cached_frame(source: Path, build: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+    """Return ``build()`` for ``source``, reusing a typed Parquet copy while the file is unchanged.
+
+    The Parquet file is keyed on the SHA-256 of the source content, so touching a
+    file without changing it (e.g. a fresh checkout) still hits the cache. Writes
+    go through a temporary file and ``os.replace`` so concurrent workers never
+    observe a partial file.
+    """
+    if not CACHE_ENABLED:
+        return build()
+
+    manifest_path = CACHE_DIR / f"{source.stem}.json"
+    manifest = _read_manifest(manifest_path)
+    sha256 = content_digest(source, manifest)
+    target = CACHE_DIR / f"{source.stem}-v{CACHE_VERSION}-{sha256[:16]}.parquet"
+
+    df = None
+    if target.exists():
+        try:
+            df = pd.read_parquet(target)
+        except (ImportError, OSError, ValueError):
+            df = None
+
+    if df is None:
+        df = build()
+        try:
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            _atomic_write(target, lambda tmp: df.to_parquet(tmp, index=False))
+        except (ImportError, OSError):
+            return df
+        for stale in CACHE_DIR.glob(f"{source.stem}-v*.parquet"):
+            if stale != target:
+                stale.unlink(missing_ok=True)
+
+    _record(manifest_path, source, sha256, manifest)
+    return df
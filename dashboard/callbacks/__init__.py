@@ -1,20 +1,24 @@
 
 from dashboard.callbacks import (
-    additional_queries,
+    funnels,
     kaq1,
     kaq2,
     kaq3,
     kaq4,
     kaq5,
-    overview,
+    segment,
+    tables,
+    tabs,
 )
 
 
 def register_all(app) -> None:
-    overview.register(app)
+    tabs.register(app)
+    segment.register(app)
     kaq1.register(app)
     kaq2.register(app)
     kaq3.register(app)
     kaq4.register(app)
     kaq5.register(app)
-    additional_queries.register(app)
+    funnels.register(app)
+    tables.register(app)
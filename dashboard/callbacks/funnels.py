@@ -0,0 +1,114 @@
+import plotly.express as px
+import plotly.graph_objects as go
+from dash import Input, Output
+
+from dashboard import data
+from dashboard.engine.funnel import BREAKDOWNS
+from dashboard.figure_cache import FIGURES
+from dashboard.metrics import phase
+
+BREAKDOWN_LABELS = {"subscription_tier": "Subscription Tier", "platform": "Platform", "signup_month": "Signup Month"}
+DEFAULT_WINDOW_DAYS = 7
+MAX_WINDOW_DAYS = 365
+
+
+def _window(days) -> int:
+    try:
+        return min(max(int(days), 1), MAX_WINDOW_DAYS)
+    except (TypeError, ValueError):
+        return DEFAULT_WINDOW_DAYS
+
+
+def _cache_key(steps: list[str], window, by: str | None, segment: str | None) -> tuple:
+    return (tuple(steps or ()), _window(window), by if by in BREAKDOWNS else None, segment)
+
+
+def _message(title: str, text: str) -> go.Figure:
+    fig = go.Figure()
+    fig.add_annotation(text=text, showarrow=False, xref="paper", yref="paper", x=0.5, y=0.5)
+    fig.update_layout(title=title, xaxis_visible=False, yaxis_visible=False, margin=dict(l=20, r=20, t=50, b=20))
+    return fig
+
+
+def register(app) -> None:
+    # Funnels need per-user events, which only the star engine has.
+    if data.RESULT_SOURCE != "star":
+        return
+
+    @app.callback(
+        Output("funnel-conversion", "figure"),
+        Output("funnel-dropoff", "figure"),
+        Input("funnel-steps", "value"),
+        Input("funnel-window", "value"),
+        Input("funnel-by", "value"),
+        Input("segment", "data"),
+    )
+    @FIGURES.memoize("funnel", _cache_key)
+    @data.scoped
+    def update_funnel(steps: list[str], window, by: str | None):
+        steps = list(steps or [])
+        window = _window(window)
+        by = by if by in BREAKDOWNS else None
+        if len(steps) < 2:
+            text = "Pick at least two steps"
+            return _message("Conversion", text), _message("Drop-off between steps", text)
+
+        with phase("filter"):
+            frame = data.funnels.conversion(steps, window, by)
+            frame["step_label"] = [f"{step + 1}. {name}" for step, name in zip(frame["step"], frame["step_name"])]
+            labels = dict(zip(frame["step"], frame["step_label"]))
+            drops = frame[frame["step"] > 0].copy()
+            drops["transition"] = [
+                f"{labels[step - 1]} → {name}" for step, name in zip(drops["step"], drops["step_name"])
+            ]
+            drops["drop_off"] = 1 - drops["step_rate"]
+
+        with phase("figure"):
+            title = f"Conversion within {window} days of the first step"
+            axis_labels = {
+                "step_label": "Step",
+                "transition": "Step",
+                "conversion_rate": "Conversion",
+                "drop_off": "Drop-off",
+                **({by: BREAKDOWN_LABELS[by]} if by else {}),
+            }
+            if by is None:
+                conversion_fig = go.Figure(
+                    go.Funnel(
+                        y=frame["step_label"],
+                        x=frame["users"],
+                        textinfo="value+percent initial+percent previous",
+                    )
+                )
+                conversion_fig.update_layout(title=title)
+                dropoff_fig = px.bar(drops, x="transition", y="drop_off", text_auto=".0%", labels=axis_labels)
+            elif by == "signup_month":
+                conversion_fig = px.line(
+                    frame, x=by, y="conversion_rate", color="step_label", markers=True, title=title, labels=axis_labels
+                )
+                dropoff_fig = px.line(drops, x=by, y="drop_off", color="transition", markers=True, labels=axis_labels)
+            else:
+                frame[by] = frame[by].astype(str)
+                drops[by] = drops[by].astype(str)
+                conversion_fig = px.bar(
+                    frame,
+                    x="step_label",
+                    y="conversion_rate",
+                    color=by,
+                    barmode="group",
+                    title=title,
+                    labels=axis_labels,
+                )
+                dropoff_fig = px.bar(drops, x="transition", y="drop_off", color=by, barmode="group", labels=axis_labels)
+
+            if by is not None:
+                conversion_fig.update_layout(yaxis_tickformat=".0%", legend_title_text=BREAKDOWN_LABELS[by])
+            conversion_fig.update_layout(margin=dict(l=20, r=20, t=50, b=20))
+            dropoff_fig.update_layout(
+                title="Drop-off between steps",
+                yaxis_tickformat=".0%",
+                yaxis_range=[0, 1],
+                margin=dict(l=20, r=20, t=50, b=20),
+            )
+
+        return conversion_fig, dropoff_fig
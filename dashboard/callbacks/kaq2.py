@@ -3,7 +3,21 @@ import plotly.express as px
 from dash import Input, Output
 
 from dashboard import data
+from dashboard.figure_cache import FIGURES, clamp_range, normalize_choice
 from dashboard.constants import MONTH_LABELS
+from dashboard.metrics import phase
+
+
+def _cache_key(
+    metric: str, types: list[str], start: str, end: str, overall_flags: list[str], segment: str | None
+) -> tuple:
+    return (
+        metric,
+        normalize_choice(types, data.kaq2_monthly_type["content_type"].unique()),
+        clamp_range(start, end, data.KAQ2_DATE_MIN, data.KAQ2_DATE_MAX),
+        "overall" in (overall_flags or []),
+        segment,
+    )
 
 
 def register(app) -> None:
@@ -16,72 +30,73 @@ def register(app) -> None:
         Input("kaq2-date", "start_date"),
         Input("kaq2-date", "end_date"),
         Input("kaq2-overall", "value"),
+        Input("segment", "data"),
     )
+    @FIGURES.memoize("kaq2", _cache_key)
+    @data.scoped
     def update_kaq2(metric: str, types: list[str], start: str, end: str, overall_flags: list[str]):
-        types = types or []
-        filtered = data.filter_date(data.kaq2_monthly_type, "year_month", start, end)
-        if types:
-            filtered = filtered[filtered["content_type"].isin(types)]
+        with phase("filter"):
+            types = types or []
+            plot_df = data.select("kaq2_monthly_type", start, end, types)
+            if "overall" in (overall_flags or []):
+                overall_df = data.select("kaq2_monthly_overall", start, end).assign(content_type="all")
+                plot_df = pd.concat([plot_df, overall_df], ignore_index=True)
+
+            seasonality_df = data.select("kaq2_monthly_type", None, None, types)
+            seasonality_df = seasonality_df.groupby(["month", "content_type"], as_index=False, observed=True)[metric].mean()
+            seasonality_df["month_label"] = seasonality_df["month"].map(MONTH_LABELS)
 
-        plot_df = filtered.copy()
-        if "overall" in (overall_flags or []):
-            overall_df = data.filter_date(data.kaq2_monthly_overall, "year_month", start, end).copy()
-            overall_df["content_type"] = "all"
-            plot_df = pd.concat([plot_df, overall_df], ignore_index=True)
+            yearly_df = data.kaq2_yearly[data.kaq2_yearly["content_type"].notna()].copy()
+            if types:
+                yearly_df = yearly_df[yearly_df["content_type"].isin(types)]
 
-        trend = px.line(
-            plot_df,
-            x="year_month",
-            y=metric,
-            color="content_type",
-            markers=True,
-            title="Monthly engagement by content type",
-            labels={"year_month": "Time", "content_type": "Content Type", metric: "Value"},
-        )
-        trend.update_layout(
-            legend_title_text="Content type",
-            margin=dict(l=20, r=20, t=50, b=20),
-            xaxis_title="Time",
-            yaxis_title=metric.replace("_", " ").title(),
-        )
+        with phase("figure"):
+            trend = px.line(
+                plot_df,
+                x="year_month",
+                y=metric,
+                color="content_type",
+                markers=True,
+                title="Monthly engagement by content type",
+                labels={"year_month": "Time", "content_type": "Content Type", metric: "Value"},
+            )
+            trend.update_layout(
+                legend_title_text="Content type",
+                margin=dict(l=20, r=20, t=50, b=20),
+                xaxis_title="Time",
+                yaxis_title=metric.replace("_", " ").title(),
+            )
 
-        seasonality_df = data.kaq2_monthly_type.copy()
-        seasonality_df = seasonality_df[seasonality_df["content_type"].isin(types)] if types else seasonality_df
-        seasonality_df = seasonality_df.groupby(["month", "content_type"], as_index=False)[metric].mean()
-        seasonality_df["month_label"] = seasonality_df["month"].map(MONTH_LABELS)
-        seasonality = px.line(
-            seasonality_df,
-            x="month_label",
-            y=metric,
-            color="content_type",
-            markers=True,
-            title="Seasonality (monthly average across years)",
-            labels={"month_label": "Month", "content_type": "Content Type", metric: "Value"},
-        )
-        seasonality.update_layout(
-            legend_title_text="Content type",
-            margin=dict(l=20, r=20, t=50, b=20),
-            xaxis_title="Month",
-            yaxis_title=metric.replace("_", " ").title(),
-        )
+            seasonality = px.line(
+                seasonality_df,
+                x="month_label",
+                y=metric,
+                color="content_type",
+                markers=True,
+                title="Seasonality (monthly average across years)",
+                labels={"month_label": "Month", "content_type": "Content Type", metric: "Value"},
+            )
+            seasonality.update_layout(
+                legend_title_text="Content type",
+                margin=dict(l=20, r=20, t=50, b=20),
+                xaxis_title="Month",
+                yaxis_title=metric.replace("_", " ").title(),
+            )
 
-        yearly_df = data.kaq2_yearly[data.kaq2_yearly["content_type"].notna()].copy()
-        if types:
-            yearly_df = yearly_df[yearly_df["content_type"].isin(types)]
-        yearly = px.bar(
-            yearly_df,
-            x="content_type",
-            y=metric,
-            color="year",
-            barmode="group",
-            title="Yearly totals by content type",
-            labels={"content_type": "Content Type", "year": "Year", metric: "Value"},
-        )
-        yearly.update_layout(
-            legend_title_text="Year",
-            margin=dict(l=20, r=20, t=50, b=20),
-            xaxis_title="Content Type",
-            yaxis_title=metric.replace("_", " ").title(),
-        )
+            yearly = px.bar(
+                yearly_df,
+                x="content_type",
+                y=metric,
+                color="year",
+                barmode="group",
+                title="Yearly totals by content type",
+                labels={"content_type": "Content Type", "year": "Year", metric: "Value"},
+            )
+            yearly.update_layout(
+                legend_title_text="Year",
+                margin=dict(l=20, r=20, t=50, b=20),
+                xaxis_title="Content Type",
+                yaxis_title=metric.replace("_", " ").title(),
+            )
 
         return trend, seasonality, yearly
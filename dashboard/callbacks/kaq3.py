@@ -1,7 +1,14 @@
 import plotly.express as px
+import plotly.graph_objects as go
 from dash import Input, Output
 
 from dashboard import data
+from dashboard.figure_cache import FIGURES, clamp_range
+from dashboard.metrics import phase
+
+
+def _cache_key(start: str, end: str, segment: str | None) -> tuple:
+    return (*clamp_range(start, end, data.KAQ3_DATE_MIN, data.KAQ3_DATE_MAX), segment)
 
 
 def register(app) -> None:
@@ -10,37 +17,82 @@ def register(app) -> None:
         Output("kaq3-volume", "figure"),
         Input("kaq3-date", "start_date"),
         Input("kaq3-date", "end_date"),
+        Input("segment", "data"),
     )
+    @FIGURES.memoize("kaq3", _cache_key)
+    @data.scoped
     def update_kaq3(start: str, end: str):
-        filtered = data.filter_date(data.kaq3, "signup_month", start, end)
-        rate_fig = px.line(
-            filtered,
-            x="signup_month",
-            y="activation_rate",
-            markers=True,
-            title="Activation rate within first 7 days",
-            labels={"signup_month": "Signup Month", "activation_rate": "Activation Rate"},
-        )
-        rate_fig.update_layout(
-            yaxis_tickformat=".0%",
-            margin=dict(l=20, r=20, t=50, b=20),
-            xaxis_title="Signup Month",
-            yaxis_title="Activation Rate",
-        )
-
-        volume_fig = px.bar(
-            filtered,
-            x="signup_month",
-            y=["new_users", "activated_users"],
-            barmode="group",
-            title="New users vs activated users",
-            labels={"signup_month": "Signup Month", "value": "Users", "variable": "User Type"},
-        )
-        volume_fig.update_layout(
-            margin=dict(l=20, r=20, t=50, b=20),
-            xaxis_title="Signup Month",
-            yaxis_title="Users",
-            legend_title_text="User Type",
-        )
+        with phase("filter"):
+            filtered = data.select("kaq3", start, end)
+
+        with phase("figure"):
+            rate_fig = px.line(
+                filtered,
+                x="signup_month",
+                y="activation_rate",
+                markers=True,
+                title="Activation rate within first 7 days",
+                labels={"signup_month": "Signup Month", "activation_rate": "Activation Rate"},
+            )
+            rate_fig.update_layout(
+                yaxis_tickformat=".0%",
+                margin=dict(l=20, r=20, t=50, b=20),
+                xaxis_title="Signup Month",
+                yaxis_title="Activation Rate",
+            )
+
+            volume_fig = px.bar(
+                filtered,
+                x="signup_month",
+                y=["new_users", "activated_users"],
+                barmode="group",
+                title="New users vs activated users",
+                labels={"signup_month": "Signup Month", "value": "Users", "variable": "User Type"},
+            )
+            volume_fig.update_layout(
+                margin=dict(l=20, r=20, t=50, b=20),
+                xaxis_title="Signup Month",
+                yaxis_title="Users",
+                legend_title_text="User Type",
+            )
 
         return rate_fig, volume_fig
+
+    @app.callback(
+        Output("kaq3-retention", "figure"),
+        Input("kaq3-date", "start_date"),
+        Input("kaq3-date", "end_date"),
+        Input("segment", "data"),
+    )
+    @FIGURES.memoize("kaq3-retention", _cache_key)
+    @data.scoped
+    def update_retention(start: str, end: str):
+        with phase("filter"):
+            filtered = data.select("retention", start, end)
+            matrix = filtered.pivot(index="signup_month", columns="week", values="retention_rate")
+
+        with phase("figure"):
+            # Recent cohorts have not been observed for every week yet; their cells stay empty.
+            fig = go.Figure(
+                go.Heatmap(
+                    z=matrix.to_numpy(),
+                    x=[f"Week {week}" for week in matrix.columns],
+                    y=matrix.index.strftime("%b %Y"),
+                    zmin=0,
+                    zmax=1,
+                    colorscale="Blues",
+                    colorbar=dict(tickformat=".0%", title="Retained"),
+                    texttemplate="%{z:.0%}",
+                    hovertemplate="%{y}, %{x}: %{z:.1%}<extra></extra>",
+                )
+            )
+            fig.update_layout(
+                title="Weekly retention by signup month",
+                margin=dict(l=20, r=20, t=50, b=20),
+                xaxis_title="Weeks since signup",
+                yaxis_title="Signup Month",
+                yaxis_autorange="reversed",
+                height=max(400, 22 * len(matrix) + 120),
+            )
+
+        return fig
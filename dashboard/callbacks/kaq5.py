@@ -2,6 +2,12 @@ import plotly.express as px
 from dash import Input, Output
 
 from dashboard import data
+from dashboard.figure_cache import FIGURES, clamp_range
+from dashboard.metrics import phase
+
+
+def _cache_key(start: str, end: str, segment: str | None) -> tuple:
+    return (*clamp_range(start, end, data.KAQ5_DATE_MIN, data.KAQ5_DATE_MAX), segment)
 
 
 def register(app) -> None:
@@ -10,39 +16,45 @@ def register(app) -> None:
         Output("kaq5-events", "figure"),
         Input("kaq5-date", "start_date"),
         Input("kaq5-date", "end_date"),
+        Input("segment", "data"),
     )
+    @FIGURES.memoize("kaq5", _cache_key)
+    @data.scoped
     def update_kaq5(start: str, end: str):
-        filtered = data.filter_date(data.kaq5, "year_month", start, end)
-        prop_fig = px.area(
-            filtered,
-            x="year_month",
-            y="proportion",
-            color="work_mode",
-            title="Share of activity by work mode",
-            groupnorm="fraction",
-            labels={"year_month": "Time", "work_mode": "Work Mode", "proportion": "Share"},
-        )
-        prop_fig.update_layout(
-            legend_title_text="Work mode",
-            margin=dict(l=20, r=20, t=50, b=20),
-            xaxis_title="Time",
-            yaxis_title="Share of Activity",
-        )
-
-        events_fig = px.bar(
-            filtered,
-            x="year_month",
-            y="events",
-            color="work_mode",
-            barmode="group",
-            title="Event volume by work mode",
-            labels={"year_month": "Time", "work_mode": "Work Mode", "events": "Events"},
-        )
-        events_fig.update_layout(
-            legend_title_text="Work mode",
-            margin=dict(l=20, r=20, t=50, b=20),
-            xaxis_title="Time",
-            yaxis_title="Events",
-        )
+        with phase("filter"):
+            filtered = data.select("kaq5", start, end)
+
+        with phase("figure"):
+            prop_fig = px.area(
+                filtered,
+                x="year_month",
+                y="proportion",
+                color="work_mode",
+                title="Share of activity by work mode",
+                groupnorm="fraction",
+                labels={"year_month": "Time", "work_mode": "Work Mode", "proportion": "Share"},
+            )
+            prop_fig.update_layout(
+                legend_title_text="Work mode",
+                margin=dict(l=20, r=20, t=50, b=20),
+                xaxis_title="Time",
+                yaxis_title="Share of Activity",
+            )
+
+            events_fig = px.bar(
+                filtered,
+                x="year_month",
+                y="events",
+                color="work_mode",
+                barmode="group",
+                title="Event volume by work mode",
+                labels={"year_month": "Time", "work_mode": "Work Mode", "events": "Events"},
+            )
+            events_fig.update_layout(
+                legend_title_text="Work mode",
+                margin=dict(l=20, r=20, t=50, b=20),
+                xaxis_title="Time",
+                yaxis_title="Events",
+            )
 
         return prop_fig, events_fig
@@ -0,0 +1,28 @@
+from dash import Input, Output, html, no_update
+
+from dashboard import data
+from dashboard.engine.segment import SegmentError, canonical
+
+
+def register(app) -> None:
+    @app.callback(
+        Output("segment", "data"),
+        Output("segment-status", "children"),
+        Input("segment-query", "value"),
+    )
+    def update_segment(expression: str | None):
+        """Validate the typed expression and publish its canonical form to the KAQ callbacks."""
+        if data.RESULT_SOURCE != "star":
+            return None, ""
+        try:
+            scope = canonical(expression)
+            if scope is None:
+                return None, "All users"
+            users = len(data.segments.evaluate(scope))
+            if not users:
+                raise SegmentError(f"{scope} matches no users")
+        except SegmentError as exc:
+            # Keep showing the last valid segment until the expression is fixed.
+            return no_update, html.Span(str(exc), className="segment-error")
+        total = len(data.segments.universe)
+        return scope, f"{scope}: {users:,} of {total:,} users ({users / max(total, 1):.1%})"
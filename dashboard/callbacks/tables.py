@@ -0,0 +1,26 @@
+from dash import Input, Output
+
+from dashboard.constants import RAW_TABLES
+from dashboard.metrics import phase
+from dashboard.table_query import query_page
+
+
+def _register_table(app, table_id: str) -> None:
+    @app.callback(
+        Output(table_id, "data"),
+        Output(table_id, "page_count"),
+        Input(table_id, "page_current"),
+        Input(table_id, "page_size"),
+        Input(table_id, "sort_by"),
+        Input(table_id, "filter_query"),
+        # The first page is part of the layout (ui.server_datatable).
+        prevent_initial_call=True,
+    )
+    def update_table(page_current: int, page_size: int, sort_by: list[dict], filter_query: str):
+        with phase("filter"):
+            return query_page(table_id, page_current, page_size, sort_by, filter_query)
+
+
+def register(app) -> None:
+    for table_id in RAW_TABLES:
+        _register_table(app, table_id)
@@ -0,0 +1,18 @@
+from dash import Input, Output, State, no_update
+from dash.exceptions import PreventUpdate
+
+from dashboard.layout import TABS, tab_body_id
+
+
+def register(app) -> None:
+    @app.callback(
+        [Output(tab_body_id(tab), "children") for tab in TABS],
+        Input("tabs", "value"),
+        [State(tab_body_id(tab), "children") for tab in TABS],
+    )
+    def render_tab(selected: str, *bodies):
+        """Build a tab's content the first time it is selected and keep it afterwards."""
+        tabs = list(TABS)
+        if selected not in TABS or bodies[tabs.index(selected)] is not None:
+            raise PreventUpdate
+        return [TABS[tab].build_content() if tab == selected else no_update for tab in tabs]
@@ -0,0 +1,72 @@
+from dash import dcc, html
+
+from dashboard import data
+from dashboard.engine.funnel import DEFAULT_STEPS
+
+
+LABEL = "Funnels"
+
+BREAKDOWN_OPTIONS = [
+    {"label": "Subscription tier", "value": "subscription_tier"},
+    {"label": "Platform", "value": "platform"},
+    {"label": "Signup month", "value": "signup_month"},
+]
+
+
+def build_content() -> list:
+    if data.RESULT_SOURCE != "star":
+        return [
+            html.Div(
+                className="panel",
+                children=html.P(
+                    "Funnels are computed from every user's events and need the star engine "
+                    "(DASHBOARD_SOURCE=star)."
+                ),
+            )
+        ]
+    steps = data.funnels.steps
+    return [
+        html.Div(
+            className="controls",
+            children=[
+                html.Div(
+                    [
+                        html.Label("Steps, in order"),
+                        dcc.Dropdown(
+                            id="funnel-steps",
+                            options=[{"label": step.replace("_", " ").title(), "value": step} for step in steps],
+                            value=[step for step in DEFAULT_STEPS if step in steps],
+                            multi=True,
+                        ),
+                    ],
+                    className="control",
+                ),
+                html.Div(
+                    [
+                        html.Label("Days to convert"),
+                        dcc.Input(id="funnel-window", type="number", min=1, max=365, step=1, value=7, debounce=True),
+                    ],
+                    className="control",
+                ),
+                html.Div(
+                    [
+                        html.Label("Break down by"),
+                        dcc.Dropdown(
+                            id="funnel-by",
+                            options=BREAKDOWN_OPTIONS,
+                            value=None,
+                            placeholder="All users",
+                        ),
+                    ],
+                    className="control",
+                ),
+            ],
+        ),
+        html.Div(
+            className="grid-2",
+            children=[
+                dcc.Graph(id="funnel-conversion"),
+                dcc.Graph(id="funnel-dropoff"),
+            ],
+        ),
+    ]
@@ -12,3 +12,24 @@ MONTH_LABELS = {
     11: "Nov",
     12: "Dec",
 }
+
+# Shared category order of every dimension label, so the same label has the same
+# code in every frame. Labels not listed here are appended in sorted order.
+LABEL_CATEGORIES = {
+    "subscription_tier": ("Business", "Enterprise", "Free", "Plus"),
+    "content_type": ("database", "page", "task_board", "wiki"),
+    "platform": ("desktop", "mobile", "web"),
+    "work_mode": ("collaborative", "individual"),
+}
+
+# Raw-data tables rendered with server-side paging, mapped to their dataset.
+RAW_TABLES = {
+    "kaq1-table": "kaq1",
+    "kaq2-table": "kaq2",
+    "kaq3-table": "kaq3",
+    "kaq4-table": "kaq4",
+    "kaq5-table": "kaq5",
+    "aq1-table": "aq1",
+    "aq2-table": "aq2",
+}
+TABLE_PAGE_SIZE = 12
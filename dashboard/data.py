@@ -1,17 +1,71 @@
 from __future__ import annotations
 
+import functools
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
 from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator
 
+import numpy as np
 import pandas as pd
 
+from dashboard.cache import cached_frame, data_version
+from dashboard.constants import LABEL_CATEGORIES
+from dashboard.engine.cohort import COHORT_RESULTS, CohortActivity
+from dashboard.engine.cube import CUBE_DIR, CUBE_RESULTS, Cube, read_meta
+from dashboard.engine.funnel import FunnelEvents
+from dashboard.engine.query import RESULT_QUERIES
+from dashboard.engine.segment import SegmentIndex, canonical
+from dashboard.engine.star import StarSchema, star_files
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 RESULTS_DIR = BASE_DIR / "results"
 
+# "csv" reads the frozen results/*.csv snapshots; "star" computes the same result
+# sets in process from an exported star schema (see dashboard/engine).
+RESULT_SOURCE = os.environ.get("DASHBOARD_SOURCE", "csv")
+
+# Frames are built on first attribute access (``data.kaq1_monthly_tier``) and
+# memoized, so importing this module does no I/O. ``preload`` warms them up.
+_BUILDERS: dict[str, Callable[[], Any]] = {}
+_LOADED: dict[str, Any] = {}
+_LOCK = threading.RLock()
+# One build lock per dataset and segment (``None`` outside segments), so a slow
+# build only holds up readers of that dataset. ``_LOCK`` guards the registries.
+_BUILD_LOCKS: dict[str | None, dict[str, threading.RLock]] = {}
+
+# Inside ``segment(expression)`` every dataset except ``UNSCOPED`` is computed
+# from the star restricted to the segment's users and kept in a small LRU of
+# segments, so the KAQ figures can be drawn for any segment.
+UNSCOPED = frozenset({"cube", "segments", "DATA_VERSION"})
+SEGMENT_CACHE_SIZE = max(1, int(os.environ.get("DASHBOARD_SEGMENT_CACHE_SIZE", "8")))
+_SEGMENT: ContextVar[str | None] = ContextVar("dashboard_segment", default=None)
+_SCOPED: OrderedDict[str, dict[str, Any]] = OrderedDict()
+
 
 def load_csv(name: str) -> pd.DataFrame:
     return pd.read_csv(RESULTS_DIR / f"{name}.csv")
 
 
+def read_result(name: str) -> pd.DataFrame:
+    if RESULT_SOURCE == "star":
+        # The cube has no user axis, so segments aggregate their restricted star.
+        cube = name in CUBE_RESULTS and _SEGMENT.get() is None
+        source = "cube" if cube else "cohorts" if name in COHORT_RESULTS else "star"
+        return RESULT_QUERIES[name](get(source))
+    return load_csv(name)
+
+
+def _typed(name: str, build: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+    if RESULT_SOURCE == "star":
+        return build()
+    return cached_frame(RESULTS_DIR / f"{name}.csv", build)
+
+
 def add_year_month(df: pd.DataFrame, year_col: str = "year", month_col: str = "month") -> pd.DataFrame:
     df = df.copy()
     df[year_col] = pd.to_numeric(df[year_col], errors="coerce")
@@ -22,50 +76,466 @@ def add_year_month(df: pd.DataFrame, year_col: str = "year", month_col: str = "m
     return df
 
 
+# Column roles per result set: dimension labels become Categoricals with the
+# shared order from ``LABEL_CATEGORIES``, counts the narrowest integer type that
+# holds them and rates float32.
+RESULT_TYPES: dict[str, dict[str, tuple[str, ...]]] = {
+    "kaq1": dict(labels=("subscription_tier",), counts=("dau", "events"), rates=("events_per_active_user",)),
+    "kaq2": dict(labels=("content_type",), counts=("events", "dau"), rates=("events_per_active_user",)),
+    "kaq3": dict(dates=("signup_month",), counts=("new_users", "activated_users"), rates=("activation_rate",)),
+    "kaq4": dict(labels=("platform",), counts=("events", "dau"), rates=("avg_session_duration_sec",)),
+    "kaq5": dict(labels=("work_mode",), counts=("events",), rates=("proportion",)),
+    "aq1": dict(labels=("content_type",), counts=("events", "content_type_rank")),
+    "aq2": dict(
+        dates=("month_start",),
+        counts=("dau_current_month", "dau_previous_month", "abs_change"),
+        rates=("rel_change",),
+    ),
+    "retention": dict(
+        dates=("signup_month",),
+        counts=("week", "cohort_users", "active_users"),
+        rates=("retention_rate",),
+    ),
+}
+
+
+def label_dtype(column: str, values: pd.Series) -> pd.CategoricalDtype:
+    known = LABEL_CATEGORIES.get(column, ())
+    extra = sorted(set(values.dropna().astype(str)) - set(known))
+    return pd.CategoricalDtype([*known, *extra])
+
+
+def narrow_count(values: pd.Series) -> pd.Series:
+    """Smallest signed integer type holding ``values``; float32 when values are missing.
+
+    float32 represents every integer below 2**24 exactly, which covers the
+    nullable counts (e.g. the previous month's DAU) without an extension type.
+    """
+    values = pd.to_numeric(values, errors="coerce")
+    if values.isna().any():
+        return values.astype("float32" if values.abs().max() < 2**24 else "float64")
+    lo, hi = (values.min(), values.max()) if len(values) else (0, 0)
+    for dtype in (np.int8, np.int16, np.int32):
+        info = np.iinfo(dtype)
+        if info.min <= lo and hi <= info.max:
+            return values.astype(dtype)
+    return values.astype(np.int64)
+
+
+def resolve_types(
+    df: pd.DataFrame,
+    dates: tuple[str, ...] = (),
+    labels: tuple[str, ...] = (),
+    ints: tuple[str, ...] = (),
+    counts: tuple[str, ...] = (),
+    rates: tuple[str, ...] = (),
+) -> pd.DataFrame:
+    for col in dates:
+        df[col] = pd.to_datetime(df[col], errors="coerce")
+    for col in labels:
+        df[col] = df[col].astype(label_dtype(col, df[col]))
+    for col in ints:
+        df[col] = pd.to_numeric(df[col], errors="coerce").astype("Int16")
+    for col in counts:
+        df[col] = narrow_count(df[col])
+    for col in rates:
+        df[col] = pd.to_numeric(df[col], errors="coerce").astype("float32")
+    return df
+
+
+def load_result(name: str) -> pd.DataFrame:
+    """Load result set ``name`` with the column types from ``RESULT_TYPES``.
+
+    CSV snapshots go through the Parquet cache; star-engine results are cheap
+    enough to recompute.
+    """
+    return _typed(name, lambda: resolve_types(read_result(name), **RESULT_TYPES[name]))
+
+
+def _load_monthly(name: str) -> pd.DataFrame:
+    return _typed(
+        name,
+        lambda: resolve_types(add_year_month(read_result(name)), ints=("year", "month"), **RESULT_TYPES[name]),
+    )
+
+
+def memory_report() -> list[dict[str, Any]]:
+    """Bytes per result set as parsed from the source and as typed for the dashboard."""
+    rows = []
+    for name in RESULT_TYPES:
+        raw = read_result(name)
+        typed = get(name)
+        rows.append(
+            {
+                "name": name,
+                "rows": len(typed),
+                "raw_bytes": int(raw.memory_usage(deep=True).sum()),
+                "typed_bytes": int(typed.memory_usage(deep=True).sum()),
+            }
+        )
+    return rows
+
+
+@lru_cache(maxsize=1024)
+def _timestamp(value: str) -> pd.Timestamp:
+    return pd.Timestamp(value)
+
+
 def filter_date(df: pd.DataFrame, date_col: str, start: str | None, end: str | None) -> pd.DataFrame:
     filtered = df
     if start:
-        filtered = filtered[filtered[date_col] >= pd.to_datetime(start)]
+        filtered = filtered[filtered[date_col] >= _timestamp(start)]
     if end:
-        filtered = filtered[filtered[date_col] <= pd.to_datetime(end)]
+        filtered = filtered[filtered[date_col] <= _timestamp(end)]
     return filtered
 
 
-kaq1 = add_year_month(load_csv("kaq1"))
-kaq2 = add_year_month(load_csv("kaq2"))
-kaq3 = load_csv("kaq3")
-kaq3["signup_month"] = pd.to_datetime(kaq3["signup_month"], errors="coerce")
-kaq4 = add_year_month(load_csv("kaq4"))
-kaq5 = add_year_month(load_csv("kaq5"))
-aq1 = load_csv("aq1")
-aq2 = load_csv("aq2")
-aq2["month_start"] = pd.to_datetime(aq2["month_start"], errors="coerce")
-
-kaq1_monthly = kaq1[kaq1["year_month"].notna()].copy()
-kaq1_monthly_tier = kaq1_monthly[kaq1_monthly["subscription_tier"].notna()].copy()
-kaq1_monthly_overall = kaq1_monthly[kaq1_monthly["subscription_tier"].isna()].copy()
-kaq1_totals = kaq1[kaq1["year"].isna() & kaq1["month"].isna()].copy()
-
-kaq2_monthly = kaq2[kaq2["year_month"].notna()].copy()
-kaq2_monthly_type = kaq2_monthly[kaq2_monthly["content_type"].notna()].copy()
-kaq2_monthly_overall = kaq2_monthly[kaq2_monthly["content_type"].isna()].copy()
-kaq2_yearly = kaq2[kaq2["year"].notna() & kaq2["month"].isna()].copy()
-kaq2_totals = kaq2[kaq2["year"].isna() & kaq2["month"].isna()].copy()
-
-kaq4_monthly = kaq4[kaq4["year_month"].notna()].copy()
-kaq4_monthly_platform = kaq4_monthly[kaq4_monthly["platform"].notna()].copy()
-kaq4_monthly_overall = kaq4_monthly[kaq4_monthly["platform"].isna()].copy()
-kaq4_totals = kaq4[kaq4["year"].isna() & kaq4["month"].isna()].copy()
-
-kaq5["work_mode"] = kaq5["work_mode"].astype(str)
-
-KAQ1_DATE_MIN = kaq1_monthly["year_month"].min()
-KAQ1_DATE_MAX = kaq1_monthly["year_month"].max()
-KAQ2_DATE_MIN = kaq2_monthly["year_month"].min()
-KAQ2_DATE_MAX = kaq2_monthly["year_month"].max()
-KAQ3_DATE_MIN = kaq3["signup_month"].min()
-KAQ3_DATE_MAX = kaq3["signup_month"].max()
-KAQ4_DATE_MIN = kaq4_monthly["year_month"].min()
-KAQ4_DATE_MAX = kaq4_monthly["year_month"].max()
-KAQ5_DATE_MIN = kaq5["year_month"].min()
-KAQ5_DATE_MAX = kaq5["year_month"].max()
+class SeriesIndex:
+    """Binary-search date filtering over a frame sorted by (label, date).
+
+    ``offsets`` maps every label to its ``[lo, hi)`` row range, so selecting
+    labels and a date range is one ``searchsorted`` pair per label instead of
+    boolean masks over the whole frame.
+    """
+
+    def __init__(self, frame: pd.DataFrame, date_col: str, label_col: str | None = None):
+        keys = [label_col, date_col] if label_col else [date_col]
+        if not _is_sorted(frame, keys):
+            frame = frame.sort_values(keys, kind="stable")
+        self.frame = frame
+        # NaT is the smallest int64 and sorts first within each label.
+        self.dates = frame[date_col].to_numpy("datetime64[ns]").view("i8")
+        if label_col is None:
+            self.offsets = {None: (0, len(frame))}
+        else:
+            labels = frame[label_col].astype(object).to_numpy()
+            starts = np.flatnonzero(np.r_[True, labels[1:] != labels[:-1]]) if len(labels) else np.array([], int)
+            bounds = np.r_[starts, len(labels)]
+            self.offsets = {labels[lo]: (int(lo), int(hi)) for lo, hi in zip(bounds[:-1], bounds[1:])}
+
+    def positions(self, start: str | None, end: str | None, labels: Iterable[str] | None = None) -> list[tuple[int, int]]:
+        keys = list(self.offsets) if not labels or None in self.offsets else [l for l in labels if l in self.offsets]
+        first = _timestamp(start).value if start else np.iinfo(np.int64).min + 1
+        last = _timestamp(end).value if end else np.iinfo(np.int64).max
+        ranges = []
+        for key in sorted(keys, key=lambda k: self.offsets[k][0]):
+            lo, hi = self.offsets[key]
+            segment = self.dates[lo:hi]
+            if start or end:
+                lo, hi = lo + segment.searchsorted(first, "left"), lo + segment.searchsorted(last, "right")
+            if hi > lo:
+                ranges.append((lo, hi))
+        return ranges
+
+    def select(self, start: str | None, end: str | None, labels: Iterable[str] | None = None) -> pd.DataFrame:
+        ranges = self.positions(start, end, labels)
+        if len(ranges) == 1 or (ranges and all(a[1] == b[0] for a, b in zip(ranges, ranges[1:]))):
+            return self.frame.iloc[ranges[0][0] : ranges[-1][1]]
+        if not ranges:
+            return self.frame.iloc[:0]
+        return self.frame.take(np.concatenate([np.arange(lo, hi) for lo, hi in ranges]))
+
+
+def _is_sorted(frame: pd.DataFrame, keys: list[str]) -> bool:
+    if len(frame) < 2:
+        return True
+    columns = [
+        frame[key].cat.codes.to_numpy() if isinstance(frame[key].dtype, pd.CategoricalDtype) else frame[key].to_numpy()
+        for key in keys
+    ]
+    return bool((np.lexsort(columns[::-1]) == np.arange(len(frame))).all())
+
+
+def select(name: str, start: str | None, end: str | None, labels: Iterable[str] | None = None) -> pd.DataFrame:
+    """Rows of dataset ``name`` between ``start`` and ``end`` (inclusive), optionally only ``labels``.
+
+    Same rows as ``filter_date`` plus an ``isin`` on the label column, found by
+    binary search on the dataset's ``SeriesIndex``.
+    """
+    return get(f"{name}.index").select(start, end, labels)
+
+
+def dataset(name: str) -> Callable[[Callable[[], Any]], Callable[[], Any]]:
+    def decorator(build: Callable[[], Any]) -> Callable[[], Any]:
+        _BUILDERS[name] = build
+        return build
+
+    return decorator
+
+
+def get(name: str) -> Any:
+    scope = _SEGMENT.get()
+    if scope is not None and name not in UNSCOPED:
+        return _get_scoped(scope, name)
+    try:
+        return _LOADED[name]
+    except KeyError:
+        pass
+    with _build_lock(None, name):
+        try:
+            return _LOADED[name]
+        except KeyError:
+            pass
+        token = _SEGMENT.set(None)
+        try:
+            value = _LOADED[name] = _BUILDERS[name]()
+        finally:
+            _SEGMENT.reset(token)
+        return value
+
+
+def _get_scoped(scope: str, name: str) -> Any:
+    with _LOCK:
+        loaded = _SCOPED.get(scope)
+        if loaded is None:
+            loaded = _SCOPED[scope] = {}
+            while len(_SCOPED) > SEGMENT_CACHE_SIZE:
+                evicted, _ = _SCOPED.popitem(last=False)
+                _BUILD_LOCKS.pop(evicted, None)
+        _SCOPED.move_to_end(scope)
+        if name in loaded:
+            return loaded[name]
+    with _build_lock(scope, name):
+        if name not in loaded:
+            loaded[name] = _BUILDERS[name]()
+        return loaded[name]
+
+
+def _build_lock(scope: str | None, name: str) -> threading.RLock:
+    with _LOCK:
+        return _BUILD_LOCKS.setdefault(scope, {}).setdefault(name, threading.RLock())
+
+
+@contextmanager
+def segment(expression: str | None) -> Iterator[str | None]:
+    """Compute datasets for the users matching ``expression`` (see ``engine.segment``) in this block.
+
+    An empty expression means all users. Yields the canonical expression.
+    """
+    scope = canonical(expression)
+    if scope is not None and RESULT_SOURCE != "star":
+        raise RuntimeError("segments need the star engine (DASHBOARD_SOURCE=star)")
+    token = _SEGMENT.set(scope)
+    try:
+        yield scope
+    finally:
+        _SEGMENT.reset(token)
+
+
+def scoped(func: Callable) -> Callable:
+    """Run ``func`` inside ``segment(expression)``, taking the expression as its last argument.
+
+    For callbacks with a trailing ``Input("segment", "data")``.
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args):
+        *args, expression = args
+        with segment(expression):
+            return func(*args)
+
+    return wrapper
+
+
+def is_loaded(name: str) -> bool:
+    return name in _LOADED
+
+
+def preload(names: Iterable[str] | None = None, background: bool = False) -> threading.Thread | None:
+    """Build the given datasets (all by default), optionally in a daemon thread."""
+    names = list(_BUILDERS if names is None else names)
+
+    def run() -> None:
+        for name in names:
+            get(name)
+
+    if not background:
+        run()
+        return None
+    thread = threading.Thread(target=run, name="dashboard-data-preload", daemon=True)
+    thread.start()
+    return thread
+
+
+def serving_datasets() -> list[str]:
+    """Datasets the dashboard reads in the configured mode (the star engine only in star mode)."""
+    engine = ("star", "cube", "cohorts", "funnels", "segments")
+    return [name for name in _BUILDERS if RESULT_SOURCE == "star" or name not in engine]
+
+
+def clear() -> None:
+    with _LOCK:
+        _LOADED.clear()
+        _SCOPED.clear()
+        _BUILD_LOCKS.clear()
+
+
+def install(name: str, value: Any) -> None:
+    """Use ``value`` for dataset ``name`` until the next ``clear`` (benchmarks swap in scaled results)."""
+    with _LOCK:
+        _LOADED[name] = value
+
+
+def __getattr__(name: str) -> Any:
+    if name in _BUILDERS:
+        return get(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_BUILDERS))
+
+
+def _split(name: str, source: str, mask: Callable[[pd.DataFrame], pd.Series], order: tuple[str, ...] = ()) -> None:
+    def build() -> pd.DataFrame:
+        df = get(source)
+        df = df[mask(df)]
+        return df.sort_values(list(order), kind="stable") if order else df.copy()
+
+    _BUILDERS[name] = build
+
+
+def _index(name: str, date_col: str, label_col: str | None = None) -> None:
+    _BUILDERS[f"{name}.index"] = lambda: SeriesIndex(get(name), date_col, label_col)
+
+
+def _date_bounds(prefix: str, source: str, date_col: str) -> None:
+    _BUILDERS[f"{prefix}_DATE_MIN"] = lambda: get(source)[date_col].min()
+    _BUILDERS[f"{prefix}_DATE_MAX"] = lambda: get(source)[date_col].max()
+
+
+@dataset("kaq1")
+def _kaq1() -> pd.DataFrame:
+    return _load_monthly("kaq1")
+
+
+@dataset("kaq2")
+def _kaq2() -> pd.DataFrame:
+    return _load_monthly("kaq2")
+
+
+@dataset("kaq3")
+def _kaq3() -> pd.DataFrame:
+    return load_result("kaq3")
+
+
+@dataset("kaq4")
+def _kaq4() -> pd.DataFrame:
+    return _load_monthly("kaq4")
+
+
+@dataset("kaq5")
+def _kaq5() -> pd.DataFrame:
+    return _load_monthly("kaq5")
+
+
+@dataset("aq1")
+def _aq1() -> pd.DataFrame:
+    return load_result("aq1")
+
+
+@dataset("aq2")
+def _aq2() -> pd.DataFrame:
+    return load_result("aq2")
+
+
+@dataset("retention")
+def _retention() -> pd.DataFrame:
+    return load_result("retention")
+
+
+@dataset("star")
+def _star() -> StarSchema:
+    """The exported star schema, or inside ``segment`` its rows for the segment's users."""
+    scope = _SEGMENT.get()
+    if scope is None:
+        return StarSchema.load()
+    users = get("segments").users(scope)
+    with segment(None):
+        return get("star").restrict(users)
+
+
+@dataset("cube")
+def _cube() -> Cube:
+    """The persisted cube when it matches the star export, otherwise a fresh build."""
+    if read_meta(CUBE_DIR).get("source_version") == get("DATA_VERSION"):
+        try:
+            return Cube.load(CUBE_DIR)
+        except (OSError, ValueError):
+            pass
+    cube = Cube.build(get("star"))
+    try:
+        cube.save(CUBE_DIR, source_version=get("DATA_VERSION"))
+    except OSError:
+        pass
+    return cube
+
+
+@dataset("cohorts")
+def _cohorts() -> CohortActivity:
+    return CohortActivity(get("star"))
+
+
+@dataset("funnels")
+def _funnels() -> FunnelEvents:
+    return FunnelEvents(get("star"))
+
+
+@dataset("segments")
+def _segments() -> SegmentIndex:
+    return SegmentIndex.build(get("star"))
+
+
+@dataset("DATA_VERSION")
+def _data_version() -> str:
+    """Combined content hash of the source files, used to key derived caches."""
+    paths = star_files() if RESULT_SOURCE == "star" else sorted(RESULTS_DIR.glob("*.csv"))
+    return data_version(RESULT_SOURCE, paths)
+
+
+_split("kaq1_monthly", "kaq1", lambda df: df["year_month"].notna())
+_split("kaq1_monthly_tier", "kaq1_monthly", lambda df: df["subscription_tier"].notna(), ("subscription_tier", "year_month"))
+_split("kaq1_monthly_overall", "kaq1_monthly", lambda df: df["subscription_tier"].isna(), ("year_month",))
+_split("kaq1_totals", "kaq1", lambda df: df["year"].isna() & df["month"].isna())
+
+_split("kaq2_monthly", "kaq2", lambda df: df["year_month"].notna())
+_split("kaq2_monthly_type", "kaq2_monthly", lambda df: df["content_type"].notna(), ("content_type", "year_month"))
+_split("kaq2_monthly_overall", "kaq2_monthly", lambda df: df["content_type"].isna(), ("year_month",))
+_split("kaq2_yearly", "kaq2", lambda df: df["year"].notna() & df["month"].isna())
+_split("kaq2_totals", "kaq2", lambda df: df["year"].isna() & df["month"].isna())
+
+_split("kaq4_monthly", "kaq4", lambda df: df["year_month"].notna())
+_split("kaq4_monthly_platform", "kaq4_monthly", lambda df: df["platform"].notna(), ("platform", "year_month"))
+_split("kaq4_monthly_overall", "kaq4_monthly", lambda df: df["platform"].isna(), ("year_month",))
+_split("kaq4_totals", "kaq4", lambda df: df["year"].isna() & df["month"].isna())
+
+_index("kaq1_monthly_tier", "year_month", "subscription_tier")
+_index("kaq1_monthly_overall", "year_month")
+_index("kaq2_monthly_type", "year_month", "content_type")
+_index("kaq2_monthly_overall", "year_month")
+_index("kaq3", "signup_month")
+_index("retention", "signup_month")
+_index("kaq4_monthly_platform", "year_month", "platform")
+_index("kaq4_monthly_overall", "year_month")
+_index("kaq5", "year_month")
+
+_date_bounds("KAQ1", "kaq1_monthly", "year_month")
+_date_bounds("KAQ2", "kaq2_monthly", "year_month")
+_date_bounds("KAQ3", "kaq3", "signup_month")
+_date_bounds("KAQ4", "kaq4_monthly", "year_month")
+_date_bounds("KAQ5", "kaq5", "year_month")
+
+
+def main() -> None:
+    print(f"{'result':8} {'rows':>6} {'parsed':>10} {'typed':>10} {'saved':>7}")
+    total_raw = total_typed = 0
+    for row in memory_report():
+        total_raw += row["raw_bytes"]
+        total_typed += row["typed_bytes"]
+        saved = 1 - row["typed_bytes"] / row["raw_bytes"]
+        print(f"{row['name']:8} {row['rows']:>6} {row['raw_bytes']:>10,} {row['typed_bytes']:>10,} {saved:>7.0%}")
+    print(f"{'total':8} {'':>6} {total_raw:>10,} {total_typed:>10,} {1 - total_typed / total_raw:>7.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+from typing import Iterable
+
+import numpy as np
+
+# A container holds the low 16 bits of the values sharing their high bits: a
+# sorted uint16 array while it has at most ARRAY_LIMIT values, otherwise a
+# 65536-bit bitset of uint64 words (the Roaring layout, Lemire et al.).
+ARRAY_LIMIT = 4096
+WORDS = 1 << 10
+
+_BIT = np.left_shift(np.uint64(1), np.arange(64, dtype=np.uint64))
+
+
+def _is_bitset(container: np.ndarray) -> bool:
+    return container.dtype == np.uint64
+
+
+def _to_bitset(low: np.ndarray) -> np.ndarray:
+    words = np.zeros(WORDS, dtype=np.uint64)
+    np.bitwise_or.at(words, low >> 6, _BIT[low & 63])
+    return words
+
+
+def _to_array(words: np.ndarray) -> np.ndarray:
+    return np.flatnonzero(np.unpackbits(words.view(np.uint8), bitorder="little")).astype(np.uint16)
+
+
+def _cardinality(container: np.ndarray) -> int:
+    if _is_bitset(container):
+        return int(np.unpackbits(container.view(np.uint8)).sum())
+    return len(container)
+
+
+def _compact(container: np.ndarray) -> np.ndarray | None:
+    """Container in its smaller form, or ``None`` when it is empty."""
+    if _is_bitset(container):
+        if not container.any():
+            return None
+        return _to_array(container) if _cardinality(container) <= ARRAY_LIMIT else container
+    if not len(container):
+        return None
+    return _to_bitset(container) if len(container) > ARRAY_LIMIT else container
+
+
+def _contains(words: np.ndarray, low: np.ndarray) -> np.ndarray:
+    return (words[low >> 6] & _BIT[low & 63]) != 0
+
+
+def _and(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    if _is_bitset(a) and _is_bitset(b):
+        return a & b
+    if _is_bitset(a):
+        a, b = b, a
+    if _is_bitset(b):
+        return a[_contains(b, a)]
+    return np.intersect1d(a, b, assume_unique=True)
+
+
+def _or(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    if not _is_bitset(a) and not _is_bitset(b):
+        return np.union1d(a, b)
+    a = a if _is_bitset(a) else _to_bitset(a)
+    b = b if _is_bitset(b) else _to_bitset(b)
+    return a | b
+
+
+def _andnot(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    if _is_bitset(a):
+        return a & ~(b if _is_bitset(b) else _to_bitset(b))
+    if _is_bitset(b):
+        return a[~_contains(b, a)]
+    return np.setdiff1d(a, b, assume_unique=True)
+
+
+class Bitmap:
+    """Compressed set of non-negative 32-bit integers supporting ``&``, ``|``, ``-`` and ``^``.
+
+    Values are split by their high 16 bits into containers, so sparse sets
+    cost two bytes per value and dense ones at most 8 KiB per 65536 values.
+    Bitmaps are immutable; every operation returns a new one.
+    """
+
+    __slots__ = ("keys", "containers")
+
+    def __init__(self, keys: Iterable[int] = (), containers: Iterable[np.ndarray] = ()):
+        self.keys = np.asarray(list(keys), dtype=np.uint16)
+        self.containers = list(containers)
+
+    @classmethod
+    def from_values(cls, values: Iterable[int] | np.ndarray) -> "Bitmap":
+        values = np.unique(np.asarray(values, dtype=np.int64))
+        if len(values) and (values[0] < 0 or values[-1] >= 1 << 32):
+            raise ValueError("bitmap values must be in [0, 2**32)")
+        high = values >> 16
+        starts = np.flatnonzero(np.r_[True, high[1:] != high[:-1]]) if len(values) else np.array([], dtype=int)
+        bounds = np.r_[starts, len(values)]
+        keys, containers = [], []
+        for lo, hi in zip(bounds[:-1], bounds[1:]):
+            keys.append(int(high[lo]))
+            containers.append(_compact((values[lo:hi] & 0xFFFF).astype(np.uint16)))
+        return cls(keys, containers)
+
+    @classmethod
+    def range(cls, stop: int) -> "Bitmap":
+        """All values in ``[0, stop)``."""
+        return cls.from_values(np.arange(stop))
+
+    def to_array(self) -> np.ndarray:
+        parts = [
+            (int(key) << 16) + (_to_array(c) if _is_bitset(c) else c).astype(np.int64)
+            for key, c in zip(self.keys, self.containers)
+        ]
+        return np.concatenate(parts) if parts else np.array([], dtype=np.int64)
+
+    def _merge(self, other: "Bitmap", op, keep_left: bool, keep_right: bool) -> "Bitmap":
+        left = dict(zip(self.keys.tolist(), self.containers))
+        right = dict(zip(other.keys.tolist(), other.containers))
+        keys, containers = [], []
+        for key in sorted(left.keys() | right.keys()):
+            if key in left and key in right:
+                container = _compact(op(left[key], right[key]))
+            elif key in left:
+                container = left[key] if keep_left else None
+            else:
+                container = right[key] if keep_right else None
+            if container is not None:
+                keys.append(key)
+                containers.append(container)
+        return Bitmap(keys, containers)
+
+    def __and__(self, other: "Bitmap") -> "Bitmap":
+        return self._merge(other, _and, False, False)
+
+    def __or__(self, other: "Bitmap") -> "Bitmap":
+        return self._merge(other, _or, True, True)
+
+    def __sub__(self, other: "Bitmap") -> "Bitmap":
+        return self._merge(other, _andnot, True, False)
+
+    def __xor__(self, other: "Bitmap") -> "Bitmap":
+        return (self | other) - (self & other)
+
+    def __len__(self) -> int:
+        return sum(_cardinality(c) for c in self.containers)
+
+    def __contains__(self, value: int) -> bool:
+        key, low = value >> 16, np.uint16(value & 0xFFFF)
+        i = int(np.searchsorted(self.keys, key))
+        if i == len(self.keys) or self.keys[i] != key:
+            return False
+        container = self.containers[i]
+        if _is_bitset(container):
+            return bool(_contains(container, np.array([low]))[0])
+        j = int(np.searchsorted(container, low))
+        return j < len(container) and container[j] == low
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Bitmap) and np.array_equal(self.to_array(), other.to_array())
+
+    def __repr__(self) -> str:
+        return f"Bitmap({len(self):,} values, {self.nbytes:,} bytes)"
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.keys.nbytes + sum(c.nbytes for c in self.containers))
@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Mapping, Sequence
+
+import numpy as np
+import pandas as pd
+
+from dashboard.cache import data_version
+from dashboard.engine.query import Measures, Where, grouping_sets
+from dashboard.engine.star import BASE_DIR, STAR_DIR, StarSchema, allowed_labels, star_files
+
+CUBE_DIR = Path(os.environ.get("DASHBOARD_CUBE_DIR", BASE_DIR / "data" / "cube"))
+
+# Cube axes, as engine attribute names. ``collaboration_event_flag`` is the
+# work mode (1 = collaborative) used by KAQ5.
+AXES = ("calendar_date", "subscription_tier", "content_type", "platform", "collaboration_event_flag")
+
+# Materialized measures: name -> engine measure spec.
+MEASURES = {
+    "rows": ("count", None),
+    "events": ("sum", "event_count"),
+    "active_users": ("sum", "active_user_flag"),
+    "activations": ("sum", "activation_event_flag"),
+    "collaboration_events": ("sum", "collaboration_event_flag"),
+    "duration_sum": ("sum", "session_duration_sec"),
+    "duration_count": ("count_nonzero", "session_duration_sec"),
+}
+
+# Attributes derived from the day axis.
+TIME_ATTRIBUTES = ("calendar_date", "year", "month")
+
+# Result sets that are pure roll-ups and can be answered from the cube.
+CUBE_RESULTS = ("kaq1", "kaq2", "kaq4", "kaq5", "aq1", "aq2")
+
+
+class Cube:
+    """Dense day x tier x content type x platform x work mode cube of additive measures.
+
+    ``values`` has one axis per entry of ``AXES`` plus a trailing measure axis.
+    It is small enough to keep dense (a few hundred thousand cells for two years)
+    and is stored as a plain ``.npy`` file so workers can memory-map it.
+    """
+
+    def __init__(self, values: np.ndarray, labels: Mapping[str, np.ndarray], stats: Mapping[str, Any] | None = None):
+        self.values = values
+        self.labels = dict(labels)
+        self.stats = dict(stats or {})
+
+    @classmethod
+    def build(cls, star: StarSchema) -> "Cube":
+        start = time.perf_counter()
+        attrs = [star.attribute(axis) for axis in AXES]
+        shape = tuple(len(attr.labels) for attr in attrs)
+        cells = int(np.prod(shape, dtype=np.int64))
+        gid = np.ravel_multi_index([attr.codes for attr in attrs], shape)
+
+        values = np.empty((cells, len(MEASURES)), dtype=np.int64)
+        for i, (func, col) in enumerate(MEASURES.values()):
+            if func == "count":
+                weights = None
+            elif func == "count_nonzero":
+                weights = star.fact[col] != 0
+            else:
+                weights = star.fact[col]
+            values[:, i] = np.rint(np.bincount(gid, weights=weights, minlength=cells))
+        values = values.reshape(*shape, len(MEASURES))
+
+        stats = {
+            "fact_rows": star.n_rows,
+            "cells": cells,
+            "occupied_cells": int(np.count_nonzero(values[..., 0])),
+            "nbytes": int(values.nbytes),
+            "build_seconds": round(time.perf_counter() - start, 3),
+        }
+        return cls(values, {axis: attr.labels for axis, attr in zip(AXES, attrs)}, stats)
+
+    def save(self, directory: Path = CUBE_DIR, source_version: str | None = None) -> None:
+        directory.mkdir(parents=True, exist_ok=True)
+        tmp = directory / f".values.{os.getpid()}.npy"
+        np.save(tmp, np.ascontiguousarray(self.values))
+        os.replace(tmp, directory / "values.npy")
+        meta = {
+            "axes": list(AXES),
+            "measures": list(MEASURES),
+            "labels": {axis: _labels_to_json(labels) for axis, labels in self.labels.items()},
+            "stats": self.stats,
+            "source_version": source_version,
+        }
+        (directory / "meta.json").write_text(json.dumps(meta, indent=2))
+
+    @classmethod
+    def load(cls, directory: Path = CUBE_DIR, mmap: bool = True) -> "Cube":
+        meta = read_meta(directory)
+        if meta.get("axes") != list(AXES) or meta.get("measures") != list(MEASURES):
+            raise ValueError(f"cube in {directory} was built with a different layout")
+        values = np.load(directory / "values.npy", mmap_mode="r" if mmap else None)
+        labels = {axis: _labels_from_json(axis, meta["labels"][axis]) for axis in AXES}
+        return cls(values, labels, meta["stats"])
+
+    def aggregate(
+        self,
+        by: Sequence[str],
+        measures: Measures,
+        sets: Sequence[Sequence[str]] | None = None,
+        where: Where | None = None,
+    ) -> pd.DataFrame:
+        """Same contract as ``engine.query.aggregate``, answered from the cube cells."""
+        spec_to_measure = {spec: name for name, spec in MEASURES.items()}
+        try:
+            columns = [list(MEASURES).index(spec_to_measure[spec]) for spec in measures.values()]
+        except KeyError as exc:
+            raise KeyError(f"measure {exc.args[0]!r} is not materialized in the cube") from None
+
+        block, axis_labels = self._select(where or {})
+        kept_axes = _axes_needed(by)
+        # Sum out every axis nobody groups by; what is left stays dense and small.
+        drop = tuple(i for i, axis in enumerate(AXES) if axis not in kept_axes)
+        block = block.sum(axis=drop) if drop else block
+        kept = [axis for axis in AXES if axis in kept_axes]
+        if not kept:
+            block = block.reshape(1, -1)
+
+        occupied = np.nonzero(block[..., 0])
+        sums = {name: block[(*occupied, col)] for name, col in zip(measures, columns)}
+
+        labels, codes = [], []
+        for name in by:
+            if name in TIME_ATTRIBUTES:
+                day_codes = occupied[kept.index("calendar_date")]
+                day_labels = axis_labels["calendar_date"]
+                values, inverse = self._time_attribute(name, day_labels)
+                labels.append(values)
+                codes.append(inverse[day_codes])
+            else:
+                labels.append(axis_labels[name])
+                codes.append(occupied[kept.index(name)])
+        return grouping_sets(by, labels, codes, sums, sets)
+
+    def _select(self, where: Where) -> tuple[np.ndarray, dict[str, np.ndarray]]:
+        """Apply ``where`` along the cube axes; returns the (copied) sub-block and its labels."""
+        block = self.values
+        labels = dict(self.labels)
+        for name, allowed in where.items():
+            axis = "calendar_date" if name in TIME_ATTRIBUTES else name
+            if axis not in AXES:
+                raise KeyError(f"{name!r} is not a cube axis")
+            if name in TIME_ATTRIBUTES:
+                values, inverse = self._time_attribute(name, labels[axis])
+                keep = allowed_labels(values, allowed)[inverse]
+            else:
+                keep = allowed_labels(labels[axis], allowed)
+            i = AXES.index(axis)
+            block = np.compress(keep, block, axis=i)
+            labels[axis] = labels[axis][keep]
+        return np.asarray(block), labels
+
+    def _time_attribute(self, name: str, days: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        index = pd.DatetimeIndex(days)
+        if name == "calendar_date":
+            return days, np.arange(len(days))
+        return np.unique(getattr(index, name), return_inverse=True)
+
+    def describe(self) -> str:
+        stats = self.stats
+        return (
+            f"{stats.get('fact_rows', 0):,} fact rows -> {stats.get('cells', 0):,} cells "
+            f"({stats.get('occupied_cells', 0):,} occupied), "
+            f"{stats.get('nbytes', 0) / 1e6:.1f} MB, built in {stats.get('build_seconds', 0)}s"
+        )
+
+
+def _axes_needed(by: Sequence[str]) -> set[str]:
+    return {"calendar_date" if name in TIME_ATTRIBUTES else name for name in by}
+
+
+def _labels_to_json(labels: np.ndarray) -> list:
+    if np.issubdtype(labels.dtype, np.datetime64):
+        return [str(day) for day in labels.astype("datetime64[D]")]
+    return [None if label is None or (isinstance(label, float) and np.isnan(label)) else label for label in labels.tolist()]
+
+
+def _labels_from_json(axis: str, labels: list) -> np.ndarray:
+    if axis == "calendar_date":
+        return np.array(labels, dtype="datetime64[ns]")
+    if all(isinstance(label, int) for label in labels):
+        return np.array(labels)
+    return np.array(labels, dtype=object)
+
+
+def read_meta(directory: Path = CUBE_DIR) -> dict:
+    try:
+        return json.loads((directory / "meta.json").read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build the engagement cube from a star schema export.")
+    parser.add_argument("--star-dir", type=Path, default=STAR_DIR)
+    parser.add_argument("--out", type=Path, default=CUBE_DIR)
+    args = parser.parse_args()
+
+    cube = Cube.build(StarSchema.load(args.star_dir))
+    # Same version as dashboard.data's DATA_VERSION, so the dashboard loads this cube instead of rebuilding it.
+    cube.save(args.out, source_version=data_version("star", star_files(args.star_dir)))
+    print(cube.describe())
+
+
+if __name__ == "__main__":
+    main()
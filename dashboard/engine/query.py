@@ -0,0 +1,369 @@
+from __future__ import annotations
+
+from itertools import combinations
+from typing import Any, Callable, Collection, Mapping, Sequence
+
+import numpy as np
+import pandas as pd
+
+from dashboard.engine.cohort import CohortActivity
+from dashboard.engine.star import StarSchema
+
+# Up to this many cells the finest grouping is reduced with a dense bincount;
+# beyond it only the occupied cells are kept (np.unique + bincount).
+DENSE_LIMIT = 1 << 22
+
+# Measure specs: output name -> (function, fact column). Functions are additive
+# so every grouping set can be rolled up from the finest one.
+#   "sum"           SUM(col)
+#   "count"         COUNT(*)
+#   "count_nonzero" COUNT(NULLIF(col, 0))
+Measures = Mapping[str, tuple[str, str | None]]
+Where = Mapping[str, Collection[Any] | slice]
+
+
+def rollup(*cols: str) -> list[tuple[str, ...]]:
+    """Grouping sets of ``GROUP BY ROLLUP (cols)``."""
+    return [cols[:i] for i in range(len(cols), -1, -1)]
+
+
+def cube(*cols: str) -> list[tuple[str, ...]]:
+    """Grouping sets of ``GROUP BY CUBE (cols)``."""
+    return [combo for size in range(len(cols), -1, -1) for combo in combinations(cols, size)]
+
+
+def _measure_values(star: StarSchema, measures: Measures) -> dict[str, np.ndarray | None]:
+    values = {}
+    for name, (func, col) in measures.items():
+        if func == "sum":
+            values[name] = star.fact[col]
+        elif func == "count":
+            values[name] = None
+        elif func == "count_nonzero":
+            values[name] = star.fact[col] != 0
+        else:
+            raise ValueError(f"unsupported measure function {func!r}")
+    return values
+
+
+def _reduce(
+    codes: Sequence[np.ndarray],
+    shape: tuple[int, ...],
+    values: Mapping[str, np.ndarray | None],
+    n: int,
+) -> tuple[list[np.ndarray], dict[str, np.ndarray]]:
+    """Segment-sum ``values`` over the cells given by ``codes``, keeping occupied cells only.
+
+    A ``None`` value counts rows instead of summing a column.
+    """
+    if codes:
+        gid = np.ravel_multi_index(codes, shape)
+        cells = int(np.prod(shape, dtype=np.int64))
+    else:
+        gid = np.zeros(n, dtype=np.intp)
+        cells = 1
+
+    if cells <= DENSE_LIMIT:
+        index, size = gid, cells
+        rows = np.bincount(index, minlength=size)
+        present = np.flatnonzero(rows)
+        take = present
+    else:
+        present, index = np.unique(gid, return_inverse=True)
+        size = len(present)
+        rows = np.bincount(index, minlength=size)
+        take = slice(None)
+
+    sums = {
+        name: (rows if v is None else np.bincount(index, weights=v, minlength=size))[take]
+        for name, v in values.items()
+    }
+    cell_codes = list(np.unravel_index(present, shape)) if codes else []
+    return cell_codes, sums
+
+
+def aggregate(
+    source: StarSchema | Any,
+    by: Sequence[str],
+    measures: Measures,
+    sets: Sequence[Sequence[str]] | None = None,
+    where: Where | None = None,
+) -> pd.DataFrame:
+    """``SELECT by..., measures... FROM fact [WHERE ...] GROUP BY GROUPING SETS (sets)``.
+
+    The fact rows are reduced once to the finest grouping over ``by``; every
+    grouping set is then summed from those cells. Columns missing from a set are
+    ``None``/``NaN`` as in SQL, and only non-empty groups are returned.
+
+    ``source`` may also be a pre-aggregated store (``engine.cube.Cube``), which
+    answers the same call from its materialized cells.
+    """
+    if not isinstance(source, StarSchema):
+        return source.aggregate(by, measures, sets, where)
+
+    star = source
+    by = list(by)
+    attrs = [star.attribute(name) for name in by]
+    shape = tuple(len(attr.labels) for attr in attrs)
+    values = _measure_values(star, measures)
+
+    mask = star.mask(where)
+    n = star.n_rows
+    codes = [attr.codes for attr in attrs]
+    if mask is not None:
+        n = int(mask.sum())
+        codes = [c[mask] for c in codes]
+        values = {k: (v if v is None else v[mask]) for k, v in values.items()}
+    cell_codes, cell_sums = _reduce(codes, shape, values, n)
+    return grouping_sets(by, [attr.labels for attr in attrs], cell_codes, cell_sums, sets)
+
+
+def grouping_sets(
+    by: Sequence[str],
+    labels: Sequence[np.ndarray],
+    cell_codes: Sequence[np.ndarray],
+    cell_sums: Mapping[str, np.ndarray],
+    sets: Sequence[Sequence[str]] | None = None,
+) -> pd.DataFrame:
+    """Roll occupied cells (codes into ``labels`` per ``by`` column) up to each grouping set."""
+    by = list(by)
+    sets = [tuple(by)] if sets is None else [tuple(s) for s in sets]
+    shape = tuple(len(values) for values in labels)
+    n_cells = len(next(iter(cell_sums.values()))) if cell_sums else 0
+
+    frames = []
+    for grouping in sets:
+        keep = [by.index(col) for col in grouping]
+        set_codes, set_sums = _reduce(
+            [cell_codes[i] for i in keep], tuple(shape[i] for i in keep), cell_sums, n_cells
+        )
+        n_groups = len(set_codes[0]) if set_codes else min(n_cells, 1)
+        sums = {name: np.rint(set_sums[name]).astype(np.int64) for name in cell_sums}
+        frames.append(group_frame(by, labels, keep, set_codes, n_groups, sums))
+    return concat_sets(by, frames)
+
+
+def group_frame(
+    by: Sequence[str],
+    labels: Sequence[np.ndarray],
+    keep: Sequence[int],
+    set_codes: Sequence[np.ndarray],
+    n_groups: int,
+    values: Mapping[str, np.ndarray],
+) -> pd.DataFrame:
+    """Rows of one grouping set: labels of the ``keep`` columns of ``by``, ``None`` for the rest."""
+    frame = {
+        col: labels[i][set_codes[keep.index(i)]] if i in keep else np.full(n_groups, None)
+        for i, col in enumerate(by)
+    }
+    frame.update(values)
+    return pd.DataFrame(frame, columns=[*by, *values])
+
+
+def concat_sets(by: Sequence[str], frames: list[pd.DataFrame]) -> pd.DataFrame:
+    result = pd.concat(frames, ignore_index=True)
+    for col in by:
+        result[col] = result[col].infer_objects()
+    return result
+
+
+def distinct_users(
+    source: StarSchema | Any,
+    by: Sequence[str],
+    sets: Sequence[Sequence[str]] | None = None,
+    where: Where | None = None,
+) -> pd.DataFrame:
+    """``SELECT by..., COUNT(DISTINCT user_key) AS active_users ... WHERE active_user_flag = 1``.
+
+    Distinct counts do not roll up, so on the fact rows every grouping set is
+    counted separately. ``source`` may also be an ``engine.sketch.UserSketches``
+    store, which answers approximately by merging HyperLogLog sketches.
+    """
+    if not isinstance(source, StarSchema):
+        return source.distinct_users(by, sets, where)
+
+    star = source
+    by = list(by)
+    sets = [tuple(by)] if sets is None else [tuple(s) for s in sets]
+    attrs = [star.attribute(name) for name in by]
+    active = star.fact["active_user_flag"] != 0
+    mask = star.mask(where)
+    if mask is not None:
+        active &= mask
+    users = star.fact["user_key"][active].astype(np.int64)
+    n_users = int(users.max()) + 1 if len(users) else 1
+    codes = [attr.codes[active] for attr in attrs]
+
+    frames = []
+    for grouping in sets:
+        keep = [by.index(col) for col in grouping]
+        shape = tuple(len(attrs[i].labels) for i in keep)
+        gid = np.ravel_multi_index([codes[i] for i in keep], shape) if keep else np.zeros(len(users), dtype=np.intp)
+        pairs = np.unique(gid.astype(np.int64) * n_users + users)
+        present, counts = np.unique(pairs // n_users, return_counts=True)
+        set_codes = list(np.unravel_index(present, shape)) if keep else []
+        frames.append(
+            group_frame(by, [attr.labels for attr in attrs], keep, set_codes, len(present), {"active_users": counts})
+        )
+    return concat_sets(by, frames)
+
+
+def round_ratio(num: np.ndarray | pd.Series, den: np.ndarray | pd.Series, digits: int) -> np.ndarray:
+    """``ROUND(num::numeric / NULLIF(den, 0), digits)`` for non-negative integers, exactly.
+
+    Integer arithmetic gives Postgres' half-away-from-zero rounding without
+    binary floating point drift; zero denominators yield NaN.
+    """
+    num = np.asarray(num, dtype=np.int64)
+    den = np.asarray(den, dtype=np.int64)
+    scale = 10**digits
+    safe = np.where(den == 0, 1, den)
+    scaled = (2 * num * scale + safe) // (2 * safe)
+    return np.where(den == 0, np.nan, scaled / scale)
+
+
+def _order(df: pd.DataFrame, cols: Sequence[str]) -> pd.DataFrame:
+    return df.sort_values(list(cols), na_position="last", kind="stable").reset_index(drop=True)
+
+
+def _with_ratio(df: pd.DataFrame) -> pd.DataFrame:
+    df["events_per_active_user"] = round_ratio(df["events"], df["dau"], 2)
+    return df
+
+
+def kaq1(star: StarSchema) -> pd.DataFrame:
+    by = ["year", "month", "subscription_tier"]
+    df = aggregate(
+        star,
+        by,
+        {"dau": ("sum", "active_user_flag"), "events": ("sum", "event_count")},
+        sets=[("year", "month", "subscription_tier"), ("year", "month"), ("subscription_tier",), ()],
+    )
+    return _with_ratio(_order(df, by))
+
+
+def kaq2(star: StarSchema) -> pd.DataFrame:
+    by = ["year", "month", "content_type"]
+    df = aggregate(
+        star,
+        by,
+        {"events": ("sum", "event_count"), "dau": ("sum", "active_user_flag")},
+        sets=cube(*by),
+    )
+    return _with_ratio(_order(df, by))
+
+
+def _activity(source: StarSchema | CohortActivity) -> CohortActivity:
+    return source if isinstance(source, CohortActivity) else CohortActivity(source)
+
+
+def kaq3(source: StarSchema | CohortActivity, window_days: int = 7) -> pd.DataFrame:
+    """Activation within ``window_days`` of signup, per signup month."""
+    activity = _activity(source)
+    reached = activity.matrix("month", "day", window_days, "reached", complete=False)
+    activated = activity.matrix("month", "day", window_days, "activated", complete=False)
+    last = (reached["period"] == window_days - 1).to_numpy()
+    df = pd.DataFrame(
+        {
+            "signup_month": reached["cohort"][last].dt.strftime("%Y-%m-%d"),
+            "new_users": reached["users"][last],
+            "activated_users": activated["users"][last],
+        }
+    )
+    df = df[df["new_users"] > 0].reset_index(drop=True)
+    df["activation_rate"] = round_ratio(df["activated_users"], df["new_users"], 4)
+    return df
+
+
+def retention(source: StarSchema | CohortActivity, weeks: int = 12) -> pd.DataFrame:
+    """Share of each signup month's users with an event in week 0 .. ``weeks - 1`` after signup."""
+    df = _activity(source).matrix("month", "week", weeks, "active")
+    return pd.DataFrame(
+        {
+            "signup_month": df["cohort"].dt.strftime("%Y-%m-%d"),
+            "week": df["period"],
+            "cohort_users": df["cohort_users"],
+            "active_users": df["users"],
+            "retention_rate": round_ratio(df["users"], df["cohort_users"], 4),
+        }
+    )
+
+
+def kaq4(star: StarSchema) -> pd.DataFrame:
+    by = ["year", "month", "platform"]
+    df = aggregate(
+        star,
+        by,
+        {
+            "events": ("sum", "event_count"),
+            "dau": ("sum", "active_user_flag"),
+            "duration_sum": ("sum", "session_duration_sec"),
+            "duration_count": ("count_nonzero", "session_duration_sec"),
+        },
+        sets=rollup(*by),
+    )
+    df = _order(df, by)
+    df["avg_session_duration_sec"] = round_ratio(df.pop("duration_sum"), df.pop("duration_count"), 1)
+    return df
+
+
+def kaq5(star: StarSchema) -> pd.DataFrame:
+    by = ["year", "month", "collaboration_event_flag"]
+    df = aggregate(star, by, {"events": ("sum", "event_count")})
+    df["work_mode"] = np.where(df.pop("collaboration_event_flag") == 1, "collaborative", "individual")
+    df = df.groupby(["year", "month", "work_mode"], as_index=False)["events"].sum()
+    totals = df.groupby(["year", "month"])["events"].transform("sum")
+    df["proportion"] = round_ratio(df["events"], totals, 4)
+    return _order(df, ["year", "month", "work_mode"])
+
+
+def aq1(star: StarSchema) -> pd.DataFrame:
+    df = aggregate(star, ["content_type"], {"events": ("sum", "event_count")})
+    df["content_type_rank"] = df["events"].rank(method="dense", ascending=False).astype(np.int64)
+    return _order(df, ["content_type_rank", "content_type"])
+
+
+def aq2(star: StarSchema, start: str = "2024-01-01", end: str = "2026-01-01") -> pd.DataFrame:
+    df = aggregate(
+        star,
+        ["year", "month"],
+        {"dau": ("sum", "active_user_flag")},
+        where={"calendar_date": slice(pd.Timestamp(start), pd.Timestamp(end))},
+    )
+    df = _order(df, ["year", "month"])
+    month_start = pd.to_datetime(dict(year=df["year"], month=df["month"], day=1))
+    previous = df["dau"].shift(1)
+    abs_change = df["dau"] - previous
+    return pd.DataFrame(
+        {
+            "month_start": month_start.dt.strftime("%Y-%m-%d"),
+            "dau_current_month": df["dau"],
+            "dau_previous_month": previous,
+            "abs_change": abs_change,
+            "rel_change": np.where(
+                previous.isna(),
+                np.nan,
+                _signed_round_ratio(abs_change.fillna(0), previous.fillna(0), 4),
+            ),
+        }
+    )
+
+
+def _signed_round_ratio(num: pd.Series, den: pd.Series, digits: int) -> np.ndarray:
+    num = num.to_numpy(dtype=np.int64)
+    return np.sign(num) * round_ratio(np.abs(num), den, digits)
+
+
+# Result set name -> engine query, mirroring scripts/<name>.sql. kaq3 and
+# retention are cohort queries and also accept a ``CohortActivity``; the rest
+# only need additive roll-ups and also accept a ``Cube``.
+RESULT_QUERIES: dict[str, Callable[[Any], pd.DataFrame]] = {
+    "kaq1": kaq1,
+    "kaq2": kaq2,
+    "kaq3": kaq3,
+    "kaq4": kaq4,
+    "kaq5": kaq5,
+    "aq1": aq1,
+    "aq2": aq2,
+    "retention": retention,
+}
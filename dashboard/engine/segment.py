@@ -0,0 +1,320 @@
+from __future__ import annotations
+
+import argparse
+import re
+import time
+from pathlib import Path
+from typing import Any, Iterable, NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from dashboard.engine.bitmap import Bitmap
+from dashboard.engine.star import STAR_DIR, StarSchema
+
+# Attributes of the user dimension: one bitmap of users per value.
+USER_ATTRIBUTES = ("subscription_tier", "user_type", "region", "lifecycle_stage")
+# Attributes of what users did: one bitmap of users with at least one such
+# event per value, and one per value and month.
+ACTIVITY_ATTRIBUTES = (
+    "event_type",
+    "feature_category",
+    "platform",
+    "operating_system",
+    "content_type",
+    "workspace_plan",
+    "industry_segment",
+)
+
+_TOKEN = re.compile(
+    r"""\s*(?:(?P<op>!=|[=&|!(),@]|\.\.)|"(?P<quoted>[^"]*)"|(?P<word>[^\s=&|!(),@"]+?(?=\.\.|[\s=&|!(),@"]|$)))"""
+)
+
+
+class SegmentError(ValueError):
+    """An invalid segment expression."""
+
+
+class Term(NamedTuple):
+    attribute: str
+    values: tuple[str, ...]
+    months: tuple[str, str] | None = None
+
+    def __str__(self) -> str:
+        values = ",".join(_quote(value) for value in self.values)
+        months = "" if self.months is None else f"@{self.months[0]}..{self.months[1]}"
+        return f"{self.attribute}={values}{months}"
+
+
+class Op(NamedTuple):
+    name: str  # "and", "or" or "not"
+    args: tuple
+
+    def __str__(self) -> str:
+        if self.name == "not":
+            return f"!{_group(self.args[0])}"
+        joiner = " & " if self.name == "and" else " | "
+        return joiner.join(_group(arg) for arg in self.args)
+
+
+def _quote(value: str) -> str:
+    return value if re.fullmatch(r"[\w.:+-]+", value) and ".." not in value else f'"{value}"'
+
+
+def _group(node: Term | Op) -> str:
+    return f"({node})" if isinstance(node, Op) and node.name != "not" else str(node)
+
+
+def _tokens(text: str) -> list[str | tuple[str, str]]:
+    tokens, pos = [], 0
+    text = text.strip()
+    while pos < len(text):
+        match = _TOKEN.match(text, pos)
+        if match is None or match.end() == pos:
+            raise SegmentError(f"unexpected {text[pos:pos + 10]!r}")
+        if match["op"] is not None:
+            tokens.append(match["op"])
+        elif match["quoted"] is not None:
+            tokens.append(("value", match["quoted"]))
+        else:
+            tokens.append(("value", match["word"]))
+        pos = match.end()
+        while pos < len(text) and text[pos].isspace():
+            pos += 1
+    return tokens
+
+
+def parse(text: str) -> Term | Op:
+    """Parse a segment expression.
+
+    Terms are ``attribute=value`` (``a,b`` for either value, ``!=`` to exclude),
+    activity terms may be restricted to months with ``@2025-03`` or
+    ``@2025-01..2025-06``. Terms combine with ``&``, ``|``, ``!`` and
+    parentheses; ``&`` binds tighter than ``|``.
+    """
+    tokens = _tokens(text)
+    pos = 0
+
+    def peek() -> Any:
+        return tokens[pos] if pos < len(tokens) else None
+
+    def take(expected: str | None = None) -> Any:
+        nonlocal pos
+        token = peek()
+        if token is None:
+            raise SegmentError(f"expected {expected or 'more input'} at the end")
+        if expected is not None and token != expected:
+            raise SegmentError(f"unexpected {token!r}")
+        pos += 1
+        return token
+
+    def value() -> str:
+        token = take()
+        if not isinstance(token, tuple):
+            raise SegmentError(f"expected a name or value, got {token!r}")
+        return token[1]
+
+    def either() -> Term | Op:
+        args = [both()]
+        while peek() == "|":
+            take()
+            args.append(both())
+        return args[0] if len(args) == 1 else Op("or", tuple(args))
+
+    def both() -> Term | Op:
+        args = [unary()]
+        while peek() == "&":
+            take()
+            args.append(unary())
+        return args[0] if len(args) == 1 else Op("and", tuple(args))
+
+    def unary() -> Term | Op:
+        if peek() == "!":
+            take()
+            return Op("not", (unary(),))
+        if peek() == "(":
+            take()
+            node = either()
+            take(")")
+            return node
+        return term()
+
+    def term() -> Term | Op:
+        attribute = value()
+        if peek() not in ("=", "!="):
+            raise SegmentError(f"expected '=' or '!=' after {attribute!r}")
+        negate = take() == "!="
+        values = [value()]
+        while peek() == ",":
+            take()
+            values.append(value())
+        months = None
+        if peek() == "@":
+            take()
+            first = value()
+            last = first
+            if peek() == "..":
+                take()
+                last = value()
+            months = (_month(first), _month(last))
+        node = Term(attribute, tuple(values), months)
+        return Op("not", (node,)) if negate else node
+
+    node = either()
+    if peek() is not None:
+        raise SegmentError(f"unexpected {peek()!r}")
+    return node
+
+
+def _month(text: str) -> str:
+    try:
+        return pd.Period(text, freq="M").strftime("%Y-%m")
+    except ValueError:
+        raise SegmentError(f"invalid month {text!r}, expected YYYY-MM") from None
+
+
+class SegmentIndex:
+    """Bitmaps of ``user_key`` per attribute value, combined into segments with set algebra.
+
+    User attributes come from ``dim_user``. Activity attributes mark the users
+    with at least one fact row carrying the value, overall and per month.
+    """
+
+    def __init__(
+        self,
+        universe: Bitmap,
+        bitmaps: dict[tuple[str, str], Bitmap],
+        monthly: dict[tuple[str, str, str], Bitmap],
+        stats: dict[str, Any] | None = None,
+    ):
+        self.universe = universe
+        self.bitmaps = bitmaps
+        self.monthly = monthly
+        self.stats = dict(stats or {})
+        self.values: dict[str, list[str]] = {attribute: [] for attribute in (*USER_ATTRIBUTES, *ACTIVITY_ATTRIBUTES)}
+        for attribute, value in bitmaps:
+            self.values.setdefault(attribute, []).append(value)
+
+    @classmethod
+    def build(cls, star: StarSchema) -> "SegmentIndex":
+        start = time.perf_counter()
+        users = star.dims["dim_user"]
+        universe = Bitmap.from_values(users.index.to_numpy())
+        bitmaps: dict[tuple[str, str], Bitmap] = {}
+        for attribute in USER_ATTRIBUTES:
+            for value, keys in users.groupby(attribute, sort=True).groups.items():
+                bitmaps[attribute, str(value)] = Bitmap.from_values(keys.to_numpy())
+
+        user_key = star.fact["user_key"].astype(np.int64)
+        n_users = int(user_key.max()) + 1 if len(user_key) else 1
+        months, month_codes = np.unique(
+            star.column("dim_time", "calendar_date").astype("datetime64[M]"), return_inverse=True
+        )
+        month_labels = [str(month) for month in months]
+        monthly: dict[tuple[str, str, str], Bitmap] = {}
+        for attribute in ACTIVITY_ATTRIBUTES:
+            attr = star.attribute(attribute)
+            # Distinct (value, month, user) triples; one sort serves every bitmap.
+            key = np.sort((attr.codes.astype(np.int64) * len(months) + month_codes) * n_users + user_key)
+            key = key[np.r_[True, key[1:] != key[:-1]]] if len(key) else key
+            cell, user = np.divmod(key, n_users)
+            bounds = np.r_[np.flatnonzero(np.r_[True, cell[1:] != cell[:-1]]), len(cell)] if len(cell) else [0]
+            overall: dict[str, list[np.ndarray]] = {}
+            for lo, hi in zip(bounds[:-1], bounds[1:]):
+                code, month = divmod(int(cell[lo]), len(months))
+                label = attr.labels[code]
+                if label is None:
+                    continue
+                value = str(label)
+                monthly[attribute, value, month_labels[month]] = Bitmap.from_values(user[lo:hi])
+                overall.setdefault(value, []).append(user[lo:hi])
+            for value, parts in sorted(overall.items()):
+                bitmaps[attribute, value] = Bitmap.from_values(np.concatenate(parts))
+
+        stats = {
+            "users": len(universe),
+            "bitmaps": len(bitmaps) + len(monthly),
+            "nbytes": sum(b.nbytes for b in (*bitmaps.values(), *monthly.values())),
+            "build_seconds": round(time.perf_counter() - start, 3),
+        }
+        return cls(universe, bitmaps, monthly, stats)
+
+    def attributes(self) -> dict[str, list[str]]:
+        """Attribute -> indexed values, for help texts and pickers."""
+        return {attribute: list(values) for attribute, values in self.values.items()}
+
+    def evaluate(self, expression: str | Term | Op) -> Bitmap:
+        node = parse(expression) if isinstance(expression, str) else expression
+        if isinstance(node, Term):
+            return self._term(node)
+        if node.name == "not":
+            return self.universe - self.evaluate(node.args[0])
+        result = self.evaluate(node.args[0])
+        for arg in node.args[1:]:
+            result = result & self.evaluate(arg) if node.name == "and" else result | self.evaluate(arg)
+        return result
+
+    def users(self, expression: str | Term | Op) -> np.ndarray:
+        """Sorted ``user_key`` values in the segment."""
+        return self.evaluate(expression).to_array()
+
+    def _term(self, term: Term) -> Bitmap:
+        if term.attribute not in self.values:
+            raise SegmentError(f"unknown attribute {term.attribute!r}; known: {', '.join(self.values)}")
+        known = self.values[term.attribute]
+        unknown = [value for value in term.values if value not in known]
+        if unknown:
+            raise SegmentError(f"unknown {term.attribute} {unknown[0]!r}; known: {', '.join(known)}")
+        if term.months is not None and term.attribute not in ACTIVITY_ATTRIBUTES:
+            raise SegmentError(f"{term.attribute} is a user attribute and has no months")
+        result = Bitmap()
+        for value in term.values:
+            if term.months is None:
+                result = result | self.bitmaps[term.attribute, value]
+                continue
+            for month in pd.period_range(*term.months, freq="M").strftime("%Y-%m"):
+                bitmap = self.monthly.get((term.attribute, value, month))
+                if bitmap is not None:
+                    result = result | bitmap
+        return result
+
+    def describe(self) -> str:
+        stats = self.stats
+        return (
+            f"{stats.get('users', 0):,} users, {stats.get('bitmaps', 0):,} bitmaps, "
+            f"{stats.get('nbytes', 0) / 1e6:.2f} MB, built in {stats.get('build_seconds', 0)}s"
+        )
+
+
+def canonical(expression: str | None) -> str | None:
+    """Normalized text of ``expression`` (``None`` for an empty one), for cache keys and display."""
+    if expression is None or not expression.strip():
+        return None
+    return str(parse(expression))
+
+
+def main(argv: Iterable[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Build the user bitmap index and evaluate segment expressions.")
+    parser.add_argument("--star-dir", type=Path, default=STAR_DIR)
+    parser.add_argument("--runs", type=int, default=1000, help="evaluations per expression for the timing")
+    parser.add_argument(
+        "expressions",
+        nargs="*",
+        default=["subscription_tier=Business & region=EU & event_type=share & platform=mobile"],
+    )
+    args = parser.parse_args(argv)
+
+    index = SegmentIndex.build(StarSchema.load(args.star_dir))
+    print(index.describe())
+    for expression in args.expressions:
+        node = parse(expression)
+        segment = index.evaluate(node)
+        start = time.perf_counter()
+        for _ in range(args.runs):
+            index.evaluate(node)
+        elapsed_us = (time.perf_counter() - start) / args.runs * 1e6
+        print(f"{node}: {len(segment):,} users, {elapsed_us:.0f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Collection, Mapping
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+STAR_DIR = Path(os.environ.get("DASHBOARD_STAR_DIR", BASE_DIR / "data" / "star"))
+
+FACT_TABLE = "fact_product_usage_engagement"
+
+# Dimension table -> foreign key column on the fact table.
+DIMENSIONS = {
+    "dim_time": "time_key",
+    "dim_user": "user_key",
+    "dim_workspace": "workspace_key",
+    "dim_content": "content_key",
+    "dim_device": "device_key",
+    "dim_event": "event_key",
+    "dim_session": "session_key",
+}
+
+FACT_COLUMNS = {
+    "time_key": np.int32,
+    "user_key": np.int32,
+    "workspace_key": np.int32,
+    "content_key": np.int32,
+    "device_key": np.int32,
+    "event_key": np.int32,
+    "session_key": np.int32,
+    "event_count": np.int8,
+    "active_user_flag": np.int8,
+    "activation_event_flag": np.int8,
+    "feature_usage_flag": np.int8,
+    "collaboration_event_flag": np.int8,
+    "session_event_count": np.int32,
+    "session_duration_sec": np.int32,
+}
+
+DATE_COLUMNS = {"calendar_date", "signup_date"}
+TIMESTAMP_COLUMNS = {"session_start_time", "session_end_time"}
+
+
+TABLE_SUFFIXES = (".parquet", ".csv", ".csv.gz")
+
+
+def star_files(directory: Path = STAR_DIR) -> list[Path]:
+    """Files making up the star schema export, in a stable order."""
+    return [path for name in (FACT_TABLE, *DIMENSIONS) for path in _table_paths(directory, name)]
+
+
+def star_available(directory: Path = STAR_DIR) -> bool:
+    return all(_table_paths(directory, name) for name in (FACT_TABLE, *DIMENSIONS))
+
+
+def _table_paths(directory: Path, name: str) -> list[Path]:
+    """``<name>.<suffix>``, or the partition files of a ``<name>/`` directory."""
+    for suffix in TABLE_SUFFIXES:
+        path = directory / f"{name}{suffix}"
+        if path.exists():
+            return [path]
+    parts = directory / name
+    if parts.is_dir():
+        return sorted(path for path in parts.iterdir() if path.name.endswith(TABLE_SUFFIXES))
+    return []
+
+
+def read_table(directory: Path, name: str, columns: Collection[str] | None = None) -> pd.DataFrame:
+    """Read one exported table (``COPY ... TO STDOUT WITH CSV HEADER`` or Parquet).
+
+    A table may also be a directory of per-partition files, which are concatenated.
+    """
+    paths = _table_paths(directory, name)
+    if not paths:
+        raise FileNotFoundError(f"{name} not found in {directory}")
+    frames = []
+    for path in paths:
+        if path.suffix == ".parquet":
+            frames.append(pd.read_parquet(path, columns=list(columns) if columns else None))
+        else:
+            frames.append(pd.read_csv(path, usecols=list(columns) if columns else None))
+    df = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+    for col in DATE_COLUMNS.intersection(df.columns):
+        df[col] = pd.to_datetime(df[col]).astype("datetime64[ns]")
+    for col in TIMESTAMP_COLUMNS.intersection(df.columns):
+        df[col] = pd.to_datetime(df[col], format="ISO8601")
+    return df
+
+
+@dataclass(frozen=True)
+class Attribute:
+    """A groupable column resolved onto fact rows.
+
+    ``codes[i]`` is the position in ``labels`` of fact row ``i``'s value; missing
+    values get their own trailing code whose label is ``None``.
+    """
+
+    name: str
+    labels: np.ndarray
+    codes: np.ndarray
+
+    def allowed(self, values: Collection[Any] | slice) -> np.ndarray:
+        return allowed_labels(self.labels, values)
+
+
+def allowed_labels(labels: np.ndarray, values: Collection[Any] | slice) -> np.ndarray:
+    """Boolean mask over ``labels`` for a value set or a half-open ``slice(lo, hi)``."""
+    series = pd.Series(labels).infer_objects()
+    if not isinstance(values, slice):
+        if pd.api.types.is_datetime64_any_dtype(series):
+            values = pd.to_datetime(list(values))
+        return series.isin(values).to_numpy()
+    keep = series.notna()
+    if values.start is not None:
+        keep &= series >= values.start
+    if values.stop is not None:
+        keep &= series < values.stop
+    return keep.to_numpy()
+
+
+def _smallest_int(n: int) -> type:
+    for dtype in (np.int8, np.int16, np.int32):
+        if n < np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+class StarSchema:
+    """The fact table as NumPy columns plus dimension frames indexed by surrogate key.
+
+    Dimension attributes are resolved onto fact rows lazily (``attribute``) as
+    small integer codes gathered through the fact row's dimension position, so
+    grouping never joins frames.
+    """
+
+    def __init__(self, fact: Mapping[str, np.ndarray], dims: Mapping[str, pd.DataFrame]):
+        self.fact = dict(fact)
+        self.dims = dict(dims)
+        self.n_rows = len(self.fact["time_key"])
+        self._attributes: dict[str, Attribute] = {}
+        self._positions: dict[str, np.ndarray] = {}
+        self._columns: dict[str, tuple[str, str]] = {}
+        seen: dict[str, int] = {}
+        for dim, df in self.dims.items():
+            for col in df.columns:
+                seen[col] = seen.get(col, 0) + 1
+                self._columns[f"{dim}.{col}"] = (dim, col)
+        for dim, df in self.dims.items():
+            for col in df.columns:
+                if seen[col] == 1 and col not in self.fact:
+                    self._columns[col] = (dim, col)
+
+    @classmethod
+    def load(cls, directory: Path = STAR_DIR) -> "StarSchema":
+        fact_df = read_table(directory, FACT_TABLE, FACT_COLUMNS)
+        fact = {
+            col: fact_df[col].fillna(0).to_numpy(dtype=dtype)
+            for col, dtype in FACT_COLUMNS.items()
+        }
+        del fact_df
+        dims = {}
+        for dim, key in DIMENSIONS.items():
+            df = read_table(directory, dim)
+            dims[dim] = df.set_index(key).sort_index()
+        return cls(fact, dims)
+
+    def restrict(self, user_keys: np.ndarray) -> "StarSchema":
+        """The fact and ``dim_user`` rows of the given users; the other dimensions are shared."""
+        users = self.dims["dim_user"]
+        keep_user = np.isin(users.index.to_numpy(), user_keys)
+        keep = keep_user[self.positions("dim_user")]
+        dims = {**self.dims, "dim_user": users[keep_user]}
+        return StarSchema({col: values[keep] for col, values in self.fact.items()}, dims)
+
+    def attribute(self, name: str) -> Attribute:
+        """Resolve a fact column or (optionally ``dim.``-qualified) dimension column."""
+        attr = self._attributes.get(name)
+        if attr is None:
+            attr = self._build_attribute(name)
+            self._attributes[name] = attr
+        return attr
+
+    def positions(self, dim: str) -> np.ndarray:
+        """Row position in ``dims[dim]`` of every fact row.
+
+        Surrogate keys are not necessarily dense (``time_key`` is YYYYMMDD), so
+        keys are resolved with a binary search over the sorted dimension index.
+        Raises ``ValueError`` for a fact key that has no dimension row.
+        """
+        pos = self._positions.get(dim)
+        if pos is None:
+            keys = self.dims[dim].index.to_numpy()
+            fact_keys = self.fact[DIMENSIONS[dim]]
+            pos = np.searchsorted(keys, fact_keys)
+            found = pos < len(keys)
+            found[found] = keys[pos[found]] == fact_keys[found]
+            if not found.all():
+                key = fact_keys[np.argmin(found)]
+                raise ValueError(f"{FACT_TABLE}.{DIMENSIONS[dim]} {key} has no row in {dim}")
+            pos = pos.astype(np.int32)
+            self._positions[dim] = pos
+        return pos
+
+    def column(self, dim: str, col: str) -> np.ndarray:
+        """Values of a dimension column for every fact row."""
+        return self.dims[dim][col].to_numpy()[self.positions(dim)]
+
+    def mask(self, where: Mapping[str, Collection[Any] | slice] | None) -> np.ndarray | None:
+        """Row mask for ``{attribute: allowed values or slice(lo, hi)}``; ``None`` keeps all rows."""
+        if not where:
+            return None
+        mask = np.ones(self.n_rows, dtype=bool)
+        for name, values in where.items():
+            attr = self.attribute(name)
+            mask &= attr.allowed(values)[attr.codes]
+        return mask
+
+    def _build_attribute(self, name: str) -> Attribute:
+        if name in self.fact:
+            labels, codes = np.unique(self.fact[name], return_inverse=True)
+            return Attribute(name, labels, codes.astype(_smallest_int(len(labels))))
+        if name not in self._columns:
+            raise KeyError(f"unknown or ambiguous attribute {name!r}")
+        dim, col = self._columns[name]
+        df = self.dims[dim]
+        dim_codes, labels = pd.factorize(df[col], sort=True)
+        labels = np.asarray(labels, dtype=object if labels.dtype == object else None)
+        if (dim_codes < 0).any():
+            labels = np.append(labels.astype(object), None)
+            dim_codes = np.where(dim_codes < 0, len(labels) - 1, dim_codes)
+        dim_codes = dim_codes.astype(_smallest_int(len(labels)))
+        return Attribute(name, labels, dim_codes[self.positions(dim)])
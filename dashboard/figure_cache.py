@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import functools
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+import pandas as pd
+import plotly.io as pio
+
+from dashboard import data, metrics
+from dashboard.cache import CACHE_DIR
+
+FIGURE_CACHE_DIR = os.environ.get("DASHBOARD_FIGURE_CACHE_DIR", str(CACHE_DIR.parent / "figures"))
+FIGURE_CACHE_SIZE = int(os.environ.get("DASHBOARD_FIGURE_CACHE_SIZE", "256"))
+FIGURE_CACHE_TTL = float(os.environ.get("DASHBOARD_FIGURE_CACHE_TTL", "3600"))
+
+
+class FigureCache:
+    """Bounded LRU/TTL cache for callback outputs with an optional on-disk layer.
+
+    The in-memory layer is per process. When ``directory`` is set, entries are
+    also written there as JSON so every worker sharing the directory can reuse
+    figures built by another one. Files are tagged with the data version they
+    were built from, and each write removes those of other versions or past
+    the TTL.
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: float = 3600.0, directory: str | Path | None = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.directory = Path(directory) if directory else None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, version: str = "") -> Any | None:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] <= self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self._entries.pop(key, None)
+
+        value = self._read_disk(key, version)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._store(key, value)
+        return value
+
+    def set(self, key: str, value: Any, version: str = "") -> None:
+        with self._lock:
+            self._store(key, value)
+        self._write_disk(key, value, version)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.disk_hits = self.misses = 0
+        if self.directory is not None:
+            for path in self.directory.glob("*.json"):
+                path.unlink(missing_ok=True)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+            }
+
+    def memoize(self, name: str, normalize: Callable[..., tuple]) -> Callable:
+        """Cache a callback's outputs, keyed on ``normalize(*args)`` and the data version."""
+
+        def decorator(func: Callable) -> Callable:
+            @functools.wraps(func)
+            def wrapper(*args):
+                version = data.DATA_VERSION
+                key = make_key(name, version, normalize(*args))
+                cached = self.get(key, version)
+                metrics.record_cache("miss" if cached is None else "hit")
+                if cached is not None:
+                    return cached
+                result = func(*args)
+                self.set(key, result, version)
+                return result
+
+            return wrapper
+
+        return decorator
+
+    def _store(self, key: str, value: Any) -> None:
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def _path(self, key: str, version: str) -> Path:
+        return self.directory / f"{_version_tag(version)}.{key}.json"
+
+    def _read_disk(self, key: str, version: str) -> Any | None:
+        if self.directory is None:
+            return None
+        path = self._path(key, version)
+        try:
+            if time.time() - path.stat().st_mtime > self.ttl:
+                return None
+            payload = json.loads(path.read_text())
+        except (OSError, ValueError):
+            return None
+        return tuple(payload["figures"]) if payload["multi"] else payload["figures"][0]
+
+    def _write_disk(self, key: str, value: Any, version: str) -> None:
+        if self.directory is None:
+            return
+        path = self._path(key, version)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            multi = isinstance(value, (tuple, list))
+            figures = ",".join(pio.to_json(fig, validate=False) for fig in (value if multi else (value,)))
+            tmp.write_text(f'{{"multi":{json.dumps(multi)},"figures":[{figures}]}}')
+            os.replace(tmp, path)
+        except OSError:
+            tmp.unlink(missing_ok=True)
+            return
+        self._prune_disk(version)
+
+    def _prune_disk(self, version: str) -> None:
+        """Drop entries of other data versions or past the TTL, then the oldest beyond the bound."""
+        tag = _version_tag(version)
+        now = time.time()
+        current = []
+        for path in self.directory.glob("*.json"):
+            if not path.name.startswith(f"{tag}."):
+                path.unlink(missing_ok=True)
+                continue
+            try:
+                mtime = path.stat().st_mtime
+            except OSError:
+                continue
+            if now - mtime > self.ttl:
+                path.unlink(missing_ok=True)
+            else:
+                current.append((mtime, path))
+        if len(current) <= self.maxsize * 8:
+            return
+        current.sort(key=lambda entry: entry[0])
+        for _, path in current[: len(current) - self.maxsize * 4]:
+            path.unlink(missing_ok=True)
+
+
+def _version_tag(version: str) -> str:
+    return hashlib.sha256(str(version).encode()).hexdigest()[:12]
+
+
+def make_key(name: str, *parts: Any) -> str:
+    payload = json.dumps([name, *parts], default=str, separators=(",", ":"))
+    return f"{name}-{hashlib.sha256(payload.encode()).hexdigest()[:24]}"
+
+
+def clamp_range(start: str | None, end: str | None, lo: pd.Timestamp, hi: pd.Timestamp) -> tuple[str, str]:
+    """Date picker bounds clamped to the data range ``[lo, hi]``.
+
+    Only the open sides are clamped (start up to ``lo``, end down to ``hi``), which
+    never changes which rows ``data.select`` keeps.
+    """
+    start_ts = max(pd.Timestamp(start), lo) if start else lo
+    end_ts = min(pd.Timestamp(end), hi) if end else hi
+    return start_ts.isoformat(), end_ts.isoformat()
+
+
+def normalize_choice(values: Iterable[str] | None, universe: Iterable[str]) -> tuple[str, ...]:
+    """Sorted selection, with "everything selected" folded into "nothing selected".
+
+    The callbacks treat an empty selection as no filter, so both produce the
+    same figures and can share a cache entry.
+    """
+    selected = sorted(set(values or []))
+    if set(selected) >= set(universe):
+        return ()
+    return tuple(selected)
+
+
+FIGURES = FigureCache(FIGURE_CACHE_SIZE, FIGURE_CACHE_TTL, FIGURE_CACHE_DIR or None)
+
+
+def _collect_stats() -> list[str]:
+    stats = FIGURES.stats()
+    return [
+        "# HELP dashboard_figure_cache_entries Figures held in this process's memory cache.",
+        "# TYPE dashboard_figure_cache_entries gauge",
+        f"dashboard_figure_cache_entries {stats['size']}",
+    ]
+
+
+metrics.REGISTRY.collectors.append(_collect_stats)
@@ -0,0 +1,31 @@
+"""Production settings: ``gunicorn -c dashboard/gunicorn.conf.py dashboard.app:server``.
+
+The app (and with it every dataset) is loaded once in the master and the
+workers are forked from it, so the data pages are shared copy-on-write. Each
+worker serves ``threads`` requests concurrently; callbacks spend most of their
+time in pandas and Plotly, so a few threads per worker and one worker per core
+is a good starting point. ``python -m dashboard.loadtest --server ...`` helps
+to size both.
+"""
+
+import gc
+import multiprocessing
+import os
+
+bind = os.environ.get("DASHBOARD_BIND", "127.0.0.1:8050")
+workers = int(os.environ.get("DASHBOARD_WORKERS", multiprocessing.cpu_count()))
+worker_class = "gthread"
+threads = int(os.environ.get("DASHBOARD_THREADS", "4"))
+timeout = int(os.environ.get("DASHBOARD_TIMEOUT", "60"))
+keepalive = 5
+# Recycled workers are forked from the master again and keep sharing its pages.
+max_requests = int(os.environ.get("DASHBOARD_MAX_REQUESTS", "0"))
+max_requests_jitter = max_requests // 10
+preload_app = True
+
+
+def pre_fork(server, worker):
+    # Move everything loaded so far out of the collector's generations: a
+    # collection in a worker would otherwise write to (and so copy) every page
+    # holding an object header.
+    gc.freeze()
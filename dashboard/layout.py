@@ -1,5 +1,6 @@
 from dash import dcc, html
 
+from dashboard import data
 from dashboard.components import (
     activation,
     additional_queries,
@@ -7,24 +8,72 @@ from dashboard.components import (
     content_types,
     device_impact,
     engagement_tier,
+    funnels,
     overview,
 )
 
+# Tab value -> component module. Only the shells are part of the initial layout;
+# ``callbacks.tabs`` fills a tab's body the first time it is selected.
+TABS = {
+    "overview": overview,
+    "engagement-tier": engagement_tier,
+    "content-types": content_types,
+    "activation": activation,
+    "device-impact": device_impact,
+    "collaboration": collaboration,
+    "funnels": funnels,
+    "additional-queries": additional_queries,
+}
+DEFAULT_TAB = "overview"
+
+
+def tab_body_id(tab: str) -> str:
+    return f"tab-body-{tab}"
+
+
+def segment_picker() -> html.Div:
+    """Segment expression applied to every KAQ figure (``callbacks.segment`` validates it)."""
+    enabled = data.RESULT_SOURCE == "star"
+    return html.Div(
+        className="segment-bar",
+        children=[
+            html.Label("Segment", htmlFor="segment-query"),
+            dcc.Input(
+                id="segment-query",
+                type="text",
+                debounce=True,
+                disabled=not enabled,
+                placeholder=(
+                    "e.g. subscription_tier=Business & region=EU & event_type=share & platform=mobile"
+                    if enabled
+                    else "Segments need the star engine (DASHBOARD_SOURCE=star)"
+                ),
+                className="segment-input",
+            ),
+            html.Div(id="segment-status", className="segment-status"),
+            dcc.Store(id="segment", data=None),
+        ],
+    )
+
 
 def build_layout() -> html.Div:
     return html.Div(
         className="page",
         children=[
+            segment_picker(),
             dcc.Tabs(
+                id="tabs",
+                value=DEFAULT_TAB,
                 className="tabs",
                 children=[
-                    overview.build_tab(),
-                    engagement_tier.build_tab(),
-                    content_types.build_tab(),
-                    activation.build_tab(),
-                    device_impact.build_tab(),
-                    collaboration.build_tab(),
-                    additional_queries.build_tab(),
+                    dcc.Tab(
+                        label=module.LABEL,
+                        value=tab,
+                        className="tab",
+                        selected_className="tab-selected",
+                        children=html.Div(id=tab_body_id(tab)),
+                    )
+                    for tab, module in TABS.items()
                 ],
             ),
         ],
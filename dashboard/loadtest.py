@@ -0,0 +1,455 @@
+from __future__ import annotations
+
+import argparse
+import http.client
+import json
+import os
+import random
+import shlex
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator
+from urllib.parse import urlsplit
+
+import numpy as np
+import pandas as pd
+
+from dashboard.data import BASE_DIR
+
+UPDATE_PATH = "/_dash-update-component"
+
+# One step of a scenario: the callback output key, input values overriding the
+# current ones, and the inputs reported as changed.
+Step = tuple[str, dict[tuple[str, str], Any], list[str]]
+
+
+class Client:
+    """Keep-alive HTTP client for one virtual user."""
+
+    def __init__(self, base_url: str, timeout: float = 60.0):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port or 80
+        self.prefix = parts.path.rstrip("/")
+        self.timeout = timeout
+        self._conn: http.client.HTTPConnection | None = None
+
+    def request(self, method: str, path: str, body: bytes | None = None) -> tuple[int, bytes]:
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        for attempt in range(2):
+            if self._conn is None:
+                self._conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            try:
+                self._conn.request(method, self.prefix + path, body=body, headers=headers)
+                response = self._conn.getresponse()
+                return response.status, response.read()
+            except (http.client.HTTPException, OSError):
+                self.close()
+                if attempt:
+                    raise
+        raise AssertionError("unreachable")
+
+    def get_json(self, path: str) -> Any:
+        status, payload = self.request("GET", path)
+        if status != 200:
+            raise RuntimeError(f"GET {path} returned {status}")
+        return json.loads(payload)
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+def _outputs(key: str) -> list[dict] | dict:
+    """The ``outputs`` field the Dash renderer sends for an output key."""
+
+    def parse(spec: str) -> dict:
+        component_id, _, prop = spec.rpartition(".")
+        return {"id": component_id, "property": prop}
+
+    if key.startswith(".."):
+        return [parse(spec) for spec in key[2:-2].split("...")]
+    return parse(key)
+
+
+def _components(layout: Any) -> dict[str, dict]:
+    found = {}
+    stack = [layout]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, list):
+            stack.extend(node)
+        elif isinstance(node, dict) and "props" in node:
+            props = node["props"]
+            if "id" in props:
+                found[props["id"]] = props
+            stack.append(props.get("children"))
+    return found
+
+
+def _tab_values(layout: Any) -> list[str]:
+    values = []
+    stack = [layout]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, list):
+            stack.extend(reversed(node))
+        elif isinstance(node, dict) and "props" in node:
+            if node.get("type") == "Tab" and "value" in node["props"]:
+                values.append(node["props"]["value"])
+            stack.append(node["props"].get("children"))
+    return values
+
+
+@dataclass
+class App:
+    """Callbacks and component state as served to the browser.
+
+    Tab contents are rendered by a callback on ``tabs.value``; ``fetch`` renders
+    every tab once so that scenarios know the controls inside them.
+    """
+
+    dependencies: dict[str, dict]
+    props: dict[str, dict]
+    initial: set[str] = field(default_factory=set)
+    tabs: dict[str, set[str]] = field(default_factory=dict)
+    tab_key: str | None = None
+
+    @classmethod
+    def fetch(cls, client: Client) -> "App":
+        dependencies = {dep["output"]: dep for dep in client.get_json("/_dash-dependencies")}
+        layout = client.get_json("/_dash-layout")
+        app = cls(dependencies, _components(layout))
+        app.initial = set(app.props)
+        app.tab_key = next(
+            (key for key, dep in dependencies.items() if {"id": "tabs", "property": "value"} in dep["inputs"]), None
+        )
+        if app.tab_key is None:
+            return app
+        for tab in _tab_values(layout):
+            status, payload = client.request("POST", UPDATE_PATH, app.body(app.tab_key, {("tabs", "value"): tab}, []))
+            if status != 200:
+                raise RuntimeError(f"rendering tab {tab!r} returned {status}")
+            rendered = {}
+            for body in json.loads(payload)["response"].values():
+                rendered.update(_components(body.get("children")))
+            app.props.update(rendered)
+            app.tabs[tab] = set(rendered)
+        return app
+
+    def triggered_by(self, component_id: str) -> list[str]:
+        return [key for key, dep in self.dependencies.items() if any(i["id"] == component_id for i in dep["inputs"])]
+
+    def tab_of(self, component_id: str) -> str | None:
+        return next((tab for tab, ids in self.tabs.items() if component_id in ids), None)
+
+    def body(self, key: str, values: dict[tuple[str, str], Any], changed: list[str]) -> bytes:
+        def value(spec: dict) -> Any:
+            ident = (spec["id"], spec["property"])
+            if ident in values:
+                return values[ident]
+            if spec["property"] == "id":
+                return spec["id"]
+            return self.props.get(spec["id"], {}).get(spec["property"])
+
+        dep = self.dependencies[key]
+        payload = {
+            "output": key,
+            "outputs": _outputs(key),
+            "inputs": [{**spec, "value": value(spec)} for spec in dep["inputs"]],
+            "changedPropIds": changed,
+            "state": [{**spec, "value": value(spec)} for spec in dep["state"]],
+        }
+        return json.dumps(payload).encode()
+
+
+def label(key: str) -> str:
+    outputs = _outputs(key)
+    ids = [o["id"] for o in (outputs if isinstance(outputs, list) else [outputs])]
+    return ",".join(dict.fromkeys(ids))
+
+
+# Scenarios ----------------------------------------------------------------------
+
+
+def open_tab(app: App, tab: str) -> Iterator[Step]:
+    """First visit of a tab: render its content, then the callbacks its new components fire."""
+    if app.tab_key is None:
+        return
+    yield app.tab_key, {("tabs", "value"): tab}, ["tabs.value"]
+    ids = app.tabs.get(tab, set())
+    for key, dep in app.dependencies.items():
+        if key != app.tab_key and not dep.get("prevent_initial_call") and any(i["id"] in ids for i in dep["inputs"]):
+            yield key, {}, []
+
+
+def page_load(app: App, rng: random.Random) -> Iterator[Step]:
+    """A fresh browser tab: the initial callbacks, then the default tab's content."""
+    for key, dep in app.dependencies.items():
+        if key != app.tab_key and all(i["id"] in app.initial for i in dep["inputs"]):
+            yield key, {}, []
+    if app.tab_key is not None:
+        yield from open_tab(app, app.props["tabs"]["value"])
+
+
+def tab_switch(app: App, rng: random.Random) -> Iterator[Step]:
+    """Open a random tab for the first time."""
+    if app.tabs:
+        yield from open_tab(app, rng.choice(sorted(app.tabs)))
+
+
+def _date_drag(prefix: str) -> Callable[[App, random.Random], Iterator[Step]]:
+    def scenario(app: App, rng: random.Random) -> Iterator[Step]:
+        picker = f"{prefix}-date"
+        (key,) = [k for k in app.triggered_by(picker) if k.endswith(".figure..") or k.endswith(".figure")]
+        # Switching to the tab renders it and its figures with the current values ...
+        tab = app.tab_of(picker)
+        if tab is None:
+            yield key, {}, []
+        else:
+            yield from open_tab(app, tab)
+        # ... then the user drags one end of the range a month at a time.
+        props = app.props[picker]
+        lo, hi = pd.Timestamp(props["min_date_allowed"]), pd.Timestamp(props["max_date_allowed"])
+        start, end = lo, hi
+        for _ in range(rng.randint(3, 8)):
+            if rng.random() < 0.5:
+                start = min(start + pd.DateOffset(months=1), end)
+                changed = f"{picker}.start_date"
+            else:
+                end = max(end - pd.DateOffset(months=1), start)
+                changed = f"{picker}.end_date"
+            values = {(picker, "start_date"): start.strftime("%Y-%m-%d"), (picker, "end_date"): end.strftime("%Y-%m-%d")}
+            yield key, values, [changed]
+
+    scenario.__doc__ = f"Open the {prefix.upper()} tab and drag its date range."
+    return scenario
+
+
+def _metric_switch(prefix: str) -> Callable[[App, random.Random], Iterator[Step]]:
+    def scenario(app: App, rng: random.Random) -> Iterator[Step]:
+        control = f"{prefix}-metric"
+        (key,) = app.triggered_by(control)
+        for option in rng.sample(app.props[control]["options"], len(app.props[control]["options"])):
+            yield key, {(control, "value"): option["value"]}, [f"{control}.value"]
+
+    scenario.__doc__ = f"Cycle through the {prefix.upper()} metric dropdown."
+    return scenario
+
+
+def table_paging(app: App, rng: random.Random) -> Iterator[Step]:
+    """Page through and sort one raw-data table."""
+    table = rng.choice([cid for cid, props in app.props.items() if props.get("page_action") == "custom"])
+    (key,) = [k for k in app.triggered_by(table) if f"{table}.data" in k]
+    columns = [c["id"] for c in app.props[table].get("columns", [])]
+    sort_by: list[dict] = []
+    for page in range(rng.randint(2, 5)):
+        changed = f"{table}.page_current"
+        if columns and rng.random() < 0.3:
+            sort_by = [{"column_id": rng.choice(columns), "direction": rng.choice(["asc", "desc"])}]
+            changed = f"{table}.sort_by"
+        yield key, {(table, "page_current"): page, (table, "sort_by"): sort_by}, [changed]
+
+
+SCENARIOS: dict[str, Callable[[App, random.Random], Iterator[Step]]] = {
+    "page_load": page_load,
+    "tab_switch": tab_switch,
+    "kaq1_dates": _date_drag("kaq1"),
+    "kaq2_dates": _date_drag("kaq2"),
+    "kaq4_dates": _date_drag("kaq4"),
+    "kaq1_metric": _metric_switch("kaq1"),
+    "kaq2_metric": _metric_switch("kaq2"),
+    "table_paging": table_paging,
+}
+
+
+# Runner -------------------------------------------------------------------------
+
+
+@dataclass
+class Stats:
+    latencies: dict[str, list[float]] = field(default_factory=lambda: defaultdict(list))
+    errors: dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def record(self, name: str, elapsed_ms: float, ok: bool) -> None:
+        with self.lock:
+            self.latencies[name].append(elapsed_ms)
+            if not ok:
+                self.errors[name] += 1
+
+    def summary(self, duration: float) -> dict[str, dict]:
+        rows = {}
+        everything = [ms for values in self.latencies.values() for ms in values]
+        for name, values in sorted(self.latencies.items()) + [("TOTAL", everything)]:
+            errors = sum(self.errors.values()) if name == "TOTAL" else self.errors.get(name, 0)
+            rows[name] = {
+                "requests": len(values),
+                "rps": round(len(values) / duration, 2),
+                "p50_ms": round(float(np.percentile(values, 50)), 1) if values else None,
+                "p95_ms": round(float(np.percentile(values, 95)), 1) if values else None,
+                "p99_ms": round(float(np.percentile(values, 99)), 1) if values else None,
+                "max_ms": round(max(values), 1) if values else None,
+                "error_rate": round(errors / len(values), 4) if values else 0.0,
+            }
+        return rows
+
+
+def virtual_user(
+    base_url: str,
+    app: App,
+    scenarios: list[str],
+    deadline: float,
+    think: float,
+    seed: int,
+    stats: Stats,
+) -> None:
+    rng = random.Random(seed)
+    client = Client(base_url)
+    try:
+        while time.monotonic() < deadline:
+            for key, values, changed in SCENARIOS[rng.choice(scenarios)](app, rng):
+                if time.monotonic() >= deadline:
+                    return
+                body = app.body(key, values, changed)
+                start = time.perf_counter()
+                try:
+                    status, _ = client.request("POST", UPDATE_PATH, body)
+                    ok = status in (200, 204)
+                except (http.client.HTTPException, OSError):
+                    ok = False
+                stats.record(label(key), (time.perf_counter() - start) * 1000, ok)
+                if think:
+                    time.sleep(rng.expovariate(1 / think))
+    finally:
+        client.close()
+
+
+def run(
+    base_url: str,
+    users: int,
+    duration: float,
+    scenarios: list[str],
+    think: float = 0.0,
+    ramp: float = 0.0,
+    seed: int = 0,
+) -> dict[str, dict]:
+    """Run ``users`` concurrent virtual users for ``duration`` seconds; per-callback summary."""
+    setup = Client(base_url)
+    try:
+        app = App.fetch(setup)
+    finally:
+        setup.close()
+    stats = Stats()
+    start = time.monotonic()
+    deadline = start + ramp + duration
+    threads = []
+    for i in range(users):
+        thread = threading.Thread(
+            target=virtual_user,
+            args=(base_url, app, scenarios, deadline, think, seed + i, stats),
+            name=f"vu-{i}",
+            daemon=True,
+        )
+        threads.append(thread)
+        thread.start()
+        if ramp:
+            time.sleep(ramp / users)
+    for thread in threads:
+        thread.join()
+    return stats.summary(time.monotonic() - start)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(command: str | None, port: int, timeout: float = 120.0) -> subprocess.Popen:
+    """Start the dashboard (or ``command``, with ``{port}`` substituted) and wait until it answers."""
+    env = {**os.environ, "PORT": str(port), "HOST": "127.0.0.1"}
+    args = shlex.split(command.format(port=port)) if command else [sys.executable, "-m", "dashboard.app"]
+    process = subprocess.Popen(args, cwd=BASE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    client = Client(f"http://127.0.0.1:{port}", timeout=5)
+    deadline = time.monotonic() + timeout
+    try:
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"server exited with status {process.returncode}")
+            try:
+                if client.request("GET", "/_dash-dependencies")[0] == 200:
+                    return process
+            except OSError:
+                time.sleep(0.25)
+        raise RuntimeError("server did not start in time")
+    except BaseException:
+        process.terminate()
+        raise
+    finally:
+        client.close()
+
+
+def print_report(rows: dict[str, dict]) -> None:
+    print(f"{'callback':46} {'reqs':>6} {'req/s':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8} {'errors':>7}")
+    for name, row in rows.items():
+        if not row["requests"]:
+            continue
+        print(
+            f"{name[:46]:46} {row['requests']:>6} {row['rps']:>7.1f} {row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f}"
+            f" {row['p99_ms']:>8.1f} {row['max_ms']:>8.1f} {row['error_rate']:>7.1%}"
+        )
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Replay dashboard interactions as concurrent /_dash-update-component POSTs.")
+    parser.add_argument("--url", default=None, help="running dashboard to test (default: start one locally)")
+    parser.add_argument(
+        "--server", default=None, help="command starting the server on {port}, e.g. a WSGI server with N workers"
+    )
+    parser.add_argument("--users", default="8", help="concurrent virtual users; a comma separated list runs a sweep")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds per run")
+    parser.add_argument("--ramp", type=float, default=0.0, help="seconds over which users are started")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="mean pause between interactions")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help=f"any of {', '.join(SCENARIOS)}")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", default=None, help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    scenarios = args.scenarios.split(",")
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    sweep = [int(n) for n in args.users.split(",")]
+
+    process = None
+    url = args.url
+    if url is None:
+        port = _free_port()
+        process = start_server(args.server, port)
+        url = f"http://127.0.0.1:{port}"
+    results = {}
+    try:
+        for users in sweep:
+            print(f"{users} users, {args.duration:.0f}s against {url}")
+            results[str(users)] = rows = run(url, users, args.duration, scenarios, args.think_ms / 1000, args.ramp, args.seed)
+            print_report(rows)
+            print()
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=10)
+
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
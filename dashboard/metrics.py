@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import contextvars
+import functools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+METRICS_ENABLED = os.environ.get("DASHBOARD_METRICS", "1") != "0"
+METRICS_PATH = os.environ.get("DASHBOARD_METRICS_PATH", "/metrics")
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (1_000, 4_000, 16_000, 64_000, 256_000, 1_000_000, 4_000_000)
+
+_current_callback: contextvars.ContextVar[str] = contextvars.ContextVar("callback", default="unknown")
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labels, labels)} {_number(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = (), buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        # labels -> [count per bucket..., +Inf count, sum]
+        self._values: dict[tuple[str, ...], list[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        with self._lock:
+            slots = self._values.get(labels)
+            if slots is None:
+                slots = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    slots[i] += 1
+                    break
+            else:
+                slots[len(self.buckets)] += 1
+            slots[-1] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, slots in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip((*self.buckets, float("inf")), slots):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else _number(bound)
+                    bucket_labels = _format_labels(self.labels, labels, 'le="' + le + '"')
+                    lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labels, labels)} {_number(slots[-1])}")
+                lines.append(f"{self.name}_count{_format_labels(self.labels, labels)} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: list[Counter | Histogram] = []
+        self.collectors: list[Callable[[], list[str]]] = []
+
+    def add(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = [line for metric in self.metrics for line in metric.render()]
+        for collect in self.collectors:
+            lines.extend(collect())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+CALLBACK_SECONDS = REGISTRY.add(
+    Histogram("dashboard_callback_seconds", "Callback wall time including response serialization.", ("callback",))
+)
+PHASE_SECONDS = REGISTRY.add(
+    Histogram("dashboard_callback_phase_seconds", "Time spent in a callback phase (filter, figure).", ("callback", "phase"))
+)
+RESPONSE_BYTES = REGISTRY.add(
+    Histogram("dashboard_callback_response_bytes", "Serialized callback response size.", ("callback",), SIZE_BUCKETS)
+)
+CALLBACK_ERRORS = REGISTRY.add(
+    Counter("dashboard_callback_errors_total", "Callbacks that raised an exception.", ("callback",))
+)
+CACHE_REQUESTS = REGISTRY.add(
+    Counter("dashboard_figure_cache_requests_total", "Figure cache lookups by result.", ("callback", "result"))
+)
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Time a block of the running callback, e.g. ``with phase("filter"): ...``."""
+    if not METRICS_ENABLED:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        PHASE_SECONDS.observe(time.perf_counter() - start, _current_callback.get(), name)
+
+
+def record_cache(result: str) -> None:
+    if METRICS_ENABLED:
+        CACHE_REQUESTS.inc(_current_callback.get(), result)
+
+
+def _timed(func: Callable, name: str) -> Callable:
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        token = _current_callback.set(name)
+        start = time.perf_counter()
+        try:
+            response = func(*args, **kwargs)
+        except Exception:
+            CALLBACK_ERRORS.inc(name)
+            raise
+        finally:
+            CALLBACK_SECONDS.observe(time.perf_counter() - start, name)
+            _current_callback.reset(token)
+        if isinstance(response, (str, bytes)):
+            RESPONSE_BYTES.observe(len(response), name)
+        return response
+
+    return wrapper
+
+
+def instrument(app) -> None:
+    """Time every registered callback and serve the metrics on ``METRICS_PATH``.
+
+    Dash stores each callback in ``app.callback_map`` already wrapped so that it
+    returns the serialized JSON response; wrapping that covers serialization and
+    gives the payload size for free.
+    """
+    if not METRICS_ENABLED:
+        return
+    for entry in app.callback_map.values():
+        func = entry["callback"]
+        entry["callback"] = _timed(func, getattr(func, "__name__", "callback"))
+
+    @app.server.route(METRICS_PATH)
+    def metrics():
+        return REGISTRY.render(), 200, {"Content-Type": "text/plain; version=0.0.4; charset=utf-8"}
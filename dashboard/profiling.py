@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import functools
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from types import FrameType
+from typing import Callable
+
+from dashboard.cache import CACHE_DIR
+
+# "1" profiles every callback, "header" only requests sending PROFILE_HEADER.
+PROFILE_MODE = os.environ.get("DASHBOARD_PROFILE", "0").lower()
+PROFILE_HEADER = "X-Dashboard-Profile"
+PROFILE_DIR = Path(os.environ.get("DASHBOARD_PROFILE_DIR", str(CACHE_DIR.parent / "profiles")))
+PROFILE_THRESHOLD_MS = float(os.environ.get("DASHBOARD_PROFILE_THRESHOLD_MS", "500"))
+PROFILE_INTERVAL_MS = float(os.environ.get("DASHBOARD_PROFILE_INTERVAL_MS", "5"))
+PROFILE_KEEP = int(os.environ.get("DASHBOARD_PROFILE_KEEP", "200"))
+
+_UNSAFE = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+class Sampler:
+    """Samples the Python stacks of registered threads from one daemon thread.
+
+    Each profiled callback registers the thread it runs on; the sampler thread
+    only exists while at least one callback is being profiled.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._targets: dict[int, list[tuple[str, ...]]] = {}
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    def start(self, thread_id: int) -> list[tuple[str, ...]]:
+        samples: list[tuple[str, ...]] = []
+        with self._lock:
+            self._targets[thread_id] = samples
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="dashboard-profiler", daemon=True)
+                self._thread.start()
+        return samples
+
+    def stop(self, thread_id: int) -> None:
+        with self._lock:
+            self._targets.pop(thread_id, None)
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                if not self._targets:
+                    self._thread = None
+                    return
+                frames = sys._current_frames()
+                for thread_id, samples in self._targets.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        samples.append(_stack(frame))
+
+
+def _stack(frame: FrameType | None) -> tuple[str, ...]:
+    """Frame labels from the outermost call to ``frame``."""
+    labels = []
+    while frame is not None:
+        code = frame.f_code
+        labels.append(f"{code.co_name} ({code.co_filename}:{frame.f_lineno})")
+        frame = frame.f_back
+    return tuple(reversed(labels))
+
+
+def collapsed(samples: list[tuple[str, ...]]) -> str:
+    """Brendan Gregg's folded format, readable by flamegraph.pl, speedscope and inferno."""
+    counts = Counter(";".join(stack) for stack in samples)
+    return "".join(f"{stack} {count}\n" for stack, count in sorted(counts.items()))
+
+
+def speedscope(samples: list[tuple[str, ...]], name: str, interval_ms: float, metadata: dict) -> dict:
+    frames: list[dict] = []
+    index: dict[str, int] = {}
+    encoded = []
+    for stack in samples:
+        row = []
+        for label in stack:
+            if label not in index:
+                index[label] = len(frames)
+                func, _, location = label.partition(" (")
+                file, _, line = location.rstrip(")").rpartition(":")
+                frames.append({"name": func, "file": file, "line": int(line) if line.isdigit() else None})
+            row.append(index[label])
+        encoded.append(row)
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "exporter": "dashboard.profiling",
+        "name": name,
+        "shared": {"frames": frames},
+        "profiles": [
+            {
+                "type": "sampled",
+                "name": name,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": len(samples) * interval_ms,
+                "samples": encoded,
+                "weights": [interval_ms] * len(samples),
+            }
+        ],
+        # Ignored by speedscope; kept so a dump can be replayed against the same inputs.
+        "metadata": metadata,
+    }
+
+
+def write_profile(
+    samples: list[tuple[str, ...]], name: str, elapsed_ms: float, metadata: dict, directory: Path = PROFILE_DIR
+) -> Path:
+    """Write ``<stem>.speedscope.json`` and ``<stem>.collapsed``; returns the speedscope path."""
+    directory.mkdir(parents=True, exist_ok=True)
+    stem = f"{datetime.now():%Y%m%d-%H%M%S-%f}-{_UNSAFE.sub('_', name)}-{elapsed_ms:.0f}ms"
+    profile = speedscope(samples, name, PROFILE_INTERVAL_MS, {"callback": name, "elapsed_ms": elapsed_ms, **metadata})
+    outputs = {
+        directory / f"{stem}.speedscope.json": json.dumps(profile, default=str),
+        directory / f"{stem}.collapsed": collapsed(samples),
+    }
+    for path, text in outputs.items():
+        tmp = path.with_name(f".{path.name}.tmp")
+        tmp.write_text(text)
+        os.replace(tmp, path)
+    _prune(directory)
+    return next(iter(outputs))
+
+
+def _prune(directory: Path) -> None:
+    paths = sorted(directory.glob("*.speedscope.json"))
+    for path in paths[: max(len(paths) - PROFILE_KEEP, 0)]:
+        path.unlink(missing_ok=True)
+        path.with_name(path.name.replace(".speedscope.json", ".collapsed")).unlink(missing_ok=True)
+
+
+def _threshold(context) -> float | None:
+    """Threshold in ms for this request, or None when it should not be profiled.
+
+    The header value may carry its own threshold (``X-Dashboard-Profile: 0``
+    dumps every call); any other value uses ``PROFILE_THRESHOLD_MS``.
+    """
+    headers = getattr(context, "headers", None) or {}
+    value = next((v for k, v in headers.items() if k.lower() == PROFILE_HEADER.lower()), None)
+    if value is None:
+        return PROFILE_THRESHOLD_MS if PROFILE_MODE == "1" else None
+    try:
+        return float(value)
+    except ValueError:
+        return PROFILE_THRESHOLD_MS
+
+
+_SAMPLER = Sampler(PROFILE_INTERVAL_MS / 1000)
+
+
+def _profiled(func: Callable, name: str) -> Callable:
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        context = kwargs.get("callback_context")
+        threshold = _threshold(context)
+        if threshold is None:
+            return func(*args, **kwargs)
+        thread_id = threading.get_ident()
+        samples = _SAMPLER.start(thread_id)
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            _SAMPLER.stop(thread_id)
+            if elapsed_ms >= threshold and samples:
+                metadata = {
+                    "inputs": getattr(context, "inputs_list", None),
+                    "state": getattr(context, "states_list", None),
+                }
+                try:
+                    write_profile(samples, name, elapsed_ms, metadata)
+                except OSError:
+                    pass
+
+    return wrapper
+
+
+def instrument(app) -> None:
+    """Profile the registered callbacks when ``DASHBOARD_PROFILE`` is ``1`` or ``header``.
+
+    With profiling off the callbacks are left untouched.
+    """
+    if PROFILE_MODE not in ("1", "header"):
+        return
+    for entry in app.callback_map.values():
+        func = entry["callback"]
+        entry["callback"] = _profiled(func, getattr(func, "__name__", "callback"))
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import json
+from typing import Callable
+
+import plotly.express as px
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from dashboard import data
+from dashboard.figure_cache import FIGURES, make_key
+
+# Figures that depend on nothing but the data. They are built once per data
+# version and inlined into their tab's layout, so no callback round trip is needed.
+_BUILDERS: dict[str, Callable[[], go.Figure]] = {}
+
+
+def _static(name: str) -> Callable[[Callable[[], go.Figure]], Callable[[], go.Figure]]:
+    def decorator(build: Callable[[], go.Figure]) -> Callable[[], go.Figure]:
+        _BUILDERS[name] = build
+        return build
+
+    return decorator
+
+
+def figure(name: str) -> dict:
+    """Serialized figure ``name`` for the current data, from the figure cache when possible.
+
+    Plain JSON (rather than a ``go.Figure``) keeps Dash from re-validating and
+    re-encoding the figure every time the layout is served.
+    """
+    version = data.DATA_VERSION
+    key = make_key(f"static-{name}", version)
+    cached = FIGURES.get(key, version)
+    if cached is None:
+        cached = json.loads(pio.to_json(_BUILDERS[name](), validate=False))
+        FIGURES.set(key, cached, version)
+    return cached
+
+
+def build_all() -> None:
+    for name in _BUILDERS:
+        figure(name)
+
+
+@_static("overview-growth")
+def overview_growth() -> go.Figure:
+    growth_df = data.kaq3.sort_values("signup_month").copy()
+    growth_df["cumulative_new_users"] = growth_df["new_users"].astype("int64").cumsum()
+    growth_fig = go.Figure()
+    growth_fig.add_trace(
+        go.Scatter(
+            x=growth_df["signup_month"],
+            y=growth_df["cumulative_new_users"],
+            mode="lines+markers",
+            name="Cumulative new users",
+        )
+    )
+    growth_fig.update_layout(
+        title="Cumulative new users",
+        margin=dict(l=20, r=20, t=50, b=20),
+        xaxis_title="Time",
+        yaxis_title="Cumulative New Users",
+    )
+    return growth_fig
+
+
+@_static("aq1-events")
+def aq1_events() -> go.Figure:
+    aq1_sorted = data.aq1.sort_values("content_type_rank")
+    aq1_fig = px.bar(
+        aq1_sorted,
+        x="content_type",
+        y="events",
+        text="content_type_rank",
+        title="Total events by content type (ranked)",
+        labels={"content_type": "Content Type", "events": "Events"},
+    )
+    aq1_fig.update_traces(textposition="outside")
+    aq1_fig.update_layout(
+        margin=dict(l=20, r=20, t=50, b=20),
+        xaxis_title="Content Type",
+        yaxis_title="Events",
+    )
+    return aq1_fig
+
+
+@_static("aq2-dau")
+def aq2_dau() -> go.Figure:
+    dau_fig = go.Figure()
+    dau_fig.add_trace(
+        go.Scatter(
+            x=data.aq2["month_start"],
+            y=data.aq2["dau_current_month"],
+            mode="lines+markers",
+            name="Current month DAU",
+        )
+    )
+    dau_fig.add_trace(
+        go.Scatter(
+            x=data.aq2["month_start"],
+            y=data.aq2["dau_previous_month"],
+            mode="lines+markers",
+            name="Previous month DAU",
+        )
+    )
+    dau_fig.update_layout(
+        title="Month-over-month DAU",
+        margin=dict(l=20, r=20, t=50, b=20),
+        xaxis_title="Time",
+        yaxis_title="Daily Active Users",
+    )
+    return dau_fig
+
+
+@_static("aq2-change")
+def aq2_change() -> go.Figure:
+    change_fig = go.Figure()
+    change_fig.add_trace(
+        go.Bar(x=data.aq2["month_start"], y=data.aq2["abs_change"], name="Absolute change")
+    )
+    change_fig.add_trace(
+        go.Scatter(
+            x=data.aq2["month_start"],
+            y=data.aq2["rel_change"],
+            mode="lines+markers",
+            name="Relative change",
+            yaxis="y2",
+        )
+    )
+    change_fig.update_layout(
+        title="DAU change magnitude",
+        yaxis=dict(title="Absolute change"),
+        yaxis2=dict(title="Relative change", overlaying="y", side="right", tickformat=".0%"),
+        margin=dict(l=20, r=20, t=50, b=20),
+        xaxis_title="Time",
+    )
+    return change_fig
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import math
+import re
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from dashboard import data
+from dashboard.constants import RAW_TABLES
+
+_TERM = re.compile(
+    r"^\{(?P<col>[^}]+)\}\s+"
+    r"(?P<op>is blank|[si]?(?:contains|datestartswith|eq|ne|lt|le|gt|ge|!=|<=|>=|=|<|>))"
+    r"\s*(?P<value>.*)$"
+)
+_ALIASES = {"eq": "=", "ne": "!=", "lt": "<", "le": "<=", "gt": ">", "ge": ">="}
+_COMPARE = {
+    "=": np.equal,
+    "!=": np.not_equal,
+    "<": np.less,
+    "<=": np.less_equal,
+    ">": np.greater,
+    ">=": np.greater_equal,
+}
+
+# (table_id, sort, filter) -> row positions; paging then only slices.
+_ORDER_CACHE: OrderedDict[tuple, np.ndarray] = OrderedDict()
+_ORDER_CACHE_SIZE = 128
+_ORDER_LOCK = threading.Lock()
+
+
+def _unquote(value: str) -> str:
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'`":
+        return value[1:-1]
+    return value
+
+
+def _term_mask(df: pd.DataFrame, term: str) -> pd.Series:
+    match = _TERM.match(term.strip())
+    if match is None or match["col"] not in df.columns:
+        return pd.Series(True, index=df.index)
+    col = df[match["col"]]
+    op = match["op"]
+    value = _unquote(match["value"])
+
+    if op == "is blank":
+        return col.isna() | (col.astype("string") == "")
+
+    insensitive = op[0] == "i"
+    if op[0] in "si":
+        op = op[1:]
+    op = _ALIASES.get(op, op)
+
+    text = col.astype("string")
+    if op in ("contains", "datestartswith"):
+        if pd.api.types.is_datetime64_any_dtype(col):
+            text = col.dt.strftime("%Y-%m-%d").astype("string")
+        if insensitive:
+            text, value = text.str.lower(), value.lower()
+        if op == "contains":
+            return text.str.contains(value, regex=False, na=False)
+        return text.str.startswith(value, na=False)
+
+    if pd.api.types.is_datetime64_any_dtype(col):
+        target = pd.to_datetime(value, errors="coerce")
+        values = col
+    elif pd.api.types.is_numeric_dtype(col):
+        # Rates are stored as float32; compare at that precision so "= 0.7" matches.
+        dtype = np.float32 if col.dtype == np.float32 else np.float64
+        target = dtype(pd.to_numeric(value, errors="coerce"))
+        values = col.astype(dtype)
+    else:
+        target = value.lower() if insensitive else value
+        values = text.str.lower() if insensitive else text
+    if pd.isna(target):
+        return pd.Series(False, index=df.index)
+    return _COMPARE[op](values, target).fillna(False).astype(bool)
+
+
+def records(df: pd.DataFrame) -> list[dict]:
+    """Rows of ``df`` for a DataTable, with float32 values shown as written (0.7, not 0.699999988)."""
+    narrow = [col for col in df.columns if df[col].dtype == np.float32]
+    if narrow:
+        df = df.assign(**{col: df[col].astype(str).astype("float64") for col in narrow})
+    return df.to_dict("records")
+
+
+def _row_order(table_id: str, sort_by: tuple, filter_query: str) -> np.ndarray:
+    key = (table_id, data.DATA_VERSION, sort_by, filter_query)
+    with _ORDER_LOCK:
+        order = _ORDER_CACHE.get(key)
+        if order is not None:
+            _ORDER_CACHE.move_to_end(key)
+            return order
+
+    df = data.get(RAW_TABLES[table_id])
+    mask = pd.Series(True, index=df.index)
+    for term in re.split(r"\s+(?:&&|and)\s+", filter_query.strip()) if filter_query else []:
+        mask &= _term_mask(df, term)
+    subset = df[mask.to_numpy()]
+    if sort_by:
+        subset = subset.sort_values(
+            [col for col, _ in sort_by],
+            ascending=[direction == "asc" for _, direction in sort_by],
+            na_position="last",
+            kind="stable",
+        )
+    order = df.index.get_indexer(subset.index)
+
+    with _ORDER_LOCK:
+        _ORDER_CACHE[key] = order
+        while len(_ORDER_CACHE) > _ORDER_CACHE_SIZE:
+            _ORDER_CACHE.popitem(last=False)
+    return order
+
+
+def query_page(
+    table_id: str,
+    page_current: int | None,
+    page_size: int,
+    sort_by: list[dict] | None,
+    filter_query: str | None,
+) -> tuple[list[dict], int]:
+    """Return one page of a raw-data table after sorting/filtering, plus the page count."""
+    sort_key = tuple((s["column_id"], s["direction"]) for s in sort_by or [])
+    order = _row_order(table_id, sort_key, filter_query or "")
+    page_count = max(1, math.ceil(len(order) / page_size))
+    page_current = min(page_current or 0, page_count - 1)
+    rows = order[page_current * page_size : (page_current + 1) * page_size]
+    page = data.get(RAW_TABLES[table_id]).iloc[rows]
+    return records(page), page_count
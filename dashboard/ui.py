@@ -2,15 +2,21 @@ from __future__ import annotations
 
 from dash import dash_table, html
 
+import math
+
 import pandas as pd
 
+from dashboard import data
+from dashboard.constants import RAW_TABLES, TABLE_PAGE_SIZE
+from dashboard.table_query import records
+
 
-def datatable_from_df(df: pd.DataFrame, table_id: str) -> dash_table.DataTable:
+def datatable_from_df(df: pd.DataFrame, table_id: str, **table_args) -> dash_table.DataTable:
+    table_args.setdefault("page_size", TABLE_PAGE_SIZE)
     return dash_table.DataTable(
         id=table_id,
         columns=[{"name": col, "id": col} for col in df.columns],
-        data=df.to_dict("records"),
-        page_size=12,
+        data=records(df),
         style_table={"overflowX": "auto"},
         style_cell={
             "padding": "6px",
@@ -19,6 +25,27 @@ def datatable_from_df(df: pd.DataFrame, table_id: str) -> dash_table.DataTable:
             "whiteSpace": "normal",
         },
         style_header={"fontWeight": "600", "backgroundColor": "#f2f2f2"},
+        **table_args,
+    )
+
+
+def server_datatable(table_id: str) -> dash_table.DataTable:
+    """DataTable whose paging, sorting and filtering run in ``callbacks.tables``.
+
+    Only the first page is embedded in the layout; later pages are fetched on demand.
+    """
+    df = data.get(RAW_TABLES[table_id])
+    return datatable_from_df(
+        df.head(TABLE_PAGE_SIZE),
+        table_id,
+        page_action="custom",
+        page_current=0,
+        page_count=max(1, math.ceil(len(df) / TABLE_PAGE_SIZE)),
+        sort_action="custom",
+        sort_mode="multi",
+        sort_by=[],
+        filter_action="custom",
+        filter_query="",
     )
 
 
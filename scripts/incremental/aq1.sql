@@ -0,0 +1,10 @@
+-- AQ1 from summary_daily (same output as scripts/aq1.sql)
+SET search_path = notion_dw;
+
+SELECT
+  s.content_type,
+  SUM(s.events) AS events,
+  DENSE_RANK() OVER (ORDER BY SUM(s.events) DESC) AS content_type_rank
+FROM summary_daily s
+GROUP BY s.content_type
+ORDER BY content_type_rank, s.content_type;
@@ -0,0 +1,31 @@
+-- AQ2 from summary_daily (same output as scripts/aq2.sql)
+SET search_path = notion_dw;
+
+WITH monthly AS (
+  SELECT
+    DATE_TRUNC('month', t.calendar_date)::date AS month_start,
+    SUM(s.active_users) AS dau
+  FROM summary_daily s
+  JOIN dim_time t ON t.time_key = s.time_key
+  WHERE s.time_key >= 20240101
+    AND s.time_key <  20260101
+  GROUP BY DATE_TRUNC('month', t.calendar_date)
+),
+with_prev AS (
+  SELECT
+    month_start,
+    dau,
+    LAG(dau) OVER (ORDER BY month_start) AS prev_month_dau
+  FROM monthly
+)
+SELECT
+  month_start,
+  dau AS dau_current_month,
+  prev_month_dau AS dau_previous_month,
+  (dau - prev_month_dau) AS abs_change,
+  ROUND(
+    (dau - prev_month_dau)::numeric / NULLIF(prev_month_dau, 0),
+    4
+  ) AS rel_change
+FROM with_prev
+ORDER BY month_start;
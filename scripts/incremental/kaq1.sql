@@ -0,0 +1,22 @@
+-- KAQ1 from summary_daily (same output as scripts/kaq1.sql)
+SET search_path = notion_dw;
+
+SELECT
+  t.year,
+  t.month,
+  s.subscription_tier,
+  SUM(s.active_users)          AS dau,
+  SUM(s.events)                AS events,
+  ROUND(
+    SUM(s.events)::numeric / NULLIF(SUM(s.active_users), 0),
+    2
+  )                            AS events_per_active_user
+FROM summary_daily s
+JOIN dim_time t ON t.time_key = s.time_key
+GROUP BY GROUPING SETS (
+  (t.year, t.month, s.subscription_tier),
+  (t.year, t.month),
+  (s.subscription_tier),
+  ()
+)
+ORDER BY t.year NULLS LAST, t.month NULLS LAST, s.subscription_tier NULLS LAST;
@@ -0,0 +1,17 @@
+-- KAQ2 from summary_daily (same output as scripts/kaq2.sql)
+SET search_path = notion_dw;
+
+SELECT
+  t.year,
+  t.month,
+  s.content_type,
+  SUM(s.events)       AS events,
+  SUM(s.active_users) AS dau,
+  ROUND(
+    SUM(s.events)::numeric / NULLIF(SUM(s.active_users), 0),
+    2
+  )                   AS events_per_active_user
+FROM summary_daily s
+JOIN dim_time t ON t.time_key = s.time_key
+GROUP BY CUBE (t.year, t.month, s.content_type)
+ORDER BY t.year NULLS LAST, t.month NULLS LAST, s.content_type NULLS LAST;
@@ -0,0 +1,14 @@
+-- KAQ3 from summary_user_activation (same output as scripts/kaq3.sql)
+SET search_path = notion_dw;
+
+SELECT
+  signup_month,
+  COUNT(*)       AS new_users,
+  SUM(activated) AS activated_users,
+  ROUND(
+    SUM(activated)::numeric / NULLIF(COUNT(*), 0),
+    4
+  )              AS activation_rate
+FROM summary_user_activation
+GROUP BY signup_month
+ORDER BY signup_month;
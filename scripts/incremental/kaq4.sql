@@ -0,0 +1,14 @@
+-- KAQ4 from summary_daily (same output as scripts/kaq4.sql)
+SET search_path = notion_dw;
+
+SELECT
+  t.year,
+  t.month,
+  s.platform,
+  SUM(s.events)       AS events,
+  SUM(s.active_users) AS dau,
+  ROUND(SUM(s.duration_sum)::numeric / NULLIF(SUM(s.duration_count), 0), 1) AS avg_session_duration_sec
+FROM summary_daily s
+JOIN dim_time t ON t.time_key = s.time_key
+GROUP BY ROLLUP (t.year, t.month, s.platform)
+ORDER BY t.year NULLS LAST, t.month NULLS LAST, s.platform NULLS LAST;
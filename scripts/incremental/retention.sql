@@ -0,0 +1,33 @@
+-- Retention from summary_user_weeks (same output as scripts/retention.sql)
+SET search_path = notion_dw;
+
+WITH cohorts AS (
+  SELECT
+    DATE_TRUNC('month', signup_date)::date AS signup_month,
+    COUNT(*)                               AS cohort_users
+  FROM dim_user
+  WHERE signup_date IS NOT NULL
+  GROUP BY DATE_TRUNC('month', signup_date)
+),
+last_day AS (
+  SELECT TO_DATE(MAX(time_key)::text, 'YYYYMMDD') AS calendar_date
+  FROM fact_product_usage_engagement
+)
+SELECT
+  c.signup_month,
+  w.week,
+  c.cohort_users,
+  COUNT(uw.user_key)                     AS active_users,
+  ROUND(
+    COUNT(uw.user_key)::numeric / c.cohort_users,
+    4
+  )                                      AS retention_rate
+FROM cohorts c
+CROSS JOIN generate_series(0, 11) AS w(week)
+LEFT JOIN summary_user_weeks uw
+  ON uw.signup_month = c.signup_month
+ AND uw.week = w.week
+WHERE (c.signup_month + INTERVAL '1 month')::date + 7 * (w.week + 1) - 2
+      <= (SELECT calendar_date FROM last_day)
+GROUP BY c.signup_month, w.week, c.cohort_users
+ORDER BY c.signup_month, w.week;
@@ -0,0 +1,49 @@
+-- ==========================================================
+-- Incremental refresh: per-partition summaries and manifest
+--   summary_daily mirrors the monthly fact partitions (summary_p_YYYYMM) at
+--   day x tier x content type x platform x work mode grain. All KAQ/AQ
+--   roll-ups except KAQ3 are computed from it.
+--   summary_user_activation holds one row per user with events in their
+--   first 7 days (KAQ3).
+--   summary_user_weeks holds one row per user and week 0-11 after signup
+--   in which the user had an event (retention).
+--   refresh_manifest records the fingerprint of every fact partition at the
+--   time its summary was last rebuilt.
+-- ==========================================================
+
+SET search_path = notion_dw;
+
+CREATE TABLE IF NOT EXISTS summary_daily (
+  time_key                 INT NOT NULL,
+  subscription_tier        VARCHAR(32),
+  content_type             VARCHAR(32),
+  platform                 VARCHAR(32),
+  collaboration_event_flag SMALLINT NOT NULL,
+  events                   BIGINT NOT NULL,
+  active_users             BIGINT NOT NULL,
+  duration_sum             BIGINT,
+  duration_count           BIGINT NOT NULL
+) PARTITION BY RANGE (time_key);
+
+CREATE TABLE IF NOT EXISTS summary_user_activation (
+  user_key     INT PRIMARY KEY,
+  signup_month DATE NOT NULL,
+  activated    SMALLINT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS summary_user_weeks (
+  user_key     INT NOT NULL,
+  signup_month DATE NOT NULL,
+  week         SMALLINT NOT NULL,
+  PRIMARY KEY (user_key, week)
+);
+
+CREATE TABLE IF NOT EXISTS refresh_manifest (
+  partition_name TEXT PRIMARY KEY,
+  range_from     INT NOT NULL,
+  range_to       INT NOT NULL,
+  relfilenode    OID NOT NULL,
+  max_usage_id   BIGINT,
+  n_changed      BIGINT NOT NULL,
+  refreshed_at   TIMESTAMPTZ NOT NULL DEFAULT now()
+);
@@ -6,15 +6,16 @@ WITH user_events AS (
   SELECT
     u.user_key,
     u.signup_date,
-    t.calendar_date,
-    f.activation_event_flag,
-    ROW_NUMBER() OVER w AS rn_after_signup
+    f.activation_event_flag
   FROM fact_product_usage_engagement f
   JOIN dim_user u ON u.user_key = f.user_key
-  JOIN dim_time t ON t.time_key = f.time_key
-  WHERE t.calendar_date >= u.signup_date
-    AND t.calendar_date <  u.signup_date + INTERVAL '7 days'
-  WINDOW w AS (PARTITION BY u.user_key ORDER BY t.calendar_date)
+  -- time_key is the YYYYMMDD form of calendar_date. The per-user window can
+  -- only be applied after the join, so the literal range (the same as aq2.sql,
+  -- plus the first week after the last signups) is what lets the planner prune.
+  WHERE f.time_key >= TO_CHAR(u.signup_date, 'YYYYMMDD')::int
+    AND f.time_key <  TO_CHAR(u.signup_date + 7, 'YYYYMMDD')::int
+    AND f.time_key >= 20240101
+    AND f.time_key <  20260108
 ),
 activation_by_user AS (
   SELECT
@@ -0,0 +1,48 @@
+-- Weekly retention of new users: share of each signup month's users with at
+-- least one event in week 0-11 after their signup day
+
+SET search_path = notion_dw;
+
+WITH cohorts AS (
+  SELECT
+    DATE_TRUNC('month', signup_date)::date AS signup_month,
+    COUNT(*)                               AS cohort_users
+  FROM dim_user
+  WHERE signup_date IS NOT NULL
+  GROUP BY DATE_TRUNC('month', signup_date)
+),
+user_weeks AS (
+  SELECT DISTINCT
+    DATE_TRUNC('month', u.signup_date)::date AS signup_month,
+    u.user_key,
+    (t.calendar_date - u.signup_date) / 7    AS week
+  FROM fact_product_usage_engagement f
+  JOIN dim_user u ON u.user_key = f.user_key
+  JOIN dim_time t ON t.time_key = f.time_key
+  -- 12 weeks after signup, filtered on the partition key so the planner prunes.
+  WHERE f.time_key >= TO_CHAR(u.signup_date, 'YYYYMMDD')::int
+    AND f.time_key <  TO_CHAR(u.signup_date + 84, 'YYYYMMDD')::int
+),
+last_day AS (
+  SELECT TO_DATE(MAX(time_key)::text, 'YYYYMMDD') AS calendar_date
+  FROM fact_product_usage_engagement
+)
+SELECT
+  c.signup_month,
+  w.week,
+  c.cohort_users,
+  COUNT(uw.user_key)                     AS active_users,
+  ROUND(
+    COUNT(uw.user_key)::numeric / c.cohort_users,
+    4
+  )                                      AS retention_rate
+FROM cohorts c
+CROSS JOIN generate_series(0, 11) AS w(week)
+LEFT JOIN user_weeks uw
+  ON uw.signup_month = c.signup_month
+ AND uw.week = w.week
+-- Only weeks that have ended for the cohort's last possible signup day.
+WHERE (c.signup_month + INTERVAL '1 month')::date + 7 * (w.week + 1) - 2
+      <= (SELECT calendar_date FROM last_day)
+GROUP BY c.signup_month, w.week, c.cohort_users
+ORDER BY c.signup_month, w.week;
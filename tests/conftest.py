@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from dashboard.engine.star import StarSchema
+from warehouse.generate import generate
+
+
+@pytest.fixture(scope="session")
+def star_dir(tmp_path_factory):
+    """A scale-factor-1 export from the synthetic generator (about 100k fact rows)."""
+    out = tmp_path_factory.mktemp("star")
+    generate(out, scale=1, seed=0, workers=1, log=lambda *args: None)
+    return out
+
+
+@pytest.fixture(scope="session")
+def star(star_dir) -> StarSchema:
+    return StarSchema.load(star_dir)
+
+
+@pytest.fixture(scope="session")
+def empty_star(star) -> StarSchema:
+    return star.restrict(np.array([], dtype=np.int64))
+
+
+@pytest.fixture
+def star_data(star, tmp_path, monkeypatch):
+    """``dashboard.data`` in star mode over the generated star, with the cube kept in ``tmp_path``."""
+    from dashboard import data
+
+    monkeypatch.setattr(data, "RESULT_SOURCE", "star")
+    monkeypatch.setattr(data, "CUBE_DIR", tmp_path)
+    data.clear()
+    data.install("star", star)
+    data.install("DATA_VERSION", "test")
+    yield data
+    data.clear()
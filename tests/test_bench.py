@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import pytest
+
+pytest.importorskip("psycopg")
+
+from warehouse import bench
+
+
+def _result(node_type: str, rows: int, ms: float) -> dict:
+    plan = {"Node Type": node_type, "Relation Name": "dim_time", "Actual Rows": rows}
+    return {"Plan": plan, "Planning Time": 0.0, "Execution Time": ms}
+
+
+def _bench(monkeypatch, results: list[dict]) -> dict:
+    runs = iter(results)
+    monkeypatch.setattr(bench, "explain", lambda conn, query: next(runs))
+    return bench.bench_query(None, "SELECT 1", runs=len(results) - 1)
+
+
+def test_unstable_plan_records_every_shape(monkeypatch):
+    stats = _bench(
+        monkeypatch,
+        [_result("Seq Scan", 5, 1.0), _result("Index Scan", 5, 1.0), _result("Seq Scan", 5, 1.0), _result("Seq Scan", 7, 1.0)],
+    )
+    assert not stats["plan_stable"]
+    assert stats["plan"] == "Seq Scan dim_time"
+    assert stats["plans"] == ["Index Scan dim_time", "Seq Scan dim_time"]
+    assert stats["rows"] == 5
+    assert bench.compare({"queries": {"aq1": stats}}, None, 0.2, 5.0) == ["aq1: plan unstable across runs (2 shapes)"]
+
+
+def test_compare_with_previous_run(monkeypatch):
+    before = _bench(monkeypatch, [_result("Seq Scan", 5, 10.0)] * 3)
+    assert before["plan_stable"]
+    previous = {"queries": {"aq1": before}}
+    assert bench.compare(previous, previous, 0.2, 5.0) == []
+
+    changed = _bench(monkeypatch, [_result("Index Scan", 5, 30.0)] * 3)
+    assert bench.compare({"queries": {"aq1": changed}}, previous, 0.2, 5.0) == [
+        "aq1: plan changed",
+        "aq1: p50 10.0 -> 30.0 ms",
+    ]
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from dashboard.engine.bitmap import ARRAY_LIMIT, Bitmap
+
+
+def _bitmaps(rng, n):
+    # Sparse, dense and mixed sets, spanning several 65536-value containers.
+    sizes = [0, 1, 10, ARRAY_LIMIT, ARRAY_LIMIT + 1, 30_000]
+    for _ in range(n):
+        size = sizes[rng.integers(len(sizes))]
+        values = rng.integers(0, 200_000, size=size)
+        yield set(values.tolist()), Bitmap.from_values(values)
+
+
+def test_operations_match_python_sets():
+    rng = np.random.default_rng(0)
+    pairs = list(_bitmaps(rng, 12))
+    for a_set, a in pairs:
+        assert a.to_array().tolist() == sorted(a_set)
+        assert len(a) == len(a_set)
+        for b_set, b in pairs:
+            assert (a & b).to_array().tolist() == sorted(a_set & b_set)
+            assert (a | b).to_array().tolist() == sorted(a_set | b_set)
+            assert (a - b).to_array().tolist() == sorted(a_set - b_set)
+            assert (a ^ b).to_array().tolist() == sorted(a_set ^ b_set)
+
+
+def test_containers_switch_between_array_and_bitset():
+    dense = Bitmap.from_values(np.arange(ARRAY_LIMIT + 1))
+    assert dense.containers[0].dtype == np.uint64
+    # Removing values brings the container back under the limit, as an array.
+    sparse = dense - Bitmap.from_values([0, 1])
+    assert sparse.containers[0].dtype == np.uint16
+    assert len(sparse) == ARRAY_LIMIT - 1
+
+
+def test_empty_and_membership():
+    empty = Bitmap()
+    assert len(empty) == 0 and empty.to_array().size == 0
+    assert len(empty | empty) == 0 and len(Bitmap.range(5) - Bitmap.range(5)) == 0
+    bitmap = Bitmap.from_values([3, 70_000, 1 << 31])
+    assert 70_000 in bitmap and (1 << 31) in bitmap and 4 not in bitmap and 7 not in empty
+    assert bitmap == Bitmap.from_values([1 << 31, 3, 70_000, 3])
+
+
+def test_rejects_out_of_range_values():
+    with pytest.raises(ValueError):
+        Bitmap.from_values([-1])
+    with pytest.raises(ValueError):
+        Bitmap.from_values([1 << 32])
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import os
+
+import pytest
+
+from dashboard import cache
+
+
+@pytest.fixture
+def reads(tmp_path, monkeypatch):
+    """Files actually hashed by ``file_digest``, with the cache kept in ``tmp_path``."""
+    monkeypatch.setattr(cache, "CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(cache, "CACHE_ENABLED", True)
+    seen = []
+    digest = cache.file_digest
+
+    def file_digest(path):
+        seen.append(path)
+        return digest(path)
+
+    monkeypatch.setattr(cache, "file_digest", file_digest)
+    return seen
+
+
+def test_tracked_digest_reads_a_file_once(tmp_path, reads):
+    path = tmp_path / "fact.csv"
+    path.write_text("a,b\n1,2\n")
+    first = cache.tracked_digest(path)
+    assert cache.tracked_digest(path) == first
+    assert reads == [path]
+
+    path.write_text("a,b\n1,3\n")
+    os.utime(path, ns=(1, 1))
+    assert cache.tracked_digest(path) != first
+    assert reads == [path, path]
+
+
+def test_data_version(tmp_path, reads):
+    paths = [tmp_path / "a.csv", tmp_path / "b.csv"]
+    for path in paths:
+        path.write_text(path.name)
+    version = cache.data_version("star", paths)
+    assert len(version) == 16
+    assert cache.data_version("star", paths) == version
+    assert cache.data_version("csv", paths) != version
+    assert cache.data_version("star", paths[::-1]) != version
+    assert len(reads) == 2
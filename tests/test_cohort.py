@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dashboard.engine import query
+from dashboard.engine.cohort import MEASURES, CohortActivity
+
+
+def _events(star) -> pd.DataFrame:
+    users = star.dims["dim_user"]
+    df = pd.DataFrame(
+        {
+            "user": star.fact["user_key"],
+            "day": star.column("dim_time", "calendar_date"),
+            "activation": star.fact["activation_event_flag"] != 0,
+        }
+    )
+    df["signup"] = users["signup_date"].reindex(df["user"]).to_numpy()
+    df["offset"] = (df["day"] - df["signup"]).dt.days
+    return df[df["offset"] >= 0]
+
+
+def test_active_matrix_matches_distinct_user_weeks(star):
+    frame = CohortActivity(star).matrix("month", "week", 12, "active", complete=False)
+    events = _events(star)
+    events = events[events["offset"] < 12 * 7]
+    expected = (
+        events.assign(cohort=events["signup"].dt.to_period("M").dt.start_time, period=events["offset"] // 7)
+        .groupby(["cohort", "period"])["user"]
+        .nunique()
+    )
+    got = frame.set_index(["cohort", "period"])["users"]
+    assert got[got > 0].sort_index().to_dict() == expected.to_dict()
+
+
+def test_cohort_users_count_every_signup(star):
+    frame = CohortActivity(star).matrix("quarter", "week", 4, "active", complete=False)
+    per_cohort = frame.drop_duplicates("cohort")["cohort_users"]
+    assert per_cohort.sum() == star.dims["dim_user"]["signup_date"].notna().sum()
+
+
+def test_reached_and_activated_are_cumulative(star):
+    activity = CohortActivity(star)
+    for measure in ("reached", "activated"):
+        matrix = activity.matrix("month", "day", 7, measure, complete=False).pivot(
+            index="cohort", columns="period", values="users"
+        )
+        assert (np.diff(matrix.to_numpy(), axis=1) >= 0).all()
+
+
+def test_unknown_measure(star):
+    with pytest.raises(ValueError):
+        CohortActivity(star).matrix(measure="churned")
+
+
+@pytest.mark.parametrize("measure", MEASURES)
+def test_empty_star(empty_star, measure):
+    activity = CohortActivity(empty_star)
+    assert activity.matrix(measure=measure).empty
+    assert query.kaq3(activity).empty
+    assert query.retention(activity).empty
+
+
+def test_users_without_activations(star):
+    activated = star.fact["user_key"][star.fact["activation_event_flag"] != 0]
+    never = np.setdiff1d(star.dims["dim_user"].index.to_numpy(), activated)
+    activity = CohortActivity(star.restrict(never))
+    assert len(activity.activations) == 0
+    kaq3 = query.kaq3(activity)
+    assert len(kaq3) and (kaq3["activated_users"] == 0).all() and (kaq3["activation_rate"] == 0).all()
+    assert activity.matrix(measure="activated", complete=False)["users"].eq(0).all()
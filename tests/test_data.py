@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from dashboard import data
+
+
+@pytest.fixture
+def registry():
+    data.clear()
+    yield data
+    data.clear()
+
+
+def test_slow_build_does_not_block_other_datasets(registry, monkeypatch):
+    started, release = threading.Event(), threading.Event()
+    builds = []
+
+    def slow():
+        builds.append("slow")
+        started.set()
+        assert release.wait(10)
+        return object()
+
+    monkeypatch.setitem(registry._BUILDERS, "slow", slow)
+    monkeypatch.setitem(registry._BUILDERS, "fast", lambda: "fast")
+    registry.install("built", "built")
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry.get("slow"))) for _ in range(2)]
+    threads[0].start()
+    assert started.wait(10)
+    threads[1].start()
+
+    # Both served while "slow" is still building.
+    assert registry.get("built") == "built"
+    assert registry.get("fast") == "fast"
+
+    release.set()
+    for thread in threads:
+        thread.join(10)
+    assert builds == ["slow"]
+    assert len(results) == 2 and results[0] is results[1] is registry.get("slow")
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import os
+import time
+
+import pandas as pd
+
+from dashboard.figure_cache import FigureCache, clamp_range, make_key, normalize_choice
+
+
+def test_memory_layer_is_lru_bounded():
+    cache = FigureCache(maxsize=2)
+    for key in "abc":
+        cache.set(key, {"key": key})
+    assert cache.get("a") is None
+    assert cache.get("c") == {"key": "c"}
+    assert cache.stats() == {"hits": 1, "disk_hits": 0, "misses": 1, "size": 2}
+
+
+def test_expired_memory_entries_are_misses():
+    cache = FigureCache(ttl=0.0)
+    cache.set("a", {"key": "a"})
+    time.sleep(0.01)
+    assert cache.get("a") is None
+
+
+def test_disk_layer_is_shared_per_data_version(tmp_path):
+    writer, reader = FigureCache(directory=tmp_path), FigureCache(directory=tmp_path)
+    writer.set("k", ({"data": []}, {"data": []}), "v1")
+    assert reader.get("k", "v1") == ({"data": []}, {"data": []})
+    assert reader.stats()["disk_hits"] == 1
+    assert FigureCache(directory=tmp_path).get("k", "v2") is None
+
+
+def test_prune_drops_old_versions_and_expired_entries(tmp_path):
+    cache = FigureCache(ttl=60, directory=tmp_path)
+    cache.set("old", {"data": []}, "v1")
+    cache.set("stale", {"data": []}, "v2")
+    stale = next(tmp_path.glob("*.stale.json"))
+    os.utime(stale, (time.time() - 120, time.time() - 120))
+    cache.set("fresh", {"data": []}, "v2")
+    assert sorted(path.name.split(".")[1] for path in tmp_path.glob("*.json")) == ["fresh"]
+
+
+def test_prune_bounds_the_directory(tmp_path):
+    cache = FigureCache(maxsize=1, directory=tmp_path)
+    for i in range(9):
+        cache.set(f"k{i}", {"data": []}, "v")
+        path = next(tmp_path.glob(f"*.k{i}.json"))
+        os.utime(path, (time.time() - 9 + i, time.time() - 9 + i))
+    assert len(list(tmp_path.glob("*.json"))) == 4
+
+
+def test_make_key_depends_on_every_part():
+    assert make_key("kaq1", "v1", ("dau",)) == make_key("kaq1", "v1", ("dau",))
+    assert make_key("kaq1", "v1", ("dau",)) != make_key("kaq1", "v2", ("dau",))
+    assert make_key("kaq1", "v1").startswith("kaq1-")
+
+
+def test_normalize_choice_folds_everything_into_nothing():
+    assert normalize_choice(["b", "a", "b"], ["a", "b", "c"]) == ("a", "b")
+    assert normalize_choice(["c", "b", "a"], ["a", "b", "c"]) == ()
+    assert normalize_choice(None, ["a"]) == ()
+
+
+def test_clamp_range_clamps_open_sides():
+    lo, hi = pd.Timestamp("2024-01-01"), pd.Timestamp("2025-12-01")
+    assert clamp_range(None, None, lo, hi) == (lo.isoformat(), hi.isoformat())
+    assert clamp_range("2023-01-01", "2024-06-01", lo, hi) == (lo.isoformat(), "2024-06-01T00:00:00")
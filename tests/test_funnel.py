@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dashboard.engine.funnel import SIGNUP, FunnelEvents
+from dashboard.engine.star import StarSchema
+
+
+@pytest.fixture(scope="module")
+def events(star) -> FunnelEvents:
+    return FunnelEvents(star)
+
+
+def _timelines(star) -> dict[int, list[tuple[int, str]]]:
+    """Every user's (day, step name) rows in time order, signup first on ties."""
+    users = star.dims["dim_user"]
+    rows = pd.DataFrame(
+        {
+            "user": users.index.get_indexer(star.fact["user_key"]),
+            "seconds": star.column("dim_session", "session_start_time").astype("datetime64[s]").astype(np.int64),
+            "kind": 1,
+            "step": star.column("dim_event", "event_type"),
+        }
+    )
+    signup = users["signup_date"].dropna()
+    signups = pd.DataFrame(
+        {
+            "user": users.index.get_indexer(signup.index),
+            "seconds": signup.to_numpy("datetime64[s]").astype(np.int64),
+            "kind": 0,
+            "step": SIGNUP,
+        }
+    )
+    rows = pd.concat([rows, signups], ignore_index=True).sort_values(["user", "seconds", "kind"], kind="stable")
+    timelines: dict[int, list[tuple[int, str]]] = {}
+    for user, seconds, step in zip(rows["user"], rows["seconds"], rows["step"]):
+        timelines.setdefault(user, []).append((seconds // 86400, step))
+    return timelines
+
+
+def _reference(star, steps: list[str], window_days: int) -> list[int]:
+    reached = [0] * len(steps)
+    for timeline in _timelines(star).values():
+        pos, start = -1, None
+        for i, step in enumerate(steps):
+            pos = next(
+                (
+                    j
+                    for j in range(pos + 1, len(timeline))
+                    if timeline[j][1] == step and (start is None or timeline[j][0] - start < window_days)
+                ),
+                None,
+            )
+            if pos is None:
+                break
+            start = timeline[pos][0] if start is None else start
+            reached[i] += 1
+    return reached
+
+
+@pytest.mark.parametrize(
+    "steps, window_days",
+    [
+        ([SIGNUP, "create", "share"], 7),
+        (["view", "edit", "share", "comment"], 3),
+        (["create", "create"], 14),
+    ],
+)
+def test_conversion_matches_per_user_scan(star, events, steps, window_days):
+    frame = events.conversion(steps, window_days)
+    assert frame["users"].tolist() == _reference(star, steps, window_days)
+    assert frame["conversion_rate"].iloc[0] == 1.0
+    assert frame["step_rate"].iloc[1:].tolist() == pytest.approx(
+        (frame["users"].iloc[1:].to_numpy() / frame["users"].iloc[:-1].to_numpy()).tolist()
+    )
+
+
+@pytest.mark.parametrize("by", ["subscription_tier", "platform", "signup_month"])
+def test_breakdowns_partition_the_funnel(events, by):
+    steps = [SIGNUP, "create", "share"]
+    overall = events.conversion(steps)
+    frame = events.conversion(steps, by=by)
+    per_step = frame.groupby("step")["users"].sum()
+    if by == "subscription_tier":
+        assert per_step.tolist() == overall["users"].tolist()
+    else:
+        assert (per_step.to_numpy() <= overall["users"].to_numpy()).all()
+    assert (frame.loc[frame["step"] == 0, "users"] > 0).all()
+
+
+def test_unknown_step_and_breakdown(events):
+    with pytest.raises(KeyError, match="unknown funnel step"):
+        events.conversion([SIGNUP, "teleport"])
+    with pytest.raises(KeyError, match="unknown funnel breakdown"):
+        events.conversion([SIGNUP, "create"], by="region")
+
+
+def test_empty_star(empty_star):
+    events = FunnelEvents(empty_star)
+    frame = events.conversion([SIGNUP, "create"])
+    assert frame["users"].tolist() == [0, 0]
+    assert frame["conversion_rate"].isna().all()
+    assert events.conversion([SIGNUP, "create"], by="platform").empty
+
+
+def test_users_without_rows_of_the_funnel(star):
+    users = star.dims["dim_user"].iloc[:3].copy()
+    users["signup_date"] = pd.NaT
+    no_facts = StarSchema({col: values[:0] for col, values in star.fact.items()}, {**star.dims, "dim_user": users})
+    events = FunnelEvents(no_facts)
+    for by in (None, "platform", "subscription_tier", "signup_month"):
+        assert events.conversion(["create", "share"], by=by)["users"].sum() == 0
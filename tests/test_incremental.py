@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from datetime import date
+
+import pytest
+
+pytest.importorskip("psycopg")
+
+from warehouse.db import SCRIPTS_DIR, read_query
+from warehouse.incremental import (
+    ACTIVATION_WINDOW_DAYS,
+    INCREMENTAL_DIR,
+    RESULT_NAMES,
+    Partition,
+    _window,
+    date_to_key,
+    key_to_date,
+)
+
+
+@pytest.mark.parametrize("day", [date(2024, 1, 1), date(2024, 2, 29), date(2025, 12, 31)])
+def test_time_keys_round_trip(day):
+    assert key_to_date(date_to_key(day)) == day
+
+
+def test_window_widens_the_time_key_range_by_the_window():
+    window = _window(date(2024, 1, 1), date(2024, 2, 1), ACTIVATION_WINDOW_DAYS)
+    assert (window["key_from"], window["key_to"]) == (20231225, 20240208)
+    assert (window["window_from"], window["window_to"], window["days"]) == (date(2024, 1, 1), date(2024, 2, 1), 7)
+
+
+def test_partition_summary_name_and_fingerprint():
+    part = Partition("fact_p_202401", 20240101, 20240201, relfilenode=42, max_usage_id=None, n_changed=0)
+    assert part.summary_name == "summary_p_202401"
+    assert part.fingerprint() == (42, None, 0)
+    assert part.fingerprint() != Partition("fact_p_202401", 20240101, 20240201, 42, 7, 0).fingerprint()
+
+
+@pytest.mark.parametrize("name", RESULT_NAMES)
+def test_every_result_has_an_incremental_script(name):
+    assert (SCRIPTS_DIR / f"{name}.sql").exists()
+    query = read_query(INCREMENTAL_DIR / f"{name}.sql")
+    statement = [line for line in query.splitlines() if line.strip() and not line.lstrip().startswith("--")]
+    assert statement[0].upper().startswith(("SELECT", "WITH"))
+    assert not query.rstrip().endswith(";")
+    assert "search_path" not in query.lower()
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from datetime import date
+
+import pytest
+
+pytest.importorskip("psycopg")
+
+from warehouse.db import fact_partitions, partition_bounds
+from warehouse.partitions import Month, manage
+
+
+class _Catalog:
+    """Stands in for a connection: answers the catalog query with fixed (relname, bound) rows."""
+
+    def __init__(self, rows: list[tuple[str, str | None]]):
+        self.rows = rows
+
+    def execute(self, query, params=None):
+        return self
+
+    def fetchall(self):
+        return self.rows
+
+
+def _bound(lo: int, hi: int) -> str:
+    return f"FOR VALUES FROM ({lo}) TO ({hi})"
+
+
+@pytest.mark.parametrize(
+    "bound, expected",
+    [
+        (_bound(20240101, 20240201), (20240101, 20240201)),
+        ("FOR VALUES FROM (MINVALUE) TO (20240101)", None),
+        ("DEFAULT", None),
+        (None, None),
+    ],
+)
+def test_partition_bounds(bound, expected):
+    assert partition_bounds(bound) == expected
+
+
+def test_fact_partitions_are_sorted_by_range_and_skip_other_bounds():
+    conn = _Catalog(
+        [
+            ("fact_p_202403", _bound(20240301, 20240401)),
+            ("fact_p_default", "DEFAULT"),
+            ("fact_p_202401", _bound(20240101, 20240201)),
+        ]
+    )
+    assert fact_partitions(conn) == [
+        ("fact_p_202401", 20240101, 20240201),
+        ("fact_p_202403", 20240301, 20240401),
+    ]
+
+
+def test_month_arithmetic():
+    month = Month.of(date(2024, 11, 17))
+    assert month + 2 == Month(2025, 1)
+    assert month + (-11) == Month(2023, 12)
+    assert Month.from_key(20250301) == Month(2025, 3)
+    assert (month.key, month.start, month.partition) == (20241101, date(2024, 11, 1), "fact_p_202411")
+    assert Month(2024, 12) < Month(2025, 1)
+
+
+def test_manage_dry_run_plans_missing_and_retired_months():
+    conn = _Catalog(
+        [(Month(2024, m).partition, _bound(Month(2024, m).key, (Month(2024, m) + 1).key)) for m in (1, 2, 4)]
+    )
+    log = []
+    manage(conn, ahead=1, retain_months=3, today=date(2024, 5, 10), dry_run=True, log=log.append)
+    assert log == [
+        "would create fact_p_202403",
+        "would create fact_p_202405",
+        "would create fact_p_202406",
+        "would retire fact_p_202401",
+        "would retire fact_p_202402",
+    ]
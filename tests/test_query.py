@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dashboard.engine import query
+from dashboard.engine.star import StarSchema, read_table
+
+
+def _rows(star) -> pd.DataFrame:
+    """The fact table joined to the grouped attributes, as SQL would see it."""
+    dates = pd.DatetimeIndex(star.column("dim_time", "calendar_date"))
+    return pd.DataFrame(
+        {
+            "year": dates.year,
+            "month": dates.month,
+            "calendar_date": dates,
+            "subscription_tier": star.column("dim_user", "subscription_tier"),
+            "content_type": star.column("dim_content", "content_type"),
+            "platform": star.column("dim_device", "platform"),
+            "user_key": star.fact["user_key"],
+            "active_user_flag": star.fact["active_user_flag"].astype(np.int64),
+            "event_count": star.fact["event_count"].astype(np.int64),
+            "session_duration_sec": star.fact["session_duration_sec"].astype(np.int64),
+        }
+    )
+
+
+def _sorted(df: pd.DataFrame, by: list[str]) -> pd.DataFrame:
+    return df.sort_values(by, na_position="last", kind="stable").reset_index(drop=True)
+
+
+def test_grouping_set_helpers():
+    assert query.rollup("a", "b") == [("a", "b"), ("a",), ()]
+    assert query.cube("a", "b") == [("a", "b"), ("a",), ("b",), ()]
+
+
+@pytest.mark.parametrize("dense_limit", [query.DENSE_LIMIT, 0])
+def test_aggregate_matches_groupby_for_every_grouping_set(star, monkeypatch, dense_limit):
+    monkeypatch.setattr(query, "DENSE_LIMIT", dense_limit)
+    by = ["year", "month", "content_type"]
+    measures = {
+        "events": ("sum", "event_count"),
+        "rows": ("count", None),
+        "durations": ("count_nonzero", "session_duration_sec"),
+    }
+    result = query.aggregate(star, by, measures, sets=query.cube(*by))
+    rows = _rows(star).assign(rows=1, durations=lambda df: (df["session_duration_sec"] != 0).astype(np.int64))
+    for grouping in query.cube(*by):
+        keys = list(grouping)
+        part = result[result[[col for col in by if col not in keys]].isna().all(axis=1)]
+        part = part[part[keys].notna().all(axis=1)] if keys else part
+        if keys:
+            expected = rows.groupby(keys, as_index=False)[["event_count", "rows", "durations"]].sum()
+        else:
+            expected = rows[["event_count", "rows", "durations"]].sum().to_frame().T
+        expected = expected.rename(columns={"event_count": "events"})
+        got = part[[*keys, "events", "rows", "durations"]]
+        if keys:
+            got, expected = _sorted(got, keys), _sorted(expected, keys)
+        pd.testing.assert_frame_equal(got.reset_index(drop=True), expected, check_dtype=False)
+
+
+def test_where_filters_rows(star):
+    where = {
+        "platform": ["mobile", "web"],
+        "calendar_date": slice(pd.Timestamp("2024-03-01"), pd.Timestamp("2024-06-01")),
+    }
+    result = query.aggregate(star, ["platform"], {"events": ("sum", "event_count")}, where=where)
+    rows = _rows(star)
+    rows = rows[rows["platform"].isin(["mobile", "web"])]
+    rows = rows[(rows["calendar_date"] >= "2024-03-01") & (rows["calendar_date"] < "2024-06-01")]
+    expected = rows.groupby("platform")["event_count"].sum()
+    assert dict(zip(result["platform"], result["events"])) == expected.to_dict()
+
+
+def test_distinct_users_matches_nunique(star):
+    by = ["year", "subscription_tier"]
+    result = query.distinct_users(star, by, sets=query.rollup(*by))
+    active = _rows(star).query("active_user_flag != 0")
+    full = result.dropna(subset=by)
+    expected = active.groupby(by)["user_key"].nunique()
+    assert dict(zip(zip(full["year"], full["subscription_tier"]), full["active_users"])) == expected.to_dict()
+    total = result[result[by].isna().all(axis=1)]["active_users"]
+    assert total.tolist() == [active["user_key"].nunique()]
+
+
+def test_round_ratio_rounds_half_away_from_zero():
+    result = query.round_ratio([1, 5, 2, 0, 7], [8, 2000, 3, 0, 0], 2)
+    assert result[:3].tolist() == [0.13, 0.0, 0.67]
+    assert np.isnan(result[3:]).all()
+    assert query.round_ratio([25], [1000], 2).tolist() == [0.03]
+
+
+def test_kaq1_matches_groupby(star):
+    result = query.kaq1(star)
+    rows = _rows(star)
+    monthly = result.dropna(subset=["year", "month", "subscription_tier"])
+    expected = rows.groupby(["year", "month", "subscription_tier"])[["active_user_flag", "event_count"]].sum()
+    assert len(monthly) == len(expected)
+    got = monthly.set_index(["year", "month", "subscription_tier"])
+    assert (got["dau"].to_numpy() == expected.loc[got.index, "active_user_flag"].to_numpy()).all()
+    assert (got["events"].to_numpy() == expected.loc[got.index, "event_count"].to_numpy()).all()
+    total = result[result[["year", "month", "subscription_tier"]].isna().all(axis=1)]
+    assert total[["dau", "events"]].values.tolist() == [[rows["active_user_flag"].sum(), rows["event_count"].sum()]]
+
+
+@pytest.mark.parametrize("name", sorted(query.RESULT_QUERIES))
+def test_result_queries_on_an_empty_star(empty_star, name):
+    assert query.RESULT_QUERIES[name](empty_star).empty
+
+
+def test_attribute_codes_and_missing_labels():
+    users = pd.DataFrame({"subscription_tier": ["Pro", None, "Free"]}, index=pd.Index([3, 5, 9], name="user_key"))
+    dims = {"dim_user": users}
+    fact = {"time_key": np.zeros(4, dtype=np.int32), "user_key": np.array([9, 5, 3, 9], dtype=np.int32)}
+    star = StarSchema(fact, dims)
+    attr = star.attribute("subscription_tier")
+    assert attr.labels.tolist() == ["Free", "Pro", None]
+    assert attr.labels[attr.codes].tolist() == ["Free", None, "Pro", "Free"]
+    assert star.mask({"subscription_tier": ["Pro"]}).tolist() == [False, False, True, False]
+    assert star.restrict(np.array([9])).n_rows == 2
+    with pytest.raises(KeyError, match="unknown or ambiguous attribute"):
+        star.attribute("region")
+
+
+@pytest.mark.parametrize("user_keys", [[9, 4, 3], [9, 12, 3], [1, 3, 9]])
+def test_fact_keys_without_a_dimension_row(user_keys):
+    users = pd.DataFrame({"subscription_tier": ["Pro", None, "Free"]}, index=pd.Index([3, 5, 9], name="user_key"))
+    fact = {"time_key": np.zeros(3, dtype=np.int32), "user_key": np.array(user_keys, dtype=np.int32)}
+    star = StarSchema(fact, {"dim_user": users})
+    orphan = next(key for key in user_keys if key not in (3, 5, 9))
+    with pytest.raises(ValueError, match=f"user_key {orphan} has no row in dim_user"):
+        star.positions("dim_user")
+
+
+def test_read_table_parses_dates_and_mixed_timestamps(tmp_path):
+    pd.DataFrame(
+        {"session_key": [1, 2], "session_start_time": ["2024-01-01 10:00:00", "2024-01-01 10:00:00.25"]}
+    ).to_csv(tmp_path / "dim_session.csv", index=False)
+    df = read_table(tmp_path, "dim_session")
+    assert df["session_start_time"].tolist() == [
+        pd.Timestamp("2024-01-01 10:00:00"),
+        pd.Timestamp("2024-01-01 10:00:00.25"),
+    ]
+
+
+def test_read_table_concatenates_partition_files(tmp_path):
+    parts = tmp_path / "dim_time"
+    parts.mkdir()
+    pd.DataFrame({"time_key": [20240101], "calendar_date": ["2024-01-01"]}).to_csv(parts / "p1.csv", index=False)
+    pd.DataFrame({"time_key": [20240201], "calendar_date": ["2024-02-01"]}).to_csv(parts / "p2.csv", index=False)
+    df = read_table(tmp_path, "dim_time")
+    assert df["time_key"].tolist() == [20240101, 20240201]
+    assert str(df["calendar_date"].dtype) == "datetime64[ns]"
+    with pytest.raises(FileNotFoundError):
+        read_table(tmp_path, "dim_user")
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import inspect
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dashboard.engine.query import RESULT_QUERIES
+from dashboard.engine.segment import Op, SegmentError, SegmentIndex, Term, canonical, parse
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("tier=a", Term("tier", ("a",))),
+        ("tier=a,b", Term("tier", ("a", "b"))),
+        ("tier!=a", Op("not", (Term("tier", ("a",)),))),
+        ('bucket="2--10"', Term("bucket", ("2--10",))),
+        ("x=1@2025-03", Term("x", ("1",), ("2025-03", "2025-03"))),
+        ("x=1@2025-1..2025-06", Term("x", ("1",), ("2025-01", "2025-06"))),
+        ("a=1 | b=2 & c=3", Op("or", (Term("a", ("1",)), Op("and", (Term("b", ("2",)), Term("c", ("3",))))))),
+        ("!(a=1 | b=2)", Op("not", (Op("or", (Term("a", ("1",)), Term("b", ("2",)))),))),
+    ],
+)
+def test_parse(text, expected):
+    assert parse(text) == expected
+    # The canonical text parses back to the same expression.
+    assert parse(canonical(text)) == expected
+
+
+@pytest.mark.parametrize("text", ["", "   ", "a", "a=", "=a", "a=b c", "(a=b", "a=b)", "a=b &", "& a=b", "a=b@2025-13", "a=b@"])
+def test_parse_errors(text):
+    if not text.strip():
+        assert canonical(text) is None
+        return
+    with pytest.raises(SegmentError):
+        parse(text)
+
+
+@pytest.fixture(scope="module")
+def index(star):
+    return SegmentIndex.build(star)
+
+
+def _events(star) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "user": star.fact["user_key"],
+            "event_type": star.column("dim_event", "event_type"),
+            "platform": star.column("dim_device", "platform"),
+            "month": pd.DatetimeIndex(star.column("dim_time", "calendar_date")).strftime("%Y-%m"),
+        }
+    )
+
+
+def test_index_matches_pandas(star, index):
+    users = star.dims["dim_user"]
+    events = _events(star)
+    everyone = set(users.index)
+    tier = set(users.index[users["subscription_tier"].isin(["Business", "Enterprise"])])
+    share = set(events.loc[events["event_type"] == "share", "user"])
+    web = set(events.loc[events["platform"] == "web", "user"])
+    march = set(events.loc[(events["event_type"] == "create") & (events["month"] == "2025-03"), "user"])
+    spring = set(events.loc[(events["event_type"] == "create") & events["month"].between("2025-03", "2025-05"), "user"])
+    cases = {
+        "subscription_tier=Business,Enterprise & event_type=share": tier & share,
+        "subscription_tier!=Business,Enterprise | !platform=web": (everyone - tier) | (everyone - web),
+        "event_type=create@2025-03": march,
+        "event_type=create@2025-03..2025-05 & !(event_type=share)": spring - share,
+    }
+    for expression, expected in cases.items():
+        assert set(index.users(expression).tolist()) == expected, expression
+
+
+def test_index_errors(index):
+    with pytest.raises(SegmentError, match="unknown attribute"):
+        index.users("tier=Free")
+    with pytest.raises(SegmentError, match="unknown subscription_tier"):
+        index.users("subscription_tier=Gold")
+    with pytest.raises(SegmentError, match="no months"):
+        index.users("subscription_tier=Free@2025-01")
+
+
+def test_empty_segments(star, empty_star, index):
+    assert len(index.users("subscription_tier=Free & subscription_tier=Plus")) == 0
+    assert len(index.users("event_type=create@1999-01")) == 0
+    empty = SegmentIndex.build(empty_star)
+    assert len(empty.universe) == 0 and empty.attributes()["subscription_tier"] == []
+
+
+def test_restrict_keeps_only_the_users_rows(star):
+    keys = star.dims["dim_user"].index.to_numpy()[::3]
+    restricted = star.restrict(keys)
+    assert set(restricted.fact["user_key"].tolist()) <= set(keys.tolist())
+    assert restricted.n_rows == np.isin(star.fact["user_key"], keys).sum()
+    assert restricted.dims["dim_user"].index.tolist() == sorted(keys.tolist())
+
+
+def test_scoped_datasets(star_data, star, index):
+    expression = "subscription_tier=Business & event_type=share"
+    full = star_data.kaq1
+    with star_data.segment(expression) as scope:
+        assert scope == canonical(expression)
+        scoped = star_data.kaq1
+    expected = RESULT_QUERIES["kaq1"](star.restrict(index.users(expression)))
+    assert scoped["events"].sum() == expected["events"].sum() < full["events"].sum()
+    # Outside the block the full data is back, and unscoped datasets are shared.
+    assert star_data.kaq1 is full
+    with star_data.segment(expression):
+        assert star_data.segments is star_data.get("segments")
+        assert star_data.kaq1 is scoped
+
+
+def test_segments_need_the_star_engine(star_data, monkeypatch):
+    monkeypatch.setattr(star_data, "RESULT_SOURCE", "csv")
+    with pytest.raises(RuntimeError):
+        with star_data.segment("subscription_tier=Free"):
+            pass
+    with star_data.segment(" "):
+        pass
+
+
+FIGURE_ARGS = {
+    "update_kaq1": ("dau", [], None, None, ["overall"]),
+    "update_kaq2": ("dau", [], None, None, ["overall"]),
+    "update_kaq3": (None, None),
+    "update_retention": (None, None),
+    "update_kaq4": ([], None, None, ["overall"]),
+    "update_kaq5": (None, None),
+    "update_funnel": (["signup", "create", "share"], 7, "platform"),
+}
+
+
+@pytest.mark.parametrize("expression", ["region=EU & region=APAC", "subscription_tier=Free & event_type=share@2025-06"])
+def test_figure_callbacks_in_small_segments(star_data, expression):
+    from dashboard.app import create_app
+
+    app = create_app(preload=False)
+    called = set()
+    for entry in app.callback_map.values():
+        func = inspect.unwrap(entry["callback"])
+        if func.__name__ in FIGURE_ARGS:
+            figures = star_data.scoped(func)(*FIGURE_ARGS[func.__name__], expression)
+            for figure in figures if isinstance(figures, tuple) else (figures,):
+                assert figure.to_plotly_json()["layout"]
+            called.add(func.__name__)
+    assert called == set(FIGURE_ARGS)
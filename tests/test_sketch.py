@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dashboard.engine import query
+from dashboard.engine.sketch import UserSketches, estimate, registers
+
+# Four standard errors of a 2^12-register sketch.
+TOLERANCE = 4 * 1.04 / np.sqrt(1 << 12)
+
+
+@pytest.fixture(scope="module")
+def sketches(star) -> UserSketches:
+    return UserSketches.build(star, precision=12)
+
+
+def _compare(approx: pd.DataFrame, exact: pd.DataFrame, by: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    if by:
+        approx, exact = (df.sort_values(by, na_position="last", kind="stable") for df in (approx, exact))
+    pd.testing.assert_frame_equal(approx[by].reset_index(drop=True), exact[by].reset_index(drop=True), check_dtype=False)
+    return approx["active_users"].to_numpy(), exact["active_users"].to_numpy()
+
+
+def test_estimate_of_few_keys():
+    index, rank = registers(np.arange(100))
+    dense = np.zeros((1, 1 << 12), dtype=np.uint8)
+    np.maximum.at(dense, (np.zeros(len(index), dtype=np.intp), index), rank)
+    assert abs(estimate(dense)[0] - 100) < 100 * TOLERANCE
+    assert estimate(np.zeros((1, 1 << 12), dtype=np.uint8))[0] == 0
+
+
+@pytest.mark.parametrize(
+    "by, sets",
+    [
+        ([], None),
+        (["year", "month"], None),
+        (["year", "month", "subscription_tier"], query.rollup("year", "month", "subscription_tier")),
+        (["content_type", "platform"], query.cube("content_type", "platform")),
+    ],
+)
+def test_estimates_match_exact_counts(star, sketches, by, sets):
+    approx, exact = _compare(sketches.distinct_users(by, sets), query.distinct_users(star, by, sets), by)
+    large = exact >= 200
+    assert large.any()
+    assert np.all(np.abs(approx[large] / exact[large] - 1) < TOLERANCE)
+    assert np.all(np.abs(approx[~large] - exact[~large]) <= np.maximum(3, exact[~large] * TOLERANCE))
+
+
+def test_where_restricts_cells(star, sketches):
+    where = {"calendar_date": slice(pd.Timestamp("2024-04-01"), pd.Timestamp("2024-07-01")), "platform": ["mobile"]}
+    approx, exact = _compare(
+        sketches.distinct_users(["subscription_tier"], where=where),
+        query.distinct_users(star, ["subscription_tier"], where=where),
+        ["subscription_tier"],
+    )
+    assert np.all(np.abs(approx / exact - 1) < TOLERANCE)
+
+
+def test_unknown_axis(sketches):
+    with pytest.raises(KeyError, match="not a sketch axis"):
+        sketches.distinct_users(["region"])
+
+
+def test_save_and_load_round_trip(sketches, tmp_path):
+    sketches.save(tmp_path, source_version="v1")
+    loaded = UserSketches.load(tmp_path)
+    by = ["year", "content_type"]
+    pd.testing.assert_frame_equal(loaded.distinct_users(by), sketches.distinct_users(by))
+
+
+def test_empty_star(empty_star):
+    sketches = UserSketches.build(empty_star)
+    assert len(sketches.cells) == 0
+    by = ["year", "month"]
+    assert sketches.distinct_users(by).empty
+    assert query.distinct_users(empty_star, by).empty
+    assert sketches.distinct_users([])["active_users"].tolist() == []
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dashboard import data, table_query
+from dashboard.table_query import query_page, records
+
+TABLE = "kaq1-table"
+
+
+@pytest.fixture
+def table(monkeypatch):
+    """A small kaq1-shaped table installed as the ``kaq1`` dataset."""
+    df = pd.DataFrame(
+        {
+            "year_month": pd.to_datetime(["2024-01-01", "2024-02-01", "2024-03-01", "2024-04-01", "2024-05-01"]),
+            "subscription_tier": ["Free", "Pro", "Business", None, "pro"],
+            "dau": [30, 10, 50, 20, 40],
+            "events_per_active_user": np.array([0.7, 1.5, 2.25, np.nan, 1.0], dtype=np.float32),
+        }
+    )
+    monkeypatch.setattr(table_query, "_ORDER_CACHE", type(table_query._ORDER_CACHE)())
+    data.clear()
+    data.install("kaq1", df)
+    data.install("DATA_VERSION", "table-test")
+    yield df
+    data.clear()
+
+
+def _column(filter_query: str = "", sort_by: list[dict] | None = None, col: str = "dau") -> list:
+    rows, _ = query_page(TABLE, 0, 100, sort_by, filter_query)
+    return [row[col] for row in rows]
+
+
+def test_paging_clamps_to_the_last_page(table):
+    rows, page_count = query_page(TABLE, 1, 2, None, None)
+    assert page_count == 3
+    assert [row["dau"] for row in rows] == [50, 20]
+    rows, _ = query_page(TABLE, 7, 2, None, None)
+    assert [row["dau"] for row in rows] == [40]
+
+
+def test_empty_result_has_one_page(table):
+    assert query_page(TABLE, 3, 2, None, "{dau} > 1000") == ([], 1)
+
+
+def test_sort_keeps_missing_values_last(table):
+    sort_by = [{"column_id": "subscription_tier", "direction": "desc"}]
+    tiers = _column(sort_by=sort_by, col="subscription_tier")
+    assert tiers[:4] == ["pro", "Pro", "Free", "Business"] and pd.isna(tiers[4])
+    assert _column(sort_by=[{"column_id": "dau", "direction": "asc"}]) == [10, 20, 30, 40, 50]
+
+
+@pytest.mark.parametrize(
+    "filter_query, expected",
+    [
+        ("{dau} >= 30", [30, 50, 40]),
+        ("{dau} ge 30 && {dau} lt 50", [30, 40]),
+        ("{dau} != 10 and {dau} <= 20", [20]),
+        ("{subscription_tier} = Pro", [10]),
+        ("{subscription_tier} ieq pro", [10, 40]),
+        ("{subscription_tier} contains P", [10]),
+        ("{subscription_tier} icontains R", [30, 10, 40]),
+        ("{subscription_tier} is blank", [20]),
+        ("{year_month} datestartswith 2024-0", [30, 10, 50, 20, 40]),
+        ('{year_month} >= "2024-03-01"', [50, 20, 40]),
+        ("{events_per_active_user} = 0.7", [30]),
+        ("{dau} > abc", []),
+        ("{unknown} = 1", [30, 10, 50, 20, 40]),
+        ("not a filter", [30, 10, 50, 20, 40]),
+    ],
+)
+def test_filters(table, filter_query, expected):
+    assert _column(filter_query) == expected
+
+
+def test_records_show_float32_values_as_written(table):
+    assert records(table.head(1))[0]["events_per_active_user"] == 0.7
@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import subprocess
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import psycopg
+from psycopg import sql
+
+from warehouse import generate, load
+from warehouse.db import BASE_DIR, FACT_TABLE, SCRIPTS_DIR, connect, connection_pool, read_query
+from warehouse.refresh import RESULT_NAMES
+
+HISTORY_PATH = BASE_DIR / "benchmarks" / "history.json"
+DATA_DIR = BASE_DIR / "data" / "bench"
+
+_PARTITION = re.compile(r"_p_\d{6}$")
+
+
+def plan_shape(node: dict) -> str:
+    """Node types and relations of a plan, without costs or row counts.
+
+    Partitions are collapsed (``fact_p_*``) and an Append only records how many
+    children survived pruning, so the shape changes exactly when the plan does.
+    """
+    label = node["Node Type"]
+    if node.get("Relation Name"):
+        label += f" {_PARTITION.sub('_p_*', node['Relation Name'])}"
+    if node.get("Index Name"):
+        label += f" [{_PARTITION.sub('_p_*', node['Index Name'])}]"
+    if node.get("Strategy"):
+        label += f" ({node['Strategy']})"
+    children = node.get("Plans", [])
+    if node["Node Type"] == "Append" and children:
+        shapes = sorted({plan_shape(child) for child in children})
+        return f"{label}[{len(children)}]({', '.join(shapes)})"
+    if not children:
+        return label
+    return f"{label}({', '.join(plan_shape(child) for child in children)})"
+
+
+def explain(conn: psycopg.Connection, query: str) -> dict:
+    statement = sql.SQL("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {}").format(sql.SQL(query))
+    (result,) = conn.execute(statement).fetchone()
+    return result[0] if isinstance(result, list) else json.loads(result)[0]
+
+
+def bench_query(conn: psycopg.Connection, query: str, runs: int, warmup: int = 1) -> dict:
+    """Latency percentiles (planning + execution, ms), buffer and row counts and plan shapes over ``runs``.
+
+    ``plan`` is the shape seen most often and ``plans`` every distinct shape, so
+    a plan that flips between runs is recorded in full.
+    """
+    for _ in range(warmup):
+        explain(conn, query)
+    latencies, hits, reads, rows, shapes = [], [], [], [], Counter()
+    for _ in range(runs):
+        result = explain(conn, query)
+        plan = result["Plan"]
+        latencies.append(result["Planning Time"] + result["Execution Time"])
+        hits.append(plan.get("Shared Hit Blocks", 0))
+        reads.append(plan.get("Shared Read Blocks", 0))
+        rows.append(plan.get("Actual Rows", 0))
+        shapes[plan_shape(plan)] += 1
+    return {
+        "runs": runs,
+        "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+        "p95_ms": round(float(np.percentile(latencies, 95)), 3),
+        "min_ms": round(min(latencies), 3),
+        "max_ms": round(max(latencies), 3),
+        "shared_hit_blocks": int(np.median(hits)),
+        "shared_read_blocks": int(np.median(reads)),
+        "rows": int(np.median(rows)),
+        "plan": shapes.most_common(1)[0][0],
+        "plans": sorted(shapes),
+        "plan_stable": len(shapes) == 1,
+    }
+
+
+def compare(current: dict, previous: dict | None, threshold: float, min_ms: float) -> list[str]:
+    """Regressions of ``current`` against ``previous`` (the last run on the same data).
+
+    A plan that changed between the runs of ``current`` is a regression on its own.
+    """
+    problems = []
+    for name, stats in current["queries"].items():
+        if not stats["plan_stable"]:
+            problems.append(f"{name}: plan unstable across runs ({len(stats['plans'])} shapes)")
+        before = previous["queries"].get(name) if previous is not None else None
+        if before is None:
+            continue
+        if stats["plan_stable"] and stats["plan"] != before["plan"]:
+            problems.append(f"{name}: plan changed")
+        slower = stats["p50_ms"] - before["p50_ms"]
+        if slower > min_ms and stats["p50_ms"] > before["p50_ms"] * (1 + threshold):
+            problems.append(f"{name}: p50 {before['p50_ms']:.1f} -> {stats['p50_ms']:.1f} ms")
+    return problems
+
+
+def read_history(path: Path = HISTORY_PATH) -> list[dict]:
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return []
+
+
+def write_history(history: list[dict], path: Path = HISTORY_PATH) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text(json.dumps(history, indent=2))
+    tmp.replace(path)
+
+
+def git_revision() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def prepare(dsn: str | None, scale: int, workers: int, log=print) -> None:
+    """Generate (once) and bulk load the dataset for ``scale``, replacing the schema."""
+    source = DATA_DIR / f"sf{scale}"
+    if not (source / "dim_time.csv").exists():
+        generate.generate(source, scale=scale, workers=workers, log=lambda *_: None)
+    with connection_pool(dsn, size=workers) as pool:
+        rows = load.bulk_load(pool, source, drop=True, log=lambda *_: None)
+    log(f"SF{scale}: loaded {rows:,} fact rows")
+
+
+def run(
+    dsn: str | None,
+    scale: int | None,
+    runs: int,
+    names: tuple[str, ...] = RESULT_NAMES,
+    scripts_dir: Path = SCRIPTS_DIR,
+    log=print,
+) -> dict:
+    queries = {}
+    with connect(dsn, autocommit=True) as conn:
+        # Exact, unlike pg_class.reltuples, so history entries on the same data always match.
+        (fact_rows,) = conn.execute(sql.SQL("SELECT count(*) FROM {}").format(sql.Identifier(FACT_TABLE))).fetchone()
+        for name in names:
+            queries[name] = stats = bench_query(conn, read_query(scripts_dir / f"{name}.sql"), runs)
+            log(
+                f"  {name:5} p50 {stats['p50_ms']:9.1f} ms  p95 {stats['p95_ms']:9.1f} ms  "
+                f"hit {stats['shared_hit_blocks']:>8}  read {stats['shared_read_blocks']:>8}"
+            )
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "scale": scale,
+        "fact_rows": int(fact_rows or 0),
+        "queries": queries,
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the analytical scripts with EXPLAIN (ANALYZE, BUFFERS).")
+    parser.add_argument("--dsn", default=None, help="libpq connection string (default: $WAREHOUSE_DSN)")
+    parser.add_argument("--scales", default=None, help="comma separated scale factors to generate and load, e.g. 1,10")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=4, help="parallel connections for loading")
+    parser.add_argument("--history", type=Path, default=HISTORY_PATH)
+    parser.add_argument("--threshold", type=float, default=0.2, help="relative p50 slowdown flagged as a regression")
+    parser.add_argument("--min-ms", type=float, default=5.0, help="ignore slowdowns smaller than this")
+    parser.add_argument("--no-save", action="store_true", help="do not append this run to the history")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("names", nargs="*", metavar="NAME", help="scripts to benchmark (default: all)")
+    args = parser.parse_args(argv)
+    names = tuple(args.names) or RESULT_NAMES
+
+    history = read_history(args.history)
+    scales = [int(s) for s in args.scales.split(",")] if args.scales else [None]
+    problems = []
+    for scale in scales:
+        if scale is not None:
+            prepare(args.dsn, scale, args.workers)
+        start = time.perf_counter()
+        entry = run(args.dsn, scale, args.runs, names)
+        label = f"SF{scale}" if scale is not None else "current data"
+        print(f"{label} benchmarked in {time.perf_counter() - start:.1f}s")
+
+        previous = next(
+            (e for e in reversed(history) if (e.get("scale"), e.get("fact_rows")) == (scale, entry["fact_rows"])),
+            None,
+        )
+        for problem in compare(entry, previous, args.threshold, args.min_ms):
+            problems.append(f"{label} {problem}")
+        history.append(entry)
+
+    if not args.no_save:
+        write_history(history, args.history)
+    for problem in problems:
+        print(f"REGRESSION {problem}")
+    if problems and args.fail_on_regression:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
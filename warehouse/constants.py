@@ -0,0 +1,10 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+SCRIPTS_DIR = BASE_DIR / "scripts"
+RESULTS_DIR = BASE_DIR / "results"
+
+SCHEMA = "notion_dw"
+FACT_TABLE = "fact_product_usage_engagement"
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import os
+import re
+from pathlib import Path
+
+import psycopg
+from psycopg import sql
+from psycopg_pool import ConnectionPool
+
+from warehouse.constants import BASE_DIR, FACT_TABLE, RESULTS_DIR, SCHEMA, SCRIPTS_DIR
+
+# Empty means "use the libpq environment" (PGHOST, PGDATABASE, ...).
+DEFAULT_DSN = os.environ.get("WAREHOUSE_DSN", "")
+
+
+def connect(dsn: str | None = None, **kwargs) -> psycopg.Connection:
+    conn = psycopg.connect(DEFAULT_DSN if dsn is None else dsn, **kwargs)
+    _configure(conn)
+    return conn
+
+
+def _configure(conn: psycopg.Connection) -> None:
+    conn.execute(sql.SQL("SET search_path = {}").format(sql.Identifier(SCHEMA)))
+
+
+def connection_pool(dsn: str | None = None, size: int = 4) -> ConnectionPool:
+    """A bounded pool of autocommit connections with the warehouse search path set."""
+    return ConnectionPool(
+        DEFAULT_DSN if dsn is None else dsn,
+        min_size=1,
+        max_size=size,
+        kwargs={"autocommit": True},
+        configure=_configure,
+        open=True,
+    )
+
+
+_BOUND = re.compile(r"FROM \((\d+)\) TO \((\d+)\)")
+
+
+def fact_partitions(conn: psycopg.Connection) -> list[tuple[str, int, int]]:
+    """(name, time_key from, time_key to) of every fact partition, oldest first."""
+    rows = conn.execute(
+        """
+        SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = %s::regclass
+        """,
+        (f"{SCHEMA}.{FACT_TABLE}",),
+    ).fetchall()
+    partitions = []
+    for name, bound in rows:
+        keys = partition_bounds(bound)
+        if keys is not None:
+            partitions.append((name, *keys))
+    return sorted(partitions, key=lambda part: part[1])
+
+
+def partition_bounds(bound: str | None) -> tuple[int, int] | None:
+    """``(from, to)`` of a ``FOR VALUES FROM (a) TO (b)`` range bound, ``None`` for other bounds."""
+    match = _BOUND.search(bound or "")
+    return (int(match[1]), int(match[2])) if match else None
+
+
+def read_query(path: Path) -> str:
+    """A query script without its ``SET search_path`` line and trailing semicolon.
+
+    Connections already set the search path, and ``COPY (query) TO STDOUT`` needs
+    a bare statement.
+    """
+    text = path.read_text()
+    text = re.sub(r"(?im)^\s*SET\s+search_path\s*=.*?;\s*$", "", text)
+    return text.strip().rstrip(";").strip()
+
+
+def copy_query_to_file(conn: psycopg.Connection, query: str, path: Path) -> int:
+    """Stream ``query`` as CSV with a header into ``path``; returns bytes written.
+
+    Data goes to a temporary file next to ``path`` that is renamed into place
+    once complete, so readers never see a partial result.
+    """
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    written = 0
+    try:
+        with conn.cursor() as cur, open(tmp, "wb") as fh:
+            statement = sql.SQL("COPY ({}) TO STDOUT WITH (FORMAT csv, HEADER true)").format(sql.SQL(query))
+            with cur.copy(statement) as copy:
+                for chunk in copy:
+                    fh.write(chunk)
+                    written += len(chunk)
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+    return written
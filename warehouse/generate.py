@@ -0,0 +1,407 @@
+from __future__ import annotations
+
+import argparse
+import hashlib
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from warehouse.constants import BASE_DIR, FACT_TABLE
+
+# Mirrors scripts/populate.sql. At scale factor 1 the generator produces the
+# same dimensions (480 users, 50 workspaces, 5 sessions a day) and the same
+# distributions; every count below is multiplied by the scale factor.
+START = np.datetime64("2024-01-01")
+END = np.datetime64("2025-12-31")
+MONTHS = np.arange(START.astype("datetime64[M]"), END.astype("datetime64[M]") + 1)
+
+USERS_PER_MONTH = 20
+WORKSPACES = 50
+SESSIONS_PER_DAY = 5
+TIERS = np.array(["Free", "Plus", "Business", "Enterprise"], dtype=object)
+MONTHLY_BASE = np.array([6, 10, 22, 26])  # includes the +6 for Business/Enterprise
+ACTIVATION_PROB = np.array([0.25, 0.40, 0.55, 0.70])
+ACTIVATION_EVENTS = 2
+
+DEVICES = [
+    ("dev_web_win", "web", "Windows", "3.08.0", "desktop"),
+    ("dev_web_mac", "web", "macOS", "3.08.1", "desktop"),
+    ("dev_desktop", "desktop", "macOS", "3.09.0", "desktop"),
+    ("dev_ios", "mobile", "iOS", "3.07.9", "phone"),
+    ("dev_android", "mobile", "Android", "3.08.2", "phone"),
+]
+CONTENTS = [
+    ("cnt_page", "page", False, False, "personal"),
+    ("cnt_database", "database", True, True, "workspace"),
+    ("cnt_wiki", "wiki", True, True, "team_space"),
+    ("cnt_taskboard", "task_board", False, True, "workspace"),
+    ("cnt_template", "page", True, False, "personal"),
+]
+EVENTS = [
+    ("view", "Core", "consumption"),
+    ("create", "Core", "creation"),
+    ("edit", "Core", "creation"),
+    ("comment", "Collaboration", "collaboration"),
+    ("share", "Collaboration", "collaboration"),
+    ("db_query", "Databases", "consumption"),
+    ("api_call", "Integrations", "creation"),
+    ("template_use", "Templates", "creation"),
+]
+
+# populate.sql picks content, device and event type with a CASE whose every
+# WHEN draws a fresh random(); these are the resulting (key, threshold) chains.
+CONTENT_CHAIN = [(2, 0.28), (3, 0.52), (4, 0.72), (1, 0.88), (5, 1.0)]
+DEVICE_CHAIN = [(3, 0.35), (1, 0.60), (2, 0.75), (4, 0.88), (5, 1.0)]
+EVENT_CHAIN = [(2, 0.18), (3, 0.36), (4, 0.48), (5, 0.60), (6, 0.72), (8, 0.84), (7, 0.92), (1, 1.0)]
+
+FEATURE_EVENTS = np.array([2, 3, 6, 7, 8])  # create, edit, db_query, api_call, template_use
+COLLABORATION_EVENTS = np.array([4, 5])  # comment, share
+TEAM_CONTENT = np.array([2, 3, 4])  # database, wiki, task_board
+DURATION_BY_DEVICE = {1: (1800, 600), 2: (1800, 600), 3: (2400, 800), 4: (900, 500), 5: (900, 500)}
+
+FACT_COLUMNS = [
+    "usage_id",
+    "time_key",
+    "user_key",
+    "workspace_key",
+    "content_key",
+    "device_key",
+    "event_key",
+    "session_key",
+    "event_count",
+    "active_user_flag",
+    "activation_event_flag",
+    "feature_usage_flag",
+    "collaboration_event_flag",
+    "session_event_count",
+    "session_duration_sec",
+]
+
+DEFAULT_OUT = BASE_DIR / "data" / "star"
+
+
+def chain_probabilities(chain: list[tuple[int, float]]) -> tuple[np.ndarray, np.ndarray]:
+    """Keys and probabilities of a ``CASE WHEN random() < p THEN ...`` chain."""
+    keys, probs, remaining = [], [], 1.0
+    for key, threshold in chain:
+        keys.append(key)
+        probs.append(remaining * threshold)
+        remaining *= 1 - threshold
+    return np.array(keys), np.array(probs) / sum(probs)
+
+
+def sql_round(x: np.ndarray) -> np.ndarray:
+    """``::INT`` rounding (half away from zero)."""
+    return np.floor(x + 0.5).astype(np.int64)
+
+
+def time_key(days: np.ndarray) -> np.ndarray:
+    days = pd.DatetimeIndex(days)
+    return (days.year * 10000 + days.month * 100 + days.day).to_numpy(np.int32)
+
+
+def _md5_activates(user_id_nat: str, prob: float) -> bool:
+    """``(('x' || substr(md5(id), 1, 8))::bit(32)::int % 100) / 100.0 < prob``."""
+    value = int(hashlib.md5(user_id_nat.encode()).hexdigest()[:8], 16)
+    if value >= 1 << 31:
+        value -= 1 << 32
+    remainder = abs(value) % 100 * (1 if value >= 0 else -1)
+    return remainder / 100 < prob
+
+
+def dim_time() -> pd.DataFrame:
+    days = pd.date_range(str(START), str(END), freq="D")
+    return pd.DataFrame(
+        {
+            "time_key": time_key(days),
+            "calendar_date": days.strftime("%Y-%m-%d"),
+            "day_of_week": days.isocalendar().day.to_numpy(np.int16),
+            "is_weekend": days.dayofweek >= 5,
+            "week_of_year": days.isocalendar().week.to_numpy(np.int16),
+            "month": days.month,
+            "quarter": days.quarter,
+            "year": days.year,
+            "day_since_signup_bucket": None,
+        }
+    )
+
+
+def dim_user(scale: int) -> pd.DataFrame:
+    per_month = USERS_PER_MONTH * scale
+    i = np.arange(1, per_month * len(MONTHS) + 1)
+    cohort = MONTHS[(i - 1) // per_month].astype("datetime64[D]")
+    signup = cohort + 4 + (i - 1) % USERS_PER_MONTH
+    width = max(4, len(str(i[-1])))
+    ids = [f"usr_{n:0{width}d}" for n in i]
+    return pd.DataFrame(
+        {
+            "user_key": i,
+            "user_id_nat": ids,
+            "username": [f"user_{n:0{width}d}" for n in i],
+            "signup_date": signup.astype(str),
+            "subscription_tier": TIERS[i % 4],
+            "user_type": np.array(["individual", "member", "guest"], dtype=object)[i % 3],
+            "region": np.array(["EU", "NA", "APAC"], dtype=object)[i % 3],
+            "lifecycle_stage": np.array(["onboarding", "active", "active", "dormant"], dtype=object)[i % 4],
+        }
+    )
+
+
+def _pick(rng: np.random.Generator, values: list[str], n: int) -> np.ndarray:
+    """``(ARRAY[values])[1 + (random() * (len - 1))::INT]`` (the ends are half as likely)."""
+    return np.array(values, dtype=object)[sql_round(rng.random(n) * (len(values) - 1))]
+
+
+def dim_workspace(scale: int, rng: np.random.Generator) -> pd.DataFrame:
+    n = WORKSPACES * scale
+    i = np.arange(1, n + 1)
+    return pd.DataFrame(
+        {
+            "workspace_key": i,
+            "workspace_id_nat": [f"ws_{k:0{max(3, len(str(i[-1])))}d}" for k in i],
+            "workspace_plan": _pick(rng, ["Free", "Plus", "Business", "Enterprise"], n),
+            "workspace_size_bucket": _pick(rng, ["1", "2--10", "11--50", "50+"], n),
+            "industry_segment": _pick(rng, ["Education", "Software", "Finance", "Consulting"], n),
+            "workspace_region": _pick(rng, ["EU", "NA"], n),
+        }
+    )
+
+
+def dim_session(scale: int, rng: np.random.Generator) -> pd.DataFrame:
+    per_day = SESSIONS_PER_DAY * scale
+    n_days = int((END - START).astype(int)) + 1
+    i = np.arange(n_days * per_day)
+    start = (
+        START.astype("datetime64[s]")
+        + (i // per_day) * np.timedelta64(1, "D")
+        + (rng.random(len(i)) * 12 * 3600).astype("timedelta64[s]")
+    )
+    end = np.minimum(
+        start + sql_round(1200 + rng.random(len(i)) * 3000).astype("timedelta64[s]"),
+        np.datetime64("2025-12-31T23:59:59"),
+    )
+    return pd.DataFrame(
+        {
+            "session_key": i + 1,
+            "session_id_nat": [f"sess_{k:0{max(5, len(str(i[-1])))}d}" for k in i],
+            "session_start_time": pd.DatetimeIndex(start).strftime("%Y-%m-%d %H:%M:%S"),
+            "session_end_time": pd.DatetimeIndex(end).strftime("%Y-%m-%d %H:%M:%S"),
+            "session_origin": _pick(rng, ["direct", "link", "notification"], len(i)),
+        }
+    )
+
+
+def small_dimensions() -> dict[str, pd.DataFrame]:
+    return {
+        "dim_device": pd.DataFrame(
+            [(k, *row) for k, row in enumerate(DEVICES, 1)],
+            columns=["device_key", "device_id_nat", "platform", "operating_system", "app_version", "device_form_factor"],
+        ),
+        "dim_content": pd.DataFrame(
+            [(k, *row) for k, row in enumerate(CONTENTS, 1)],
+            columns=["content_key", "content_id_nat", "content_type", "is_template_based", "is_shared", "ownership_type"],
+        ),
+        "dim_event": pd.DataFrame(
+            [(k, *row) for k, row in enumerate(EVENTS, 1)],
+            columns=["event_key", "event_type", "feature_category", "interaction_intent"],
+        ),
+    }
+
+
+class Population:
+    """Per-user attributes the fact generator needs, shared by all month workers."""
+
+    def __init__(self, users: pd.DataFrame, scale: int, seed: int):
+        self.scale = scale
+        self.seed = seed
+        self.signup = users["signup_date"].to_numpy("datetime64[D]")
+        self.tier = (users["user_key"].to_numpy() % 4).astype(np.int8)
+        self.activates = np.array(
+            [_md5_activates(uid, ACTIVATION_PROB[t]) for uid, t in zip(users["user_id_nat"], self.tier)]
+        )
+
+    def rng(self, month: int, stream: int) -> np.random.Generator:
+        """Generator for one month and purpose, independent of how months are scheduled."""
+        return np.random.default_rng(np.random.SeedSequence([self.seed, month, stream]))
+
+    def recurring_counts(self, month: int) -> np.ndarray:
+        """Ongoing events per user in ``MONTHS[month]`` (0 before signup)."""
+        month_start = MONTHS[month].astype("datetime64[D]")
+        month_end = (MONTHS[month] + 1).astype("datetime64[D]") - 1
+        counts = MONTHLY_BASE[self.tier] + sql_round(self.rng(month, 0).random(len(self.tier)) * 4)
+        eligible = (self.signup.astype("datetime64[M]") <= MONTHS[month]) & (
+            np.maximum(self.signup, month_start) <= month_end
+        )
+        return np.where(eligible, counts, 0)
+
+    def activation_rows(self, month: int) -> tuple[np.ndarray, np.ndarray]:
+        """(user index, event date) of the activation-stage events dated in ``MONTHS[month]``."""
+        users = np.flatnonzero(self.activates)
+        first = np.maximum(self.signup[users], START)
+        idx = np.repeat(users, ACTIVATION_EVENTS)
+        days = np.repeat(first, ACTIVATION_EVENTS) + np.tile(np.arange(ACTIVATION_EVENTS), len(users))
+        keep = (np.repeat(self.signup[users], ACTIVATION_EVENTS) + np.tile(np.arange(ACTIVATION_EVENTS), len(users)) <= END)
+        keep &= days.astype("datetime64[M]") == MONTHS[month]
+        return idx[keep], days[keep]
+
+    def month_rows(self, month: int) -> int:
+        return int(self.recurring_counts(month).sum()) + len(self.activation_rows(month)[0])
+
+
+def fact_month(pop: Population, month: int, first_id: int, n_workspaces: int) -> pd.DataFrame:
+    """All fact rows dated in ``MONTHS[month]``; usage ids start at ``first_id``."""
+    rng = pop.rng(month, 1)
+    month_start = MONTHS[month].astype("datetime64[D]")
+    month_end = (MONTHS[month] + 1).astype("datetime64[D]") - 1
+
+    counts = pop.recurring_counts(month)
+    user = np.repeat(np.arange(len(counts)), counts)
+    first = np.maximum(pop.signup[user], month_start)
+    span = (month_end - first).astype(np.int64)
+    day = first + sql_round(rng.random(len(user)) * span).astype("timedelta64[D]")
+
+    act_user, act_day = pop.activation_rows(month)
+    user = np.concatenate([user, act_user])
+    day = np.concatenate([day, act_day])
+    activation = np.concatenate([np.zeros(len(user) - len(act_user), np.int8), np.ones(len(act_user), np.int8)])
+    # Rows are written in time_key order, as they would arrive, which keeps the
+    # BRIN index on time_key selective.
+    order = np.argsort(day, kind="stable")
+    user, day, activation = user[order], day[order], activation[order]
+    n = len(user)
+
+    content = _draw(rng, CONTENT_CHAIN, n)
+    device = _draw(rng, DEVICE_CHAIN, n)
+    event = _draw(rng, EVENT_CHAIN, n)
+
+    day_index = (day - START).astype(np.int64)
+    per_day = SESSIONS_PER_DAY * pop.scale
+    session = day_index * per_day + rng.integers(0, per_day, n) + 1
+
+    base = np.zeros(n, np.int64)
+    spread = np.zeros(n, np.int64)
+    for key, (lo, width) in DURATION_BY_DEVICE.items():
+        base[device == key] = lo
+        spread[device == key] = width
+
+    day_of_month = (day - day.astype("datetime64[M]").astype("datetime64[D]")).astype(np.int64) + 1
+    feature = np.isin(event, FEATURE_EVENTS) | (rng.random(n) < 0.20)
+    collaboration = np.isin(event, COLLABORATION_EVENTS) | (np.isin(content, TEAM_CONTENT) & (rng.random(n) < 0.65))
+
+    return pd.DataFrame(
+        {
+            "usage_id": np.arange(first_id, first_id + n, dtype=np.int64),
+            "time_key": time_key(day),
+            "user_key": user + 1,
+            "workspace_key": rng.integers(1, n_workspaces + 1, n),
+            "content_key": content,
+            "device_key": device,
+            "event_key": event,
+            "session_key": session,
+            "event_count": np.ones(n, np.int8),
+            "active_user_flag": ((activation == 1) | (day_of_month % 5 == 0)).astype(np.int8),
+            "activation_event_flag": activation,
+            "feature_usage_flag": feature.astype(np.int8),
+            "collaboration_event_flag": collaboration.astype(np.int8),
+            "session_event_count": 2 + sql_round(rng.random(n) * 12),
+            "session_duration_sec": base + sql_round(rng.random(n) * spread),
+        },
+        columns=FACT_COLUMNS,
+    )
+
+
+def _draw(rng: np.random.Generator, chain: list[tuple[int, float]], n: int) -> np.ndarray:
+    keys, probs = chain_probabilities(chain)
+    return keys[np.searchsorted(np.cumsum(probs), rng.random(n), side="right").clip(max=len(keys) - 1)]
+
+
+def write_table(df: pd.DataFrame, path: Path, fmt: str) -> Path:
+    """Write ``df`` as a COPY-ready CSV (with header) or Parquet, atomically."""
+    path = path.with_suffix(".parquet" if fmt == "parquet" else ".csv")
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        if fmt == "parquet":
+            df.to_parquet(tmp, index=False)
+        else:
+            df.to_csv(tmp, index=False)
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+    return path
+
+
+def _write_month(args: tuple) -> tuple[str, int, float]:
+    pop, month, first_id, n_workspaces, out, fmt = args
+    start = time.perf_counter()
+    df = fact_month(pop, month, first_id, n_workspaces)
+    name = f"fact_p_{str(MONTHS[month]).replace('-', '')}"
+    write_table(df, out / FACT_TABLE / name, fmt)
+    return name, len(df), time.perf_counter() - start
+
+
+def generate(
+    out: Path = DEFAULT_OUT,
+    scale: int = 1,
+    seed: int = 0,
+    fmt: str = "csv",
+    workers: int | None = None,
+    log=print,
+) -> int:
+    """Write all dimension tables and one fact file per month partition; returns fact rows.
+
+    Every month draws from its own ``SeedSequence([seed, month, ...])``, so the
+    output only depends on ``scale`` and ``seed``, not on ``workers``.
+    """
+    start = time.perf_counter()
+    (out / FACT_TABLE).mkdir(parents=True, exist_ok=True)
+    for stale in (out / FACT_TABLE).glob("fact_p_*"):
+        stale.unlink()
+
+    dims_rng = np.random.default_rng(np.random.SeedSequence([seed, len(MONTHS)]))
+    users = dim_user(scale)
+    dims = {
+        "dim_time": dim_time(),
+        "dim_user": users,
+        "dim_workspace": dim_workspace(scale, dims_rng),
+        "dim_session": dim_session(scale, dims_rng),
+        **small_dimensions(),
+    }
+    for name, df in dims.items():
+        for other in out.glob(f"{name}.*"):
+            other.unlink()
+        write_table(df, out / name, fmt)
+    log(f"dimensions: {len(users):,} users, {len(dims['dim_session']):,} sessions ({time.perf_counter() - start:.2f}s)")
+
+    pop = Population(users, scale, seed)
+    sizes = [pop.month_rows(month) for month in range(len(MONTHS))]
+    offsets = np.concatenate([[1], 1 + np.cumsum(sizes)[:-1]])
+    n_workspaces = len(dims["dim_workspace"])
+    tasks = [(pop, month, int(offsets[month]), n_workspaces, out, fmt) for month in range(len(MONTHS))]
+
+    total = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for name, rows, seconds in executor.map(_write_month, tasks):
+            total += rows
+            log(f"  {name}: {rows:,} rows in {seconds:.2f}s")
+    elapsed = time.perf_counter() - start
+    log(f"{total:,} fact rows in {elapsed:.2f}s ({total / elapsed:,.0f} rows/s)")
+    return total
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Generate synthetic star schema data like scripts/populate.sql.")
+    parser.add_argument("--scale", type=int, default=1, help="scale factor (SF1 ~ 100k fact rows)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--format", choices=("csv", "parquet"), default="csv")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all CPUs)")
+    parser.add_argument("--out", type=Path, default=DEFAULT_OUT)
+    args = parser.parse_args(argv)
+    generate(args.out, args.scale, args.seed, args.format, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+from __future__ import annotations
+
+import argparse
+import time
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+
+import psycopg
+from psycopg import sql
+
+from warehouse.db import RESULTS_DIR, SCHEMA, SCRIPTS_DIR, connect, copy_query_to_file, fact_partitions, read_query
+
+INCREMENTAL_DIR = SCRIPTS_DIR / "incremental"
+RESULT_NAMES = ("kaq1", "kaq2", "kaq3", "kaq4", "kaq5", "aq1", "aq2", "retention")
+ACTIVATION_WINDOW_DAYS = 7
+RETENTION_WEEKS = 12
+
+# Fingerprint of one partition: its storage file, rows updated or deleted
+# since statistics were reset, and the highest usage_id.
+FINGERPRINT_SQL = """
+SELECT
+  c.relfilenode,
+  COALESCE(s.n_tup_upd, 0) + COALESCE(s.n_tup_del, 0),
+  (SELECT max(usage_id) FROM {partition})
+FROM pg_class c
+LEFT JOIN pg_stat_user_tables s ON s.relid = c.oid
+WHERE c.oid = %s::regclass
+"""
+
+SUMMARIZE_SQL = """
+INSERT INTO summary_daily (
+  time_key, subscription_tier, content_type, platform, collaboration_event_flag,
+  events, active_users, duration_sum, duration_count
+)
+SELECT
+  f.time_key,
+  u.subscription_tier,
+  c.content_type,
+  d.platform,
+  f.collaboration_event_flag,
+  SUM(f.event_count),
+  SUM(f.active_user_flag),
+  SUM(NULLIF(f.session_duration_sec, 0)),
+  COUNT(NULLIF(f.session_duration_sec, 0))
+FROM fact_product_usage_engagement f
+JOIN dim_user u    ON u.user_key = f.user_key
+JOIN dim_content c ON c.content_key = f.content_key
+JOIN dim_device d  ON d.device_key = f.device_key
+WHERE f.time_key >= %(range_from)s AND f.time_key < %(range_to)s
+GROUP BY f.time_key, u.subscription_tier, c.content_type, d.platform, f.collaboration_event_flag
+"""
+
+# Users whose first-week window overlaps [window_from, window_to) are recomputed.
+# Their windows span [window_from - 7 days, window_to + 7 days); the time_key
+# predicate over that range lets the planner prune to the partitions involved.
+ACTIVATION_DELETE_SQL = """
+DELETE FROM summary_user_activation a
+USING dim_user u
+WHERE u.user_key = a.user_key
+  AND u.signup_date <  %(window_to)s
+  AND u.signup_date + %(days)s > %(window_from)s
+"""
+
+ACTIVATION_INSERT_SQL = """
+INSERT INTO summary_user_activation (user_key, signup_month, activated)
+SELECT
+  u.user_key,
+  DATE_TRUNC('month', u.signup_date)::date,
+  MAX(f.activation_event_flag)
+FROM fact_product_usage_engagement f
+JOIN dim_user u ON u.user_key = f.user_key
+JOIN dim_time t ON t.time_key = f.time_key
+WHERE u.signup_date <  %(window_to)s
+  AND u.signup_date + %(days)s > %(window_from)s
+  AND t.calendar_date >= u.signup_date
+  AND t.calendar_date <  u.signup_date + %(days)s
+  AND f.time_key >= %(key_from)s AND f.time_key < %(key_to)s
+GROUP BY u.user_key, u.signup_date
+"""
+
+# Same windowing for the weeks after signup in which each user had an event.
+RETENTION_DELETE_SQL = """
+DELETE FROM summary_user_weeks w
+USING dim_user u
+WHERE u.user_key = w.user_key
+  AND u.signup_date <  %(window_to)s
+  AND u.signup_date + %(days)s > %(window_from)s
+"""
+
+RETENTION_INSERT_SQL = """
+INSERT INTO summary_user_weeks (user_key, signup_month, week)
+SELECT DISTINCT
+  u.user_key,
+  DATE_TRUNC('month', u.signup_date)::date,
+  (t.calendar_date - u.signup_date) / 7
+FROM fact_product_usage_engagement f
+JOIN dim_user u ON u.user_key = f.user_key
+JOIN dim_time t ON t.time_key = f.time_key
+WHERE u.signup_date <  %(window_to)s
+  AND u.signup_date + %(days)s > %(window_from)s
+  AND t.calendar_date >= u.signup_date
+  AND t.calendar_date <  u.signup_date + %(days)s
+  AND f.time_key >= %(key_from)s AND f.time_key < %(key_to)s
+"""
+
+
+def _window(window_from: date, window_to: date, days: int) -> dict:
+    return {
+        "window_from": window_from,
+        "window_to": window_to,
+        "days": days,
+        "key_from": date_to_key(window_from - timedelta(days=days)),
+        "key_to": date_to_key(window_to + timedelta(days=days)),
+    }
+
+
+@dataclass(frozen=True)
+class Partition:
+    name: str
+    range_from: int
+    range_to: int
+    relfilenode: int
+    max_usage_id: int | None
+    n_changed: int
+
+    @property
+    def summary_name(self) -> str:
+        return self.name.replace("fact_p_", "summary_p_", 1)
+
+    def fingerprint(self) -> tuple:
+        """Changes on any insert (max id), update/delete (stats) or truncate (relfilenode)."""
+        return (self.relfilenode, self.max_usage_id, self.n_changed)
+
+
+def key_to_date(key: int) -> date:
+    return date(key // 10000, key // 100 % 100, key % 100)
+
+
+def date_to_key(day: date) -> int:
+    return day.year * 10000 + day.month * 100 + day.day
+
+
+def ensure_schema(conn: psycopg.Connection) -> None:
+    conn.execute(read_query(INCREMENTAL_DIR / "schema.sql"))
+
+
+def list_partitions(conn: psycopg.Connection) -> list[Partition]:
+    """Fact partitions with their current fingerprints, read from the catalog.
+
+    ``max(usage_id)`` is answered from each partition's primary key index, so
+    this stays cheap however much history there is.
+    """
+    partitions = []
+    for name, key_from, key_to in fact_partitions(conn):
+        relfilenode, n_changed, max_id = conn.execute(
+            sql.SQL(FINGERPRINT_SQL).format(partition=sql.Identifier(SCHEMA, name)), (f"{SCHEMA}.{name}",)
+        ).fetchone()
+        partitions.append(Partition(name, key_from, key_to, int(relfilenode), max_id, int(n_changed)))
+    return partitions
+
+
+def read_manifest(conn: psycopg.Connection) -> dict[str, tuple]:
+    rows = conn.execute(
+        "SELECT partition_name, relfilenode, max_usage_id, n_changed FROM refresh_manifest"
+    ).fetchall()
+    return {name: (int(relfilenode), max_id, int(n_changed)) for name, relfilenode, max_id, n_changed in rows}
+
+
+def refresh_partition(conn: psycopg.Connection, part: Partition) -> None:
+    """Rebuild one month of summary_daily and the per-user rows (first week, retention weeks) it can affect."""
+    params = {"range_from": part.range_from, "range_to": part.range_to}
+    summary = sql.Identifier(SCHEMA, part.summary_name)
+    with conn.transaction():
+        conn.execute(
+            sql.SQL(
+                "CREATE TABLE IF NOT EXISTS {} PARTITION OF summary_daily FOR VALUES FROM ({}) TO ({})"
+            ).format(summary, sql.Literal(part.range_from), sql.Literal(part.range_to))
+        )
+        conn.execute(sql.SQL("TRUNCATE {}").format(summary))
+        conn.execute(SUMMARIZE_SQL, params)
+
+        window_from = key_to_date(part.range_from)
+        window_to = key_to_date(part.range_to)
+        activation = _window(window_from, window_to, ACTIVATION_WINDOW_DAYS)
+        conn.execute(ACTIVATION_DELETE_SQL, activation)
+        conn.execute(ACTIVATION_INSERT_SQL, activation)
+        retention = _window(window_from, window_to, 7 * RETENTION_WEEKS)
+        conn.execute(RETENTION_DELETE_SQL, retention)
+        conn.execute(RETENTION_INSERT_SQL, retention)
+
+        conn.execute(
+            """
+            INSERT INTO refresh_manifest
+              (partition_name, range_from, range_to, relfilenode, max_usage_id, n_changed, refreshed_at)
+            VALUES (%s, %s, %s, %s, %s, %s, now())
+            ON CONFLICT (partition_name) DO UPDATE SET
+              range_from = EXCLUDED.range_from,
+              range_to = EXCLUDED.range_to,
+              relfilenode = EXCLUDED.relfilenode,
+              max_usage_id = EXCLUDED.max_usage_id,
+              n_changed = EXCLUDED.n_changed,
+              refreshed_at = EXCLUDED.refreshed_at
+            """,
+            (part.name, part.range_from, part.range_to, *part.fingerprint()),
+        )
+
+
+def drop_stale(conn: psycopg.Connection, partitions: list[Partition]) -> list[str]:
+    """Forget summaries of fact partitions that were dropped or detached."""
+    live = {part.name for part in partitions}
+    stale = [name for name in read_manifest(conn) if name not in live]
+    with conn.transaction():
+        for name in stale:
+            summary = name.replace("fact_p_", "summary_p_", 1)
+            conn.execute(sql.SQL("DROP TABLE IF EXISTS {}").format(sql.Identifier(SCHEMA, summary)))
+            conn.execute("DELETE FROM refresh_manifest WHERE partition_name = %s", (name,))
+    return stale
+
+
+def write_results(conn: psycopg.Connection, results_dir: Path = RESULTS_DIR) -> dict[str, float]:
+    timings = {}
+    for name in RESULT_NAMES:
+        start = time.perf_counter()
+        copy_query_to_file(conn, read_query(INCREMENTAL_DIR / f"{name}.sql"), results_dir / f"{name}.csv")
+        timings[name] = time.perf_counter() - start
+    return timings
+
+
+def refresh(
+    conn: psycopg.Connection,
+    full: bool = False,
+    results_dir: Path | None = RESULTS_DIR,
+    log=print,
+) -> list[str]:
+    """Resummarize changed partitions, then rewrite the result sets from the summaries.
+
+    Fingerprints are read before a partition is summarized, so rows written
+    while the refresh runs are picked up by the next one. Dimension changes
+    (e.g. a user's tier) are not tracked per partition and need ``full=True``.
+    Returns the names of the partitions that were refreshed.
+    """
+    ensure_schema(conn)
+    if full:
+        with conn.transaction():
+            conn.execute("TRUNCATE summary_daily, summary_user_activation, summary_user_weeks, refresh_manifest")
+    partitions = list_partitions(conn)
+    for name in drop_stale(conn, partitions):
+        log(f"dropped summary of {name}")
+
+    manifest = read_manifest(conn)
+    dirty = [part for part in partitions if manifest.get(part.name) != part.fingerprint()]
+    log(f"{len(dirty)} of {len(partitions)} partitions changed")
+    for part in dirty:
+        start = time.perf_counter()
+        refresh_partition(conn, part)
+        log(f"  {part.name}: {time.perf_counter() - start:.2f}s")
+
+    if results_dir is not None:
+        for name, seconds in write_results(conn, results_dir).items():
+            log(f"  {name}.csv: {seconds:.2f}s")
+    return [part.name for part in dirty]
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Incrementally refresh the KAQ result sets.")
+    parser.add_argument("--dsn", default=None, help="libpq connection string (default: $WAREHOUSE_DSN)")
+    parser.add_argument("--full", action="store_true", help="rebuild every partition summary")
+    parser.add_argument("--results-dir", type=Path, default=RESULTS_DIR)
+    args = parser.parse_args(argv)
+
+    with connect(args.dsn, autocommit=True) as conn:
+        refresh(conn, full=args.full, results_dir=args.results_dir)
+
+
+if __name__ == "__main__":
+    main()
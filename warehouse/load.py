@@ -0,0 +1,310 @@
+from __future__ import annotations
+
+import argparse
+import gzip
+import io
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterable
+
+import pandas as pd
+import psycopg
+from psycopg import sql
+from psycopg_pool import ConnectionPool
+
+from warehouse.db import BASE_DIR, FACT_TABLE, SCHEMA, SCRIPTS_DIR, connection_pool, fact_partitions, read_query
+
+DEFAULT_SOURCE = BASE_DIR / "data" / "star"
+DIMENSIONS = ("dim_time", "dim_user", "dim_workspace", "dim_content", "dim_device", "dim_event", "dim_session")
+TABLE_SUFFIXES = (".csv", ".csv.gz", ".parquet")
+CHUNK_SIZE = 1 << 20
+
+_INDEX_DEF = re.compile(r"^CREATE (UNIQUE )?INDEX \S+ ON (?:ONLY )?\S+ (USING .*)$")
+
+
+@dataclass(frozen=True)
+class Deferred:
+    """Fact table constraints and indexes dropped for the load and rebuilt afterwards."""
+
+    primary_key: tuple[str, str] | None  # (name, definition)
+    foreign_keys: list[tuple[str, str]]
+    indexes: list[tuple[str, str]]  # (name, CREATE INDEX statement on the parent)
+
+
+def table_files(directory: Path, name: str) -> list[Path]:
+    """``<name>.<suffix>``, or the per-partition files of a ``<name>/`` directory."""
+    for suffix in TABLE_SUFFIXES:
+        path = directory / f"{name}{suffix}"
+        if path.exists():
+            return [path]
+    parts = directory / name
+    if parts.is_dir():
+        return sorted(path for path in parts.iterdir() if path.name.endswith(TABLE_SUFFIXES))
+    return []
+
+
+def _stem(path: Path) -> str:
+    return path.name.split(".", 1)[0]
+
+
+def _header(path: Path) -> list[str]:
+    if path.suffix == ".parquet":
+        import pyarrow.parquet as pq
+
+        return pq.read_schema(path).names
+    opener = gzip.open if path.name.endswith(".gz") else open
+    with opener(path, "rt") as fh:
+        return fh.readline().strip().split(",")
+
+
+def _chunks(path: Path) -> Iterable[bytes]:
+    """CSV bytes (with header) of a table file, whatever its format."""
+    if path.suffix == ".parquet":
+        buffer = io.StringIO()
+        pd.read_parquet(path).to_csv(buffer, index=False)
+        data = buffer.getvalue().encode()
+        for start in range(0, len(data), CHUNK_SIZE):
+            yield data[start : start + CHUNK_SIZE]
+        return
+    opener = gzip.open if path.name.endswith(".gz") else open
+    with opener(path, "rb") as fh:
+        while chunk := fh.read(CHUNK_SIZE):
+            yield chunk
+
+
+def copy_file(conn: psycopg.Connection, table: str, path: Path, truncate: bool = True) -> int:
+    """COPY one file into ``table``; returns the number of rows loaded.
+
+    With ``truncate`` the table is emptied in the same transaction, which lets
+    COPY write frozen rows (no hint-bit or vacuum pass needed afterwards).
+    Partitioned parents cannot be frozen and are loaded normally.
+    """
+    columns = sql.SQL(", ").join(sql.Identifier(col) for col in _header(path))
+    target = sql.Identifier(SCHEMA, table)
+    freeze = truncate and table != FACT_TABLE
+    options = sql.SQL("FORMAT csv, HEADER true, FREEZE true" if freeze else "FORMAT csv, HEADER true")
+    with conn.transaction(), conn.cursor() as cur:
+        if truncate:
+            cur.execute(sql.SQL("TRUNCATE {}").format(target))
+        with cur.copy(sql.SQL("COPY {} ({}) FROM STDIN WITH ({})").format(target, columns, options)) as copy:
+            for chunk in _chunks(path):
+                copy.write(chunk)
+        return cur.rowcount
+
+
+def month_partitions(conn: psycopg.Connection) -> list[tuple[str, int, int]]:
+    """(name, from, to) of a monthly partition for every month in dim_time."""
+    rows = conn.execute(
+        """
+        SELECT
+          format('fact_p_%s', to_char(m, 'YYYYMM')),
+          to_char(m, 'YYYYMMDD')::int,
+          to_char(m + INTERVAL '1 month', 'YYYYMMDD')::int
+        FROM generate_series(
+          (SELECT date_trunc('month', min(calendar_date)) FROM dim_time),
+          (SELECT date_trunc('month', max(calendar_date)) FROM dim_time),
+          INTERVAL '1 month'
+        ) AS g(m)
+        """
+    ).fetchall()
+    return [(name, lo, hi) for name, lo, hi in rows]
+
+
+def create_partitions(conn: psycopg.Connection, partitions: list[tuple[str, int, int]]) -> None:
+    for name, lo, hi in partitions:
+        conn.execute(
+            sql.SQL("CREATE TABLE IF NOT EXISTS {} PARTITION OF {} FOR VALUES FROM ({}) TO ({})").format(
+                sql.Identifier(SCHEMA, name), sql.Identifier(SCHEMA, FACT_TABLE), sql.Literal(lo), sql.Literal(hi)
+            )
+        )
+
+
+def drop_deferred(conn: psycopg.Connection) -> Deferred:
+    """Drop the fact table's primary key, foreign keys and indexes, remembering their definitions."""
+    parent = f"{SCHEMA}.{FACT_TABLE}"
+    constraints = conn.execute(
+        "SELECT conname, contype, pg_get_constraintdef(oid) FROM pg_constraint"
+        " WHERE conrelid = %s::regclass AND contype IN ('p', 'f') ORDER BY conname",
+        (parent,),
+    ).fetchall()
+    indexes = conn.execute(
+        "SELECT c.relname, pg_get_indexdef(i.indexrelid) FROM pg_index i"
+        " JOIN pg_class c ON c.oid = i.indexrelid"
+        " WHERE i.indrelid = %s::regclass AND NOT i.indisprimary ORDER BY c.relname",
+        (parent,),
+    ).fetchall()
+    deferred = Deferred(
+        primary_key=next(((name, definition) for name, kind, definition in constraints if kind == "p"), None),
+        foreign_keys=[(name, definition) for name, kind, definition in constraints if kind == "f"],
+        indexes=[(name, definition) for name, definition in indexes],
+    )
+    with conn.transaction():
+        for name, _ in [*deferred.foreign_keys, *([deferred.primary_key] if deferred.primary_key else [])]:
+            conn.execute(
+                sql.SQL("ALTER TABLE {} DROP CONSTRAINT {}").format(sql.Identifier(SCHEMA, FACT_TABLE), sql.Identifier(name))
+            )
+        for name, _ in deferred.indexes:
+            conn.execute(sql.SQL("DROP INDEX {}").format(sql.Identifier(SCHEMA, name)))
+    return deferred
+
+
+def build_partition_indexes(conn: psycopg.Connection, partition: str, deferred: Deferred) -> None:
+    """Primary key and indexes of one partition, matching the parent's so they can be attached."""
+    target = sql.Identifier(SCHEMA, partition)
+    if deferred.primary_key:
+        conn.execute(sql.SQL("ALTER TABLE {} ADD {}").format(target, sql.SQL(deferred.primary_key[1])))
+    for _, definition in deferred.indexes:
+        unique, rest = _INDEX_DEF.match(definition).groups()
+        conn.execute(sql.SQL("CREATE {}INDEX ON {} {}").format(sql.SQL(unique or ""), target, sql.SQL(rest)))
+
+
+def validate_partition_keys(conn: psycopg.Connection, partition: str, deferred: Deferred) -> None:
+    """Add the foreign keys as NOT VALID, then validate them without blocking writers.
+
+    PostgreSQL does not accept NOT VALID foreign keys on a partitioned table, so
+    this runs per partition; adding the key to the parent then attaches them.
+    """
+    target = sql.Identifier(SCHEMA, partition)
+    for name, definition in deferred.foreign_keys:
+        constraint = sql.Identifier(f"{partition}_{name}")
+        conn.execute(sql.SQL("ALTER TABLE {} ADD CONSTRAINT {} {} NOT VALID").format(target, constraint, sql.SQL(definition)))
+        conn.execute(sql.SQL("ALTER TABLE {} VALIDATE CONSTRAINT {}").format(target, constraint))
+
+
+def restore_deferred(conn: psycopg.Connection, deferred: Deferred) -> None:
+    """Recreate the parent's constraints and indexes; existing partition ones are attached, not rebuilt."""
+    parent = sql.Identifier(SCHEMA, FACT_TABLE)
+    if deferred.primary_key:
+        name, definition = deferred.primary_key
+        conn.execute(sql.SQL("ALTER TABLE {} ADD CONSTRAINT {} {}").format(parent, sql.Identifier(name), sql.SQL(definition)))
+    for name, definition in deferred.indexes:
+        # pg_get_indexdef() says "ON ONLY" for partitioned tables, which would
+        # leave the index invalid instead of attaching the partitions' indexes.
+        unique, rest = _INDEX_DEF.match(definition).groups()
+        conn.execute(
+            sql.SQL("CREATE {}INDEX {} ON {} {}").format(
+                sql.SQL(unique or ""), sql.Identifier(name), parent, sql.SQL(rest)
+            )
+        )
+    for name, definition in deferred.foreign_keys:
+        conn.execute(sql.SQL("ALTER TABLE {} ADD CONSTRAINT {} {}").format(parent, sql.Identifier(name), sql.SQL(definition)))
+
+
+def reset_identities(conn: psycopg.Connection) -> None:
+    """Move identity sequences past the explicit keys that were loaded."""
+    rows = conn.execute(
+        "SELECT table_name, column_name FROM information_schema.columns"
+        " WHERE table_schema = %s AND is_identity = 'YES'",
+        (SCHEMA,),
+    ).fetchall()
+    for table, column in rows:
+        conn.execute(
+            sql.SQL("SELECT setval(pg_get_serial_sequence({}, {}), GREATEST(max({}), 1)) FROM {}").format(
+                sql.Literal(f"{SCHEMA}.{table}"), sql.Literal(column), sql.Identifier(column), sql.Identifier(SCHEMA, table)
+            )
+        )
+
+
+def _parallel(pool: ConnectionPool, func: Callable, items: Iterable) -> list:
+    def run(item):
+        with pool.connection() as conn:
+            return func(conn, item)
+
+    with ThreadPoolExecutor(max_workers=pool.max_size) as executor:
+        return list(executor.map(run, items))
+
+
+def bulk_load(pool: ConnectionPool, source: Path = DEFAULT_SOURCE, drop: bool = False, log=print) -> int:
+    """Load a star schema export (e.g. from ``warehouse.generate``) as fast as PostgreSQL allows.
+
+    The fact table's primary key, indexes and foreign keys are dropped first and
+    rebuilt once all partitions are loaded, one partition per pooled connection.
+    Returns the number of fact rows loaded.
+    """
+    missing = [name for name in (*DIMENSIONS, FACT_TABLE) if not table_files(source, name)]
+    if missing:
+        raise FileNotFoundError(f"{', '.join(missing)} not found in {source}")
+
+    timings = {}
+
+    def phase(name: str, start: float) -> None:
+        timings[name] = time.perf_counter() - start
+        log(f"{name}: {timings[name]:.2f}s")
+
+    start = time.perf_counter()
+    with pool.connection() as conn:
+        if drop:
+            conn.execute(sql.SQL("DROP SCHEMA IF EXISTS {} CASCADE").format(sql.Identifier(SCHEMA)))
+        conn.execute(read_query(SCRIPTS_DIR / "create-schema.sql"))
+        deferred = drop_deferred(conn)
+    phase("schema", start)
+
+    start = time.perf_counter()
+    _parallel(pool, lambda conn, name: copy_file(conn, name, table_files(source, name)[0]), DIMENSIONS)
+    phase("dimensions", start)
+
+    start = time.perf_counter()
+    with pool.connection() as conn:
+        create_partitions(conn, month_partitions(conn))
+        partitions = [name for name, _, _ in fact_partitions(conn)]
+    fact_files = table_files(source, FACT_TABLE)
+    if len(fact_files) == 1 and _stem(fact_files[0]) == FACT_TABLE:
+        jobs = [(FACT_TABLE, fact_files[0])]
+    else:
+        jobs = [(_stem(path), path) for path in fact_files]
+        unknown = [name for name, _ in jobs if name not in partitions]
+        if unknown:
+            raise ValueError(f"no partition for {', '.join(unknown)}; extend dim_time to cover them")
+        with pool.connection() as conn:
+            for name in sorted(set(partitions) - {name for name, _ in jobs}):
+                conn.execute(sql.SQL("TRUNCATE {}").format(sql.Identifier(SCHEMA, name)))
+
+    def load_partition(conn, job):
+        table, path = job
+        begin = time.perf_counter()
+        rows = copy_file(conn, table, path)
+        seconds = time.perf_counter() - begin
+        log(f"  {table}: {rows:,} rows in {seconds:.2f}s ({rows / max(seconds, 1e-9):,.0f} rows/s)")
+        return rows
+
+    total = sum(_parallel(pool, load_partition, jobs))
+    phase("fact", start)
+
+    start = time.perf_counter()
+    _parallel(pool, lambda conn, part: build_partition_indexes(conn, part, deferred), partitions)
+    _parallel(pool, lambda conn, part: validate_partition_keys(conn, part, deferred), partitions)
+    with pool.connection() as conn, conn.transaction():
+        restore_deferred(conn, deferred)
+        reset_identities(conn)
+    phase("indexes and keys", start)
+
+    start = time.perf_counter()
+    _parallel(
+        pool,
+        lambda conn, table: conn.execute(sql.SQL("ANALYZE {}").format(sql.Identifier(SCHEMA, table))),
+        [FACT_TABLE, *DIMENSIONS],
+    )
+    phase("analyze", start)
+
+    elapsed = sum(timings.values())
+    log(f"loaded {total:,} fact rows in {elapsed:.2f}s ({total / elapsed:,.0f} rows/s overall)")
+    return total
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Bulk load a star schema export into PostgreSQL.")
+    parser.add_argument("--dsn", default=None, help="libpq connection string (default: $WAREHOUSE_DSN)")
+    parser.add_argument("--source", type=Path, default=DEFAULT_SOURCE, help="directory written by warehouse.generate")
+    parser.add_argument("--workers", type=int, default=4, help="parallel connections")
+    parser.add_argument("--drop", action="store_true", help=f"drop and recreate the {SCHEMA} schema first")
+    args = parser.parse_args(argv)
+
+    with connection_pool(args.dsn, size=max(1, args.workers)) as pool:
+        bulk_load(pool, args.source, drop=args.drop)
+
+
+if __name__ == "__main__":
+    main()
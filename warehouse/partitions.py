@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import argparse
+import gzip
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+
+import psycopg
+from psycopg import sql
+
+from warehouse.db import FACT_TABLE, SCHEMA, connect, fact_partitions
+
+ARCHIVE_SCHEMA = f"{SCHEMA}_archive"
+BRIN_INDEX = "idx_fact_time_brin"
+# The btree on time_key that older schemas created; the BRIN index replaces it.
+BTREE_INDEX = "idx_fact_time"
+
+# Same rows as step (2) of scripts/populate.sql, for an arbitrary date range.
+EXTEND_TIME_SQL = """
+INSERT INTO dim_time (
+  time_key, calendar_date, day_of_week, is_weekend,
+  week_of_year, month, quarter, year, day_since_signup_bucket
+)
+SELECT
+  TO_CHAR(d, 'YYYYMMDD')::int,
+  d::date,
+  EXTRACT(ISODOW FROM d)::smallint,
+  EXTRACT(ISODOW FROM d) IN (6, 7),
+  EXTRACT(WEEK FROM d)::smallint,
+  EXTRACT(MONTH FROM d)::smallint,
+  EXTRACT(QUARTER FROM d)::smallint,
+  EXTRACT(YEAR FROM d)::smallint,
+  NULL::smallint
+FROM generate_series(%(start)s::date, %(end)s::date - 1, INTERVAL '1 day') AS g(d)
+ON CONFLICT (time_key) DO NOTHING
+"""
+
+
+@dataclass(frozen=True)
+class Month:
+    year: int
+    month: int
+
+    @classmethod
+    def of(cls, day: date) -> "Month":
+        return cls(day.year, day.month)
+
+    @classmethod
+    def from_key(cls, key: int) -> "Month":
+        return cls(key // 10000, key // 100 % 100)
+
+    def __add__(self, months: int) -> "Month":
+        index = self.year * 12 + self.month - 1 + months
+        return Month(index // 12, index % 12 + 1)
+
+    def __lt__(self, other: "Month") -> bool:
+        return (self.year, self.month) < (other.year, other.month)
+
+    @property
+    def start(self) -> date:
+        return date(self.year, self.month, 1)
+
+    @property
+    def key(self) -> int:
+        return self.year * 10000 + self.month * 100 + 1
+
+    @property
+    def partition(self) -> str:
+        return f"fact_p_{self.year:04d}{self.month:02d}"
+
+
+def ensure_brin(conn: psycopg.Connection) -> bool:
+    """BRIN index on time_key, replacing the old btree; new partitions inherit it automatically.
+
+    Returns True if the index was created.
+    """
+    exists = conn.execute("SELECT to_regclass(%s) IS NOT NULL", (f"{SCHEMA}.{BRIN_INDEX}",)).fetchone()[0]
+    if not exists:
+        conn.execute(
+            sql.SQL("CREATE INDEX {} ON {} USING brin (time_key)").format(
+                sql.Identifier(BRIN_INDEX), sql.Identifier(SCHEMA, FACT_TABLE)
+            )
+        )
+    conn.execute(sql.SQL("DROP INDEX IF EXISTS {}").format(sql.Identifier(SCHEMA, BTREE_INDEX)))
+    return not exists
+
+
+def create_months(conn: psycopg.Connection, first: Month, last: Month) -> list[str]:
+    """Create the partitions (and dim_time rows) for ``first`` .. ``last``; returns the new ones."""
+    existing = {name for name, _, _ in fact_partitions(conn)}
+    created = []
+    month = first
+    while not last < month:
+        if month.partition not in existing:
+            with conn.transaction():
+                conn.execute(EXTEND_TIME_SQL, {"start": month.start, "end": (month + 1).start})
+                conn.execute(
+                    sql.SQL("CREATE TABLE {} PARTITION OF {} FOR VALUES FROM ({}) TO ({})").format(
+                        sql.Identifier(SCHEMA, month.partition),
+                        sql.Identifier(SCHEMA, FACT_TABLE),
+                        sql.Literal(month.key),
+                        sql.Literal((month + 1).key),
+                    )
+                )
+            created.append(month.partition)
+        month = month + 1
+    return created
+
+
+def retire(conn: psycopg.Connection, name: str, archive_dir: Path | None) -> str:
+    """Detach one partition; move it to the archive schema, or dump it to ``archive_dir`` and drop it."""
+    table = sql.Identifier(SCHEMA, name)
+    conn.execute(
+        sql.SQL("ALTER TABLE {} DETACH PARTITION {} CONCURRENTLY").format(sql.Identifier(SCHEMA, FACT_TABLE), table)
+    )
+    if archive_dir is None:
+        conn.execute(sql.SQL("CREATE SCHEMA IF NOT EXISTS {}").format(sql.Identifier(ARCHIVE_SCHEMA)))
+        conn.execute(sql.SQL("ALTER TABLE {} SET SCHEMA {}").format(table, sql.Identifier(ARCHIVE_SCHEMA)))
+        return f"{ARCHIVE_SCHEMA}.{name}"
+
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    path = archive_dir / f"{name}.csv.gz"
+    tmp = path.with_name(f".{path.name}.tmp")
+    try:
+        with conn.cursor() as cur, gzip.open(tmp, "wb") as fh:
+            with cur.copy(sql.SQL("COPY {} TO STDOUT WITH (FORMAT csv, HEADER true)").format(table)) as copy:
+                for chunk in copy:
+                    fh.write(chunk)
+        tmp.replace(path)
+    finally:
+        tmp.unlink(missing_ok=True)
+    conn.execute(sql.SQL("DROP TABLE {}").format(table))
+    return str(path)
+
+
+def manage(
+    conn: psycopg.Connection,
+    ahead: int = 3,
+    retain_months: int | None = None,
+    archive_dir: Path | None = None,
+    today: date | None = None,
+    dry_run: bool = False,
+    log=print,
+) -> None:
+    """Keep ``ahead`` future months of partitions, retire those older than ``retain_months``."""
+    current = Month.of(today or date.today())
+    partitions = fact_partitions(conn)
+    first = min((Month.from_key(lo) for _, lo, _ in partitions), default=current)
+    last = current + ahead
+
+    if dry_run:
+        existing = {name for name, _, _ in partitions}
+        month = first
+        while not last < month:
+            if month.partition not in existing:
+                log(f"would create {month.partition}")
+            month = month + 1
+    else:
+        if ensure_brin(conn):
+            log(f"created {BRIN_INDEX}")
+        for name in create_months(conn, first, last):
+            log(f"created {name}")
+
+    if retain_months is None:
+        return
+    cutoff = current + (1 - retain_months)
+    for name, lo, _ in fact_partitions(conn):
+        if Month.from_key(lo) < cutoff:
+            if dry_run:
+                log(f"would retire {name}")
+            else:
+                log(f"retired {name} -> {retire(conn, name, archive_dir)}")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Pre-create and retire monthly fact partitions.")
+    parser.add_argument("--dsn", default=None, help="libpq connection string (default: $WAREHOUSE_DSN)")
+    parser.add_argument("--ahead", type=int, default=3, help="future months to keep partitions for")
+    parser.add_argument("--retain-months", type=int, default=None, help="detach partitions older than this")
+    parser.add_argument(
+        "--archive", type=Path, default=None, help=f"dump retired partitions here instead of moving them to {ARCHIVE_SCHEMA}"
+    )
+    parser.add_argument("--today", type=date.fromisoformat, default=None, help="reference date (default: today)")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args(argv)
+
+    with connect(args.dsn, autocommit=True) as conn:
+        manage(conn, args.ahead, args.retain_months, args.archive, args.today, args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
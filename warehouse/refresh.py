@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+from psycopg_pool import ConnectionPool
+
+from warehouse import incremental
+from warehouse.db import RESULTS_DIR, SCRIPTS_DIR, connection_pool, copy_query_to_file, read_query
+
+RESULT_NAMES = incremental.RESULT_NAMES
+
+
+def export_result(pool: ConnectionPool, script: Path, results_dir: Path) -> tuple[str, float, int]:
+    """Run one query script into ``results_dir/<name>.csv``; returns (name, seconds, bytes)."""
+    query = read_query(script)
+    start = time.perf_counter()
+    with pool.connection() as conn:
+        written = copy_query_to_file(conn, query, results_dir / f"{script.stem}.csv")
+    return script.stem, time.perf_counter() - start, written
+
+
+def refresh_results(
+    pool: ConnectionPool,
+    scripts_dir: Path = SCRIPTS_DIR,
+    results_dir: Path = RESULTS_DIR,
+    names: tuple[str, ...] = RESULT_NAMES,
+    log=print,
+) -> dict[str, float]:
+    """Run the result queries concurrently, at most one per pooled connection.
+
+    Every CSV is written to a temporary file and renamed into place, so a failed
+    query leaves the previous result untouched. Returns per-query seconds.
+    """
+    results_dir.mkdir(parents=True, exist_ok=True)
+    timings = {}
+    with ThreadPoolExecutor(max_workers=pool.max_size) as executor:
+        futures = [executor.submit(export_result, pool, scripts_dir / f"{name}.sql", results_dir) for name in names]
+        for future in as_completed(futures):
+            name, seconds, written = future.result()
+            timings[name] = seconds
+            log(f"  {name}.csv: {seconds:.2f}s, {written / 1024:.1f} KiB")
+    return timings
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Recompute results/*.csv from the warehouse.")
+    parser.add_argument("--dsn", default=None, help="libpq connection string (default: $WAREHOUSE_DSN)")
+    parser.add_argument("--workers", type=int, default=len(RESULT_NAMES), help="connection pool size")
+    parser.add_argument("--results-dir", type=Path, default=RESULTS_DIR)
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="refresh the per-partition summaries first and query those instead of the fact table",
+    )
+    parser.add_argument("--full", action="store_true", help="with --incremental, rebuild every summary")
+    parser.add_argument("names", nargs="*", metavar="NAME", help="result sets to refresh (default: all)")
+    args = parser.parse_args(argv)
+    unknown = sorted(set(args.names) - set(RESULT_NAMES))
+    if unknown:
+        parser.error(f"unknown result set(s): {', '.join(unknown)}")
+    names = tuple(args.names) or RESULT_NAMES
+
+    start = time.perf_counter()
+    with connection_pool(args.dsn, size=max(1, args.workers)) as pool:
+        scripts_dir = SCRIPTS_DIR
+        if args.incremental:
+            with pool.connection() as conn:
+                incremental.refresh(conn, full=args.full, results_dir=None)
+            scripts_dir = incremental.INCREMENTAL_DIR
+        timings = refresh_results(pool, scripts_dir, args.results_dir, names)
+    elapsed = time.perf_counter() - start
+    print(f"refreshed {len(timings)} result sets in {elapsed:.2f}s (sum of queries {sum(timings.values()):.2f}s)")
+
+
+if __name__ == "__main__":
+    main()